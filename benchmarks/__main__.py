@@ -0,0 +1,86 @@
+"""
+Benchmark suite for Memory and MemoryIndex.
+
+    python -m benchmarks --scales 10000 100000 1000000 --dim 384 --output results.json
+
+For every scale the suite ingests nodes and edges in batches and then times
+point reads, vector and hybrid search, neighbour lookups, node and edge
+updates and deletes, and concurrent writers. Each operation reports
+throughput and p50/p99 latency; each scale also reports the peak RSS and the
+number of data files per Delta table, so regressions in small-file growth
+show up next to the latency numbers.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+
+from benchmarks.memory_benchmark import run
+from gyaan.utils.io import configure_coalescing, configure_executor, EXECUTOR_KINDS
+
+def git_revision():
+    try:
+        return subprocess.run(["git","rev-parse","HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def main():
+    parser=argparse.ArgumentParser(description="Benchmark Memory CRUD, search and concurrency.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Number of nodes (and edges) per run")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--fixed-width", action="store_true", help="Store embeddings as fixed-width float32 arrays")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per ingest batch")
+    parser.add_argument("--queries", type=int, default=200, help="Operations per read/search benchmark")
+    parser.add_argument("--writers", type=int, default=16, help="Concurrent add_nodes calls")
+    parser.add_argument("--memories", type=int, default=100, help="Memories registered in the MemoryIndex benchmark (0 to skip)")
+    parser.add_argument("--executor", choices=EXECUTOR_KINDS, default=None, help="Blocking I/O executor")
+    parser.add_argument("--coalesce", action="store_true", help="Enable group-commit write coalescing")
+    parser.add_argument("--workdir", default="benchmark_data", help="Scratch directory for the Delta tables")
+    parser.add_argument("--keep", action="store_true", help="Keep the Delta tables after the run")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args=parser.parse_args()
+
+    if args.executor:
+        configure_executor(args.executor)
+    if args.coalesce:
+        configure_coalescing(True)
+
+    started=time.time()
+    results=asyncio.run(run(
+        scales=args.scales,
+        dim=args.dim,
+        batch_size=args.batch_size,
+        queries=args.queries,
+        writers=args.writers,
+        memories=args.memories,
+        fixed_width=args.fixed_width,
+        workdir=os.path.abspath(args.workdir),
+        keep=args.keep
+    ))
+
+    report={
+        "config":vars(args),
+        "environment":{
+            "python":sys.version.split()[0],
+            "platform":platform.platform(),
+            "cpu_count":os.cpu_count(),
+            "git_revision":git_revision()
+        },
+        "started_at":started,
+        "duration":time.time()-started,
+        "results":results
+    }
+
+    payload=json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output,"w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,86 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+import psutil
+from deltalake import DeltaTable
+
+class RSSSampler():
+    """Polls the process RSS on a background thread and keeps the peak."""
+
+    def __init__(
+        self,
+        interval: float=0.01):
+
+        self.interval=interval
+        self.process=psutil.Process()
+        self.peak=0
+        self._stop=threading.Event()
+        self._thread=None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak=max(self.peak, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak=self.process.memory_info().rss
+        self._stop.clear()
+        self._thread=threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak=max(self.peak, self.process.memory_info().rss)
+
+class OperationStats():
+    """Latency samples for one operation, summarised as throughput and percentiles."""
+
+    def __init__(
+        self,
+        name: str):
+
+        self.name=name
+        self.latencies: List[float]=[]
+        self.rows=0
+        self.wall_time=0.0
+
+    @contextmanager
+    def measure(
+        self,
+        rows: int=1):
+
+        start=time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter()-start)
+        self.rows+=rows
+
+    def summary(self) -> Dict[str,Optional[float]]:
+        if not self.latencies:
+            return {"operations":0}
+        elapsed=self.wall_time or sum(self.latencies)
+        return {
+            "operations":len(self.latencies),
+            "rows":self.rows,
+            "ops_per_second":len(self.latencies)/elapsed,
+            "rows_per_second":self.rows/elapsed,
+            "p50_latency":float(np.percentile(self.latencies, 50)),
+            "p99_latency":float(np.percentile(self.latencies, 99)),
+            "max_latency":float(max(self.latencies))
+        }
+
+def table_files(
+    table_path: str) -> Dict[str,int]:
+    """Number of live data files, their total size and the table version."""
+
+    dt=DeltaTable(f"file://{table_path}")
+    actions=dt.get_add_actions(flatten=True).to_pydict()
+    return {
+        "files":len(actions["path"]),
+        "bytes":int(sum(actions["size_bytes"])),
+        "version":dt.version()
+    }
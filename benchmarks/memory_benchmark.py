@@ -0,0 +1,234 @@
+import os
+import time
+import asyncio
+from shutil import rmtree
+from typing import Any, Dict, List
+
+import numpy as np
+
+from gyaan.structure.memory import Memory
+from gyaan.structure.index import MemoryIndex
+from benchmarks.harness import OperationStats, RSSSampler, table_files
+
+WORDS=["alpha","beta","gamma","delta","paris","berlin","tokyo","python","rust","graph",
+       "memory","vector","search","delta","lake","node","edge","keyword","index","cache"]
+
+def node_batch(
+    rng: np.random.Generator,
+    size: int,
+    dim: int):
+
+    terms=rng.integers(0, len(WORDS), size=(size,3))
+    return {
+        "labels":[f"node-{i}" for i in rng.integers(0, 1<<31, size=size)],
+        "weights":rng.random(size).tolist(),
+        "descriptions":[" ".join(WORDS[t] for t in row) for row in terms.tolist()],
+        "keywords":[[WORDS[row[0]]] for row in terms.tolist()],
+        "embeddings":rng.standard_normal((size,dim),dtype=np.float32).tolist(),
+        "impact":rng.integers(0, 10, size=size).tolist()
+    }
+
+def edge_batch(
+    rng: np.random.Generator,
+    node_ids: np.ndarray,
+    size: int,
+    dim: int):
+
+    return {
+        "source_nodes":rng.choice(node_ids, size=size).tolist(),
+        "target_nodes":rng.choice(node_ids, size=size).tolist(),
+        "labels":["relates_to"]*size,
+        "weights":rng.random(size).tolist(),
+        "descriptions":["benchmark edge"]*size,
+        "keywords":[["edge"]]*size,
+        "embeddings":rng.standard_normal((size,dim),dtype=np.float32).tolist(),
+        "type":["benchmark"]*size
+    }
+
+async def timed_loop(
+    stats: OperationStats,
+    operations: int,
+    operation,
+    rows: int=1):
+
+    start=time.perf_counter()
+    for i in range(operations):
+        with stats.measure(rows):
+            await operation(i)
+    stats.wall_time=time.perf_counter()-start
+    return stats
+
+async def concurrent_writes(
+    mem: Memory,
+    rng: np.random.Generator,
+    writers: int,
+    batch_size: int,
+    dim: int):
+
+    stats=OperationStats("concurrent_add_nodes")
+    batches=[node_batch(rng, batch_size, dim) for _ in range(writers)]
+
+    async def write(batch):
+        with stats.measure(batch_size):
+            await mem.add_nodes(**batch)
+
+    start=time.perf_counter()
+    await asyncio.gather(*[write(batch) for batch in batches])
+    stats.wall_time=time.perf_counter()-start
+    return stats
+
+async def bench_memory(
+    path: str,
+    num_nodes: int,
+    dim: int,
+    batch_size: int,
+    queries: int,
+    writers: int,
+    fixed_width: bool,
+    seed: int=0) -> Dict[str,Any]:
+    """Drives one memory through ingest, point reads, updates, deletes, search and traversal."""
+
+    rng=np.random.default_rng(seed)
+    results: Dict[str,Any]={}
+
+    with RSSSampler() as rss:
+        mem=await Memory.create(
+            memory_path=path,
+            title="Benchmark",
+            description="Benchmark memory.",
+            embedding=[0.0]*dim,
+            keywords=["benchmark"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=dim if fixed_width else None
+        )
+
+        node_ids=[]
+        num_batches=max(1, num_nodes//batch_size)
+
+        async def add_nodes(_):
+            node_ids.extend(await mem.add_nodes(**node_batch(rng, batch_size, dim)))
+        results["add_nodes"]=(await timed_loop(OperationStats("add_nodes"), num_batches, add_nodes, batch_size)).summary()
+        node_array=np.array(node_ids, dtype=object)
+
+        edge_ids=[]
+        async def add_edges(_):
+            edge_ids.extend(await mem.add_edges(**edge_batch(rng, node_array, batch_size, dim)))
+        results["add_edges"]=(await timed_loop(OperationStats("add_edges"), num_batches, add_edges, batch_size)).summary()
+        results["ingest_peak_rss"]=rss.peak
+
+        async def get_by_id(_):
+            await mem.get_nodes_by_id(rng.choice(node_array, size=10).tolist())
+        results["get_nodes_by_id"]=(await timed_loop(OperationStats("get_nodes_by_id"), queries, get_by_id, 10)).summary()
+        edge_array=np.array(edge_ids, dtype=object)
+
+        async def get_edges_by_id(_):
+            await mem.get_edges_by_id(rng.choice(edge_array, size=10).tolist())
+        results["get_edges_by_id"]=(await timed_loop(OperationStats("get_edges_by_id"), queries, get_edges_by_id, 10)).summary()
+
+        async def search(_):
+            await mem.search_nodes(rng.standard_normal(dim).tolist(), k=10)
+        results["search_nodes"]=(await timed_loop(OperationStats("search_nodes"), queries, search)).summary()
+
+        async def hybrid(_):
+            text=" ".join(rng.choice(WORDS, size=2))
+            await mem.hybrid_search(text, rng.standard_normal(dim).tolist(), k=10)
+        results["hybrid_search"]=(await timed_loop(OperationStats("hybrid_search"), queries, hybrid)).summary()
+
+        async def neighbors(_):
+            await mem.neighbors(rng.choice(node_array), direction="both")
+        results["neighbors"]=(await timed_loop(OperationStats("neighbors"), queries, neighbors)).summary()
+
+        update_size=min(100, len(node_ids))
+        async def update(_):
+            ids=rng.choice(node_array, size=update_size, replace=False).tolist()
+            await mem.update_nodes(node_ids=ids, weight=rng.random(update_size).tolist())
+        results["update_nodes"]=(await timed_loop(OperationStats("update_nodes"), max(1, queries//10), update, update_size)).summary()
+
+        edge_update_size=min(100, len(edge_ids))
+        async def update_edges(_):
+            ids=rng.choice(edge_array, size=edge_update_size, replace=False).tolist()
+            await mem.update_edges(edge_ids=ids, weight=rng.random(edge_update_size).tolist())
+        results["update_edges"]=(await timed_loop(OperationStats("update_edges"), max(1, queries//10), update_edges, edge_update_size)).summary()
+
+        # Each delete takes the next slice of ids, so small scales run fewer deletes
+        async def delete(i):
+            await mem.delete_nodes(node_ids=node_ids[i*update_size:(i+1)*update_size])
+        deletes=max(1, min(queries//10, len(node_ids)//update_size))
+        results["delete_nodes"]=(await timed_loop(OperationStats("delete_nodes"), deletes, delete, update_size)).summary()
+
+        async def delete_edges(i):
+            await mem.delete_edges(edge_ids=edge_ids[i*edge_update_size:(i+1)*edge_update_size])
+        deletes=max(1, min(queries//10, len(edge_ids)//edge_update_size))
+        results["delete_edges"]=(await timed_loop(OperationStats("delete_edges"), deletes, delete_edges, edge_update_size)).summary()
+
+        results["concurrent_add_nodes"]=(await concurrent_writes(mem, rng, writers, batch_size, dim)).summary()
+
+    results["peak_rss"]=rss.peak
+    results["tables"]={
+        "nodes":table_files(mem.nodes_path),
+        "edges":table_files(mem.edges_path)
+    }
+    return results
+
+async def bench_memory_index(
+    path: str,
+    num_memories: int,
+    dim: int,
+    queries: int,
+    seed: int=0) -> Dict[str,Any]:
+    """Registers many small memories in one MemoryIndex and searches them."""
+
+    rng=np.random.default_rng(seed)
+    results: Dict[str,Any]={}
+
+    with RSSSampler() as rss:
+        memory_index=await MemoryIndex.create(index_path=os.path.join(path,"index"))
+
+        async def add(i):
+            mem=await Memory.create(
+                memory_path=os.path.join(path,f"memory-{i}"),
+                title=f"Memory {i}",
+                description=" ".join(rng.choice(WORDS, size=5)),
+                embedding=rng.standard_normal(dim).tolist(),
+                keywords=rng.choice(WORDS, size=2).tolist(),
+                node_attributes={"impact":int},
+                edge_attributes={"type":str}
+            )
+            await memory_index.add(mem)
+        results["add"]=(await timed_loop(OperationStats("add"), num_memories, add)).summary()
+
+        async def search(_):
+            await memory_index.search(vector=rng.standard_normal(dim).tolist(), keywords=rng.choice(WORDS, size=2).tolist(), k=5)
+        results["search"]=(await timed_loop(OperationStats("search"), queries, search)).summary()
+
+    results["peak_rss"]=rss.peak
+    results["tables"]={"index":table_files(memory_index.index_path)}
+    return results
+
+async def run(
+    scales: List[int],
+    dim: int,
+    batch_size: int,
+    queries: int,
+    writers: int,
+    memories: int,
+    fixed_width: bool,
+    workdir: str,
+    keep: bool=False) -> Dict[str,Any]:
+
+    report: Dict[str,Any]={"memory":{}, "memory_index":None}
+    try:
+        for num_nodes in scales:
+            path=os.path.join(workdir, f"memory-{num_nodes}")
+            report["memory"][str(num_nodes)]=await bench_memory(
+                path, num_nodes, dim, min(batch_size, num_nodes), queries, writers, fixed_width)
+            if not keep:
+                rmtree(path, ignore_errors=True)
+
+        if memories:
+            report["memory_index"]=await bench_memory_index(os.path.join(workdir, "index"), memories, dim, queries)
+    finally:
+        if not keep:
+            rmtree(workdir, ignore_errors=True)
+    return report
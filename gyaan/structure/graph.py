@@ -0,0 +1,387 @@
+import numpy as np
+import polars as pl
+
+from typing import Optional, List, Set
+
+DIRECTIONS=("out","in","both")
+
+def expand_ranges(
+    starts: np.ndarray,
+    ends: np.ndarray):
+
+    lengths=ends-starts
+    total=int(lengths.sum())
+    if total==0:
+        return np.empty(0,dtype=np.int64)
+    offsets=np.repeat(starts-np.concatenate([[0],np.cumsum(lengths)[:-1]]), lengths)
+    return offsets+np.arange(total)
+
+class NodeIdSet():
+    """
+    Hash set of live node ids, kept in step with the nodes table so endpoint
+    checks cost O(batch) instead of a scan over the graph.
+    """
+
+    def __init__(
+        self,
+        id_column: str="node_id"):
+
+        self.id_column=id_column
+        self.ids: Set[str]=set()
+
+    def build(
+        self,
+        frame: pl.DataFrame):
+
+        self.ids=set()
+        self.append(frame)
+
+    def append(
+        self,
+        batch_df: pl.DataFrame):
+
+        if "deleted" in batch_df.columns:
+            batch_df=batch_df.filter(~pl.col("deleted").fill_null(False))
+        self.ids.update(batch_df[self.id_column].to_list())
+
+    def patch(
+        self,
+        batch_df: pl.DataFrame):
+
+        if "deleted" not in batch_df.columns:
+            return
+        deleted=batch_df["deleted"]
+        self.ids.difference_update(batch_df.filter(deleted)[self.id_column].to_list())
+        self.ids.update(batch_df.filter(~deleted)[self.id_column].to_list())
+
+    def missing(
+        self,
+        node_ids: List[str]):
+
+        return [node_id for node_id in dict.fromkeys(node_ids) if node_id not in self.ids]
+
+class AdjacencyIndex():
+    """
+    Compressed adjacency over the edges table.
+
+    Edges are kept as append-only COO arrays of integer node ordinals with a
+    liveness mask. CSR (by source) and CSC (by target) offsets are rebuilt
+    lazily; edges appended since the last rebuild are answered from the short
+    unindexed tail until it outgrows `rebuild_ratio` of the indexed edges.
+    """
+
+    def __init__(
+        self,
+        id_column: str="edge_id",
+        source_column: str="source_node_id",
+        target_column: str="target_node_id",
+        weight_column: str="weight",
+        rebuild_ratio: float=0.1,
+        min_rebuild: int=1024):
+
+        self.id_column=id_column
+        self.source_column=source_column
+        self.target_column=target_column
+        self.weight_column=weight_column
+        self.rebuild_ratio=rebuild_ratio
+        self.min_rebuild=min_rebuild
+        self._reset()
+
+    def _reset(self):
+        self.node_ids=[]
+        self.ordinal_of={}
+        self.edge_ids=[]
+        self.row_of={}
+        self.size=0
+        self.src=np.empty(0,dtype=np.int64)
+        self.dst=np.empty(0,dtype=np.int64)
+        self.weights=np.empty(0,dtype=np.float64)
+        self.alive=np.empty(0,dtype=bool)
+        self._offsets=None
+        self._transitions={}
+        self.indexed_size=0
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    def _ordinals(
+        self,
+        node_ids: List[str]):
+
+        ordinals=np.empty(len(node_ids),dtype=np.int64)
+        for i,node_id in enumerate(node_ids):
+            ordinal=self.ordinal_of.get(node_id)
+            if ordinal is None:
+                ordinal=len(self.node_ids)
+                self.ordinal_of[node_id]=ordinal
+                self.node_ids.append(node_id)
+            ordinals[i]=ordinal
+        return ordinals
+
+    def lookup(
+        self,
+        node_ids: List[str]):
+
+        return np.array([self.ordinal_of[node_id] for node_id in node_ids if node_id in self.ordinal_of],dtype=np.int64)
+
+    def _reserve(
+        self,
+        extra: int):
+
+        needed=self.size+extra
+        capacity=self.src.shape[0]
+        if needed<=capacity:
+            return
+        grow=max(needed, 2*capacity, 64)-capacity
+        self.src=np.concatenate([self.src, np.zeros(grow,dtype=np.int64)])
+        self.dst=np.concatenate([self.dst, np.zeros(grow,dtype=np.int64)])
+        self.weights=np.concatenate([self.weights, np.zeros(grow,dtype=np.float64)])
+        self.alive=np.concatenate([self.alive, np.zeros(grow,dtype=bool)])
+
+    def build(
+        self,
+        frame: pl.DataFrame):
+
+        self._reset()
+        endpoints=pl.concat([frame[self.source_column], frame[self.target_column]]).unique(maintain_order=True)
+        self.node_ids=endpoints.to_list()
+        self.ordinal_of=dict(zip(self.node_ids, range(len(self.node_ids))))
+        ordinals=pl.Series(range(len(self.node_ids)),dtype=pl.Int64)
+
+        self._reserve(frame.height)
+        self.size=frame.height
+        self.src[:self.size]=frame[self.source_column].replace_strict(endpoints, ordinals, return_dtype=pl.Int64).to_numpy()
+        self.dst[:self.size]=frame[self.target_column].replace_strict(endpoints, ordinals, return_dtype=pl.Int64).to_numpy()
+        self.weights[:self.size]=frame[self.weight_column].fill_null(0.0).to_numpy()
+        self.alive[:self.size]=~frame["deleted"].fill_null(False).to_numpy() if "deleted" in frame.columns else True
+        self.edge_ids=frame[self.id_column].to_list()
+        self.row_of=dict(zip(self.edge_ids, range(self.size)))
+
+    def append(
+        self,
+        batch_df: pl.DataFrame):
+
+        if batch_df.height==0:
+            return
+        self._transitions={}
+        rows=slice(self.size, self.size+batch_df.height)
+        self._reserve(batch_df.height)
+        self.src[rows]=self._ordinals(batch_df[self.source_column].to_list())
+        self.dst[rows]=self._ordinals(batch_df[self.target_column].to_list())
+        self.weights[rows]=batch_df[self.weight_column].fill_null(0.0).to_numpy()
+        self.alive[rows]=~batch_df["deleted"].fill_null(False).to_numpy() if "deleted" in batch_df.columns else True
+
+        edge_ids=batch_df[self.id_column].to_list()
+        self.row_of.update(zip(edge_ids, range(self.size, self.size+batch_df.height)))
+        self.edge_ids.extend(edge_ids)
+        self.size+=batch_df.height
+
+    def patch(
+        self,
+        batch_df: pl.DataFrame):
+
+        self._transitions={}
+        rows=np.array([self.row_of.get(i,-1) for i in batch_df[self.id_column].to_list()],dtype=np.int64)
+        known=pl.Series(rows>=0)
+        rows=rows[rows>=0]
+
+        if "deleted" in batch_df.columns:
+            self.alive[rows]=~batch_df["deleted"].filter(known).fill_null(False).to_numpy()
+        if self.weight_column in batch_df.columns:
+            self.weights[rows]=batch_df[self.weight_column].filter(known).fill_null(0.0).to_numpy()
+        # Full-row patches (e.g. replayed from the commit log) usually carry
+        # unchanged endpoints; only a real move invalidates the offsets.
+        if self.source_column in batch_df.columns:
+            ordinals=self._ordinals(batch_df[self.source_column].filter(known).to_list())
+            if not np.array_equal(self.src[rows], ordinals):
+                self.src[rows]=ordinals
+                self._offsets=None
+        if self.target_column in batch_df.columns:
+            ordinals=self._ordinals(batch_df[self.target_column].filter(known).to_list())
+            if not np.array_equal(self.dst[rows], ordinals):
+                self.dst[rows]=ordinals
+                self._offsets=None
+
+    def _ensure_offsets(self):
+        tail=self.size-self.indexed_size
+        if self._offsets is not None and tail<=max(self.min_rebuild, self.rebuild_ratio*self.indexed_size):
+            return
+
+        self._offsets={}
+        for direction,keys in (("out",self.src),("in",self.dst)):
+            keys=keys[:self.size]
+            indptr=np.zeros(self.num_nodes+1,dtype=np.int64)
+            np.cumsum(np.bincount(keys, minlength=self.num_nodes), out=indptr[1:])
+            self._offsets[direction]=(indptr, np.argsort(keys, kind="stable"))
+        self.indexed_size=self.size
+
+    def edge_rows(
+        self,
+        ordinals: np.ndarray,
+        direction: str="out"):
+
+        assert direction in ("out","in"), "Direction must be out or in"
+        self._ensure_offsets()
+
+        indptr,order=self._offsets[direction]
+        indexed=ordinals[ordinals<indptr.shape[0]-1]
+        rows=order[expand_ranges(indptr[indexed], indptr[indexed+1])]
+
+        if self.indexed_size<self.size:
+            keys=self.src if direction=="out" else self.dst
+            tail=np.arange(self.indexed_size, self.size)
+            rows=np.concatenate([rows, tail[np.isin(keys[tail], ordinals)]])
+        return rows[self.alive[rows]]
+
+    def incident_edges(
+        self,
+        node_ids: List[str]):
+
+        ordinals=self.lookup(node_ids)
+        rows=np.unique(np.concatenate([self.edge_rows(ordinals,"out"), self.edge_rows(ordinals,"in")]))
+        return [self.edge_ids[row] for row in rows.tolist()]
+
+    def neighbor_ordinals(
+        self,
+        ordinals: np.ndarray,
+        direction: str="out"):
+
+        assert direction in DIRECTIONS, f"Direction must be one of {DIRECTIONS}"
+        if direction=="out":
+            return self.dst[self.edge_rows(ordinals,"out")]
+        if direction=="in":
+            return self.src[self.edge_rows(ordinals,"in")]
+        return np.concatenate([self.dst[self.edge_rows(ordinals,"out")], self.src[self.edge_rows(ordinals,"in")]])
+
+    def neighbors(
+        self,
+        node_id: str,
+        direction: str="out"):
+
+        ordinals=self.neighbor_ordinals(self.lookup([node_id]), direction)
+        return [self.node_ids[i] for i in dict.fromkeys(ordinals.tolist())]
+
+    def degree(
+        self,
+        node_id: str,
+        direction: str="out"):
+
+        return int(self.neighbor_ordinals(self.lookup([node_id]), direction).shape[0])
+
+    def k_hop(
+        self,
+        node_ids: List[str],
+        k: int=1,
+        direction: str="out"):
+
+        visited=np.zeros(self.num_nodes,dtype=bool)
+        frontier=self.lookup(node_ids)
+        visited[frontier]=True
+        reached=[]
+        for _ in range(k):
+            if frontier.shape[0]==0:
+                break
+            candidates=np.unique(self.neighbor_ordinals(frontier, direction))
+            frontier=candidates[~visited[candidates]]
+            visited[frontier]=True
+            reached.append(frontier)
+
+        reached=np.concatenate(reached) if reached else np.empty(0,dtype=np.int64)
+        return [self.node_ids[i] for i in reached.tolist()]
+
+    def transition(
+        self,
+        direction: str="out",
+        weighted: bool=True):
+        """
+        Row-stochastic transition matrix over live edges as COO arrays
+        (src, dst, probability) plus the mask of nodes with no outgoing
+        weight. Edge weights are clipped at zero; cached until the next
+        append or patch.
+        """
+
+        assert direction in DIRECTIONS, f"Direction must be one of {DIRECTIONS}"
+        key=(direction, weighted)
+        if key not in self._transitions:
+            live=np.flatnonzero(self.alive[:self.size])
+            src,dst=self.src[live],self.dst[live]
+            weights=np.clip(self.weights[live], 0.0, None) if weighted else np.ones(live.shape[0])
+            if direction=="in":
+                src,dst=dst,src
+            elif direction=="both":
+                src,dst,weights=np.concatenate([src,dst]), np.concatenate([dst,src]), np.concatenate([weights,weights])
+
+            keep=weights>0
+            src,dst,weights=src[keep],dst[keep],weights[keep]
+            out_weight=np.bincount(src, weights=weights, minlength=self.num_nodes)
+            self._transitions[key]=(src, dst, weights/out_weight[src], out_weight==0)
+        return self._transitions[key]
+
+    def _seed_vector(
+        self,
+        seeds: np.ndarray,
+        seed_weights: Optional[np.ndarray]):
+
+        vector=np.zeros(self.num_nodes,dtype=np.float64)
+        np.add.at(vector, seeds, 1.0 if seed_weights is None else seed_weights)
+        return vector
+
+    def personalized_pagerank(
+        self,
+        seeds: np.ndarray,
+        seed_weights: Optional[np.ndarray]=None,
+        alpha: float=0.85,
+        max_iterations: int=100,
+        tolerance: float=1e-6,
+        direction: str="out",
+        weighted: bool=True):
+        """
+        Power iteration for PageRank restarted at `seeds`; `alpha` is the
+        probability of following an edge rather than jumping back. Mass that
+        reaches a node without outgoing edges is returned to the seeds.
+        Returns a score per node ordinal, summing to one.
+        """
+
+        restart=self._seed_vector(seeds, seed_weights)
+        if restart.sum()<=0:
+            return restart
+        restart/=restart.sum()
+
+        src,dst,probability,dangling=self.transition(direction, weighted)
+        scores=restart.copy()
+        for _ in range(max_iterations):
+            spread=np.bincount(dst, weights=scores[src]*probability, minlength=self.num_nodes)
+            updated=alpha*spread+(alpha*scores[dangling].sum()+1.0-alpha)*restart
+            converged=np.abs(updated-scores).sum()<tolerance
+            scores=updated
+            if converged:
+                break
+        return scores
+
+    def spreading_activation(
+        self,
+        seeds: np.ndarray,
+        seed_weights: Optional[np.ndarray]=None,
+        decay: float=0.5,
+        hops: int=3,
+        threshold: float=1e-3,
+        direction: str="out",
+        weighted: bool=True):
+        """
+        Seeds start with unit (or `seed_weights`) activation. On each hop,
+        every node at or above `threshold` fires, splitting `decay` times its
+        activation across its edges in proportion to their weight. Returns
+        the activation accumulated over all hops per node ordinal.
+        """
+
+        activation=self._seed_vector(seeds, seed_weights)
+        total=activation.copy()
+        src,dst,probability,_=self.transition(direction, weighted)
+        for _ in range(hops):
+            firing=np.where(activation>=threshold, activation, 0.0)
+            if not firing.any():
+                break
+            activation=decay*np.bincount(dst, weights=firing[src]*probability, minlength=self.num_nodes)
+            total+=activation
+        return total
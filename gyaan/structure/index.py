@@ -1,14 +1,91 @@
 from gyaan.structure.schema import MEMORY_SCHEMA
 from gyaan.structure.memory import Memory
+from gyaan.structure.vector import VectorIndex
+from gyaan.structure.keyword import KeywordIndex, reciprocal_rank_fusion
 from gyaan.utils.io import *
+from gyaan.utils.maintenance import MaintenanceScheduler, MaintenancePolicy
 
 
 import polars as pl
+import numpy as np
+import psutil
 import asyncio
+import heapq
+import itertools
+import multiprocessing
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
-from typing import Optional,Dict, List, Any
+from typing import Optional,Dict, List, Tuple, NamedTuple
 import os
 
+# Memories opened by this process for search_across, and when each was last refreshed
+_search_cache: Optional["MemoryPool"]=None
+_search_refreshed: Dict[Tuple[str,str],float]={}
+_search_loop=None
+
+def _clear_search_cache():
+    global _search_cache
+    if _search_cache is not None:
+        _search_cache.clear()
+    _search_cache=None
+    _search_refreshed.clear()
+
+async def _search_memories(
+    requests: List[Tuple[str,str]],
+    table: str,
+    query_vector: Optional[List[float]],
+    text: Optional[str],
+    k: int,
+    max_staleness: float,
+    cache_bytes: int):
+
+    global _search_cache
+    if _search_cache is None or _search_cache.max_bytes!=cache_bytes:
+        _clear_search_cache()
+        _search_cache=MemoryPool(max_bytes=cache_bytes)
+
+    results=[]
+    for memory_path,memory_id in requests:
+        start=time.perf_counter()
+        key=(memory_path,memory_id)
+        cached=key in _search_cache
+        memory=await _search_cache.get(memory_path, memory_id)
+        if not cached or time.monotonic()-_search_refreshed.get(key,0.0)>max_staleness:
+            if cached:
+                await memory.refresh()
+            _search_refreshed[key]=time.monotonic()
+
+        if text:
+            search=memory.hybrid_search if table=="nodes" else memory.hybrid_search_edges
+            hits=await search(text, query_vector, k=k)
+        else:
+            search=memory.search_nodes if table=="nodes" else memory.search_edges
+            hits=await search(query_vector, k=k)
+        results.append((memory_id, hits, time.perf_counter()-start, cached))
+
+    # Forget refresh times of memories the pool has evicted
+    for key in [key for key in _search_refreshed if key not in _search_cache]:
+        del _search_refreshed[key]
+    return results
+
+def _search_worker(
+    requests: List[Tuple[str,str]],
+    table: str,
+    query_vector: Optional[List[float]],
+    text: Optional[str],
+    k: int,
+    max_staleness: float,
+    cache_bytes: int):
+
+    # One loop per worker for its lifetime: cached memories hold loop-bound locks
+    global _search_loop
+    if _search_loop is None:
+        _search_loop=asyncio.new_event_loop()
+    return _search_loop.run_until_complete(_search_memories(requests, table, query_vector, text, k, max_staleness, cache_bytes))
+
 class MemoryIndex():
 
     def __init__(
@@ -17,38 +94,346 @@ class MemoryIndex():
 
         self.index_path=os.path.abspath(index_path)
         self._lock=asyncio.Lock()
-    
+        self.vector_index=VectorIndex("id")
+        self.keyword_index=KeywordIndex("id")
+        self._last_write=time.monotonic()
+        self.maintenance=None
+        self._search_pool: List[ProcessPoolExecutor]=[]
+
     async def _init_index_table(self):
         self.index=pl.DataFrame(schema=MEMORY_SCHEMA)
         await create_table(f"file://{self.index_path}", self.index)
+        self._build_search_indexes()
+
+    def _build_search_indexes(self):
+        self.keyword_index.build(self.index)
+
+        # Memories may carry embeddings of different sizes (or none at all);
+        # only the most common non-empty dimension is vector searchable.
+        lengths=self.index["embedding"].list.len().fill_null(0)
+        dims=lengths.filter(lengths>0)
+        dim=dims.mode().sort()[0] if dims.len()>0 else 0
+        self.vector_index.build(self.index.filter(lengths==dim) if dim>0 else self.index.clear())
 
-    
     @classmethod
     async def create(
         cls,
         index_path:str):
-        
+
         index=cls(index_path)
         await index._init_index_table()
         return index
-    
+
+    @classmethod
+    async def load(
+        cls,
+        index_path:str):
+
+        index=cls(index_path)
+        index.index=await read_table(f"file://{index.index_path}")
+        if index.index is None:
+            raise ValueError("Memory index not found")
+        index._build_search_indexes()
+        return index
+
     async def add(
         self,
         memory: Memory):
-        
-        metadata_df=await read_table(f"file://{memory.metadata_path}")
-        
-        await insert_table(f"file://{self.index_path}", metadata_df)
+
+        metadata_df=await memory.read_metadata()
+
+        # Indexes and memories may predate metadata columns added since; merge the schemas
+        await insert_table(f"file://{self.index_path}", metadata_df, schema_mode="merge")
+        self._last_write=time.monotonic()
         async with self._lock:
             self.index=await read_table(f"file://{self.index_path}")
+            self._build_search_indexes()
 
     async def remove(
         self,
         memory: Memory):
-    
-        metadata_df=await read_table(f"file://{memory.metadata_path}")
-        
+
+        metadata_df=await memory.read_metadata()
+
         await delete_rows(f"file://{self.index_path}", metadata_df)
+        self._last_write=time.monotonic()
         async with self._lock:
             self.index=await read_table(f"file://{self.index_path}")
-        
\ No newline at end of file
+            self._build_search_indexes()
+
+    def idle_time(self):
+        return time.monotonic()-self._last_write
+
+    def _maintenance_scheduler(
+        self,
+        policy: Optional[MaintenancePolicy]=None):
+
+        if self.maintenance is None:
+            self.maintenance=MaintenanceScheduler(
+                tables={"index":(f"file://{self.index_path}",["id"])},
+                policy=policy,
+                idle_time=self.idle_time)
+        elif policy is not None:
+            self.maintenance.policy=policy
+        return self.maintenance
+
+    def start_maintenance(
+        self,
+        policy: Optional[MaintenancePolicy]=None):
+
+        return self._maintenance_scheduler(policy).start()
+
+    async def stop_maintenance(self):
+        if self.maintenance is not None:
+            await self.maintenance.stop()
+
+    async def maintain(
+        self,
+        force: bool=False):
+
+        return await self._maintenance_scheduler().check(force)
+
+    async def search(
+        self,
+        vector: Optional[List[float]]=None,
+        keywords: Optional[List[str]]=None,
+        k: int=10,
+        candidates: Optional[int]=None):
+
+        candidates=candidates or 10*k
+        rankings=[]
+        if vector is not None and self.vector_index.dim==len(vector):
+            ids,_=self.vector_index.search(vector, k=candidates)
+            rankings.append(np.array(ids,dtype=object))
+        if keywords:
+            rankings.append(self.keyword_index.match_keywords(keywords, candidates))
+
+        ids,scores=reciprocal_rank_fusion(rankings, k=k)
+        hits=pl.DataFrame({"id":ids.tolist(),"score":scores.tolist()},schema={"id":pl.String,"score":pl.Float64})
+        return hits.join(self.index, on="id", how="left").select(self.index.columns+["score"])
+
+    def _search_workers(
+        self,
+        processes: int):
+
+        if len(self._search_pool)!=processes:
+            self.close_search_pool()
+            context=multiprocessing.get_context("spawn")
+            self._search_pool=[ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(processes)]
+        return self._search_pool
+
+    def close_search_pool(self):
+        for worker in self._search_pool:
+            worker.shutdown(wait=False, cancel_futures=True)
+        self._search_pool=[]
+        _clear_search_cache()
+
+    async def search_across(
+        self,
+        memory_ids: Optional[List[str]]=None,
+        query_vector: Optional[List[float]]=None,
+        k: int=10,
+        text: Optional[str]=None,
+        table: str="nodes",
+        processes: Optional[int]=None,
+        max_staleness: float=1.0,
+        cache_bytes: int=2**30):
+        """
+        Top-k nodes (or edges) over `memory_ids` (every indexed memory by
+        default) at once. Each memory is searched with search_nodes, or
+        hybrid_search when `text` is given, in one of `processes` worker
+        processes (0 searches inline). A memory is always routed to the same
+        worker, which keeps it in a MemoryPool of `cache_bytes` and refreshes
+        it at most every `max_staleness` seconds. The per-memory top-k lists
+        are merged with a heap.
+
+        Returns (hits, timings): the global top k with their `memory_id` and
+        `score`, and per memory the worker, the seconds it took, and whether
+        it was already loaded.
+        """
+
+        assert table in ("nodes","edges"), "Table must be nodes or edges"
+        assert query_vector is not None or text, "A query vector or text is required"
+
+        catalog=self.index.filter(pl.col("deleted") == False)
+        if memory_ids is not None:
+            catalog=catalog.filter(pl.col("id").is_in(memory_ids))
+            missing=set(memory_ids)-set(catalog["id"].to_list())
+            if missing:
+                raise ValueError(f"Memories are not in the index: {sorted(missing)[:5]}")
+        requests=list(zip(catalog["memory_storage_path"].to_list(), catalog["id"].to_list()))
+
+        processes=(os.cpu_count() or 1) if processes is None else processes
+        if processes==0:
+            results=[(0,result) for result in await _search_memories(requests, table, query_vector, text, k, max_staleness, cache_bytes)]
+        else:
+            workers=self._search_workers(processes)
+            groups: Dict[int,List[Tuple[str,str]]]={}
+            for request in requests:
+                groups.setdefault(zlib.crc32(request[1].encode())%processes,[]).append(request)
+            loop=asyncio.get_running_loop()
+            batches=await asyncio.gather(*[
+                loop.run_in_executor(workers[worker], _search_worker, group, table, query_vector, text, k, max_staleness, cache_bytes)
+                for worker,group in groups.items()])
+            results=[(worker,result) for worker,batch in zip(groups, batches) for result in batch]
+
+        ranked=heapq.merge(*[[(-score,i,j) for j,score in enumerate(hits["score"].to_list())] for i,(_,(_,hits,_,_)) in enumerate(results)])
+        top=list(itertools.islice(ranked, k))
+        hits=pl.concat([results[i][1][1].slice(j,1) for _,i,j in top], how="diagonal_relaxed") if top else pl.DataFrame(schema={"memory_id":pl.String,"score":pl.Float64})
+        timings=pl.DataFrame(
+            [(memory_id, worker, seconds, cached) for worker,(memory_id,_,seconds,cached) in results],
+            schema={"memory_id":pl.String,"worker":pl.Int64,"seconds":pl.Float64,"cached":pl.Boolean},
+            orient="row")
+        return hits, timings
+
+    async def open_top_k(
+        self,
+        vector: Optional[List[float]]=None,
+        keywords: Optional[List[str]]=None,
+        k: int=10,
+        lazy: bool=False,
+        pool: Optional["MemoryPool"]=None):
+        """Load the top-k memories, through `pool` when given (which decides `lazy` itself)."""
+
+        hits=await self.search(vector=vector, keywords=keywords, k=k)
+        return await asyncio.gather(*[
+            pool.get(memory_path, memory_id) if pool is not None else Memory.load(memory_path, lazy=lazy, memory_id=memory_id)
+            for memory_path,memory_id in zip(hits["memory_storage_path"].to_list(), hits["id"].to_list())
+        ])
+
+class PoolStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    memories: int
+    bytes: int
+
+class MemoryPool():
+    """
+    Least recently used Memory objects, kept loaded with their derived
+    indexes. The pool is bounded by `max_bytes` of Memory.estimated_size,
+    by the process RSS `max_rss`, or both. Past a bound, the coldest
+    memories are dropped until enough estimated bytes are freed, but the
+    memory just requested is always kept.
+
+    Concurrent gets of a memory that is not loaded share a single load.
+    Callers that join a load in flight count as hits.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int]=None,
+        max_rss: Optional[int]=None,
+        lazy: bool=False,
+        mmap_embeddings: bool=False):
+
+        assert max_bytes is not None or max_rss is not None, "A byte or RSS budget is required"
+        self.max_bytes=max_bytes
+        self.max_rss=max_rss
+        self.lazy=lazy
+        self.mmap_embeddings=mmap_embeddings
+        # Each memory with its estimated size and the table versions it was measured at
+        self._memories: OrderedDict[Tuple[str,Optional[str]],Tuple[Memory,int,Dict[str,int]]]=OrderedDict()
+        self._loading: Dict[Tuple[str,Optional[str]],asyncio.Future]={}
+        self.bytes=0
+        self.hits=0
+        self.misses=0
+        self.evictions=0
+
+    def __len__(self):
+        return len(self._memories)
+
+    def __contains__(
+        self,
+        key: Tuple[str,Optional[str]]):
+
+        memory_path,memory_id=key
+        return (os.path.abspath(memory_path),memory_id) in self._memories
+
+    def stats(self):
+        return PoolStats(self.hits, self.misses, self.evictions, len(self._memories), self.bytes)
+
+    async def get(
+        self,
+        memory_path: str,
+        memory_id: Optional[str]=None):
+
+        key=(os.path.abspath(memory_path),memory_id)
+        if key in self._memories:
+            self.hits+=1
+            self._memories.move_to_end(key)
+            memory,_,versions=self._memories[key]
+            # Writes and refreshes change the memory in place
+            if memory.table_versions!=versions:
+                self._track(key, memory)
+            return memory
+        if key in self._loading:
+            self.hits+=1
+            return await asyncio.shield(self._loading[key])
+
+        self.misses+=1
+        future=asyncio.get_running_loop().create_future()
+        self._loading[key]=future
+        try:
+            memory=await Memory.load(memory_path, lazy=self.lazy, mmap_embeddings=self.mmap_embeddings, memory_id=memory_id)
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting on the shared load
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+        self._track(key, memory)
+        future.set_result(memory)
+        return memory
+
+    def _track(
+        self,
+        key: Tuple[str,Optional[str]],
+        memory: Memory):
+
+        size=memory.estimated_size()
+        if key in self._memories:
+            self.bytes-=self._memories[key][1]
+        self._memories[key]=(memory,size,dict(memory.table_versions))
+        self.bytes+=size
+        self._evict(key)
+
+    def _excess(self):
+        excess=0
+        if self.max_bytes is not None:
+            excess=max(excess, self.bytes-self.max_bytes)
+        if self.max_rss is not None:
+            excess=max(excess, psutil.Process().memory_info().rss-self.max_rss)
+        return excess
+
+    def _evict(
+        self,
+        keep: Tuple[str,Optional[str]]):
+
+        # RSS does not drop as soon as a memory is released, so free by estimate
+        excess=self._excess()
+        while excess>0 and len(self._memories)>1:
+            key=next(iter(self._memories))
+            if key==keep:
+                self._memories.move_to_end(key)
+                key=next(iter(self._memories))
+            size=self._memories.pop(key)[1]
+            self.bytes-=size
+            self.evictions+=1
+            excess-=size
+
+    def evict(
+        self,
+        memory_path: str,
+        memory_id: Optional[str]=None):
+
+        key=(os.path.abspath(memory_path),memory_id)
+        if key in self._memories:
+            self.bytes-=self._memories.pop(key)[1]
+            self.evictions+=1
+
+    def clear(self):
+        self.evictions+=len(self._memories)
+        self._memories.clear()
+        self.bytes=0
@@ -0,0 +1,251 @@
+import numpy as np
+import polars as pl
+
+from typing import Optional, List, Dict, Tuple
+import re
+import sys
+
+TOKEN_PATTERN=re.compile(r"\w+")
+
+def tokenize(
+    text: Optional[str]):
+
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+def normalize_keywords(
+    keywords: Optional[List[str]]):
+
+    return [keyword.strip().lower() for keyword in keywords] if keywords else []
+
+def reciprocal_rank_fusion(
+    rankings: List[np.ndarray],
+    k: int=10,
+    rrf_k: int=60):
+
+    rankings=[ranking for ranking in rankings if ranking.shape[0]>0]
+    if not rankings:
+        return np.empty(0,dtype=object), np.empty(0,dtype=np.float64)
+
+    ids=np.concatenate(rankings)
+    ranks=np.concatenate([np.arange(ranking.shape[0]) for ranking in rankings])
+    unique_ids,inverse=np.unique(ids, return_inverse=True)
+    scores=np.bincount(inverse, weights=1.0/(rrf_k+ranks+1), minlength=unique_ids.shape[0])
+
+    order=np.argsort(-scores, kind="stable")[:k]
+    return unique_ids[order], scores[order]
+
+class InvertedIndex():
+    """
+    Term -> posting list of document rows with term frequencies.
+
+    Re-adding a document id appends a new row and retires the old one, so
+    postings are never rewritten in place.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str,Tuple[List[int],List[int]]]={}
+        self.ids=[]
+        self.row_of={}
+        self.alive=np.empty(0,dtype=bool)
+        self.lengths=np.empty(0,dtype=np.float64)
+        self.entries=0
+
+    @property
+    def size(self):
+        return len(self.ids)
+
+    def estimated_size(self):
+        """Approximate bytes held, from the number of posting entries rather than a walk over them."""
+
+        terms=len(self.postings)*(sys.getsizeof((0,0))+2*sys.getsizeof([]))
+        # A pointer in each posting list and an int object for the row
+        entries=self.entries*(16+sys.getsizeof(2**20))
+        containers=sys.getsizeof(self.postings)+sys.getsizeof(self.ids)+sys.getsizeof(self.row_of)
+        return terms+entries+containers+self.alive.nbytes+self.lengths.nbytes
+
+    def _grow(
+        self,
+        extra: int):
+
+        needed=self.size+extra
+        if needed>self.alive.shape[0]:
+            grow=max(needed, 2*self.alive.shape[0], 64)-self.alive.shape[0]
+            self.alive=np.concatenate([self.alive, np.zeros(grow,dtype=bool)])
+            self.lengths=np.concatenate([self.lengths, np.zeros(grow,dtype=np.float64)])
+
+    def add(
+        self,
+        ids: List[str],
+        documents: List[List[str]],
+        alive: Optional[List[bool]]=None):
+
+        self._grow(len(ids))
+        for i,(doc_id,terms) in enumerate(zip(ids, documents)):
+            row=self.size
+            previous=self.row_of.get(doc_id)
+            if alive is not None:
+                self.alive[row]=alive[i]
+            else:
+                self.alive[row]=self.alive[previous] if previous is not None else True
+            if previous is not None:
+                self.alive[previous]=False
+
+            self.lengths[row]=len(terms)
+            counts: Dict[str,int]={}
+            for term in terms:
+                counts[term]=counts.get(term,0)+1
+            for term,count in counts.items():
+                rows,frequencies=self.postings.setdefault(term,([],[]))
+                rows.append(row)
+                frequencies.append(count)
+            self.entries+=len(counts)
+
+            self.row_of[doc_id]=row
+            self.ids.append(doc_id)
+
+    def set_alive(
+        self,
+        ids: List[str],
+        alive: List[bool]):
+
+        for doc_id,is_alive in zip(ids, alive):
+            row=self.row_of.get(doc_id)
+            if row is not None:
+                self.alive[row]=is_alive
+
+    def _postings(
+        self,
+        term: str):
+
+        rows,frequencies=self.postings.get(term,([],[]))
+        rows=np.asarray(rows,dtype=np.int64)
+        frequencies=np.asarray(frequencies,dtype=np.float64)
+        live=self.alive[rows]
+        return rows[live], frequencies[live]
+
+    def _accumulate(
+        self,
+        rows: List[np.ndarray],
+        contributions: List[np.ndarray]):
+
+        if not rows:
+            return np.empty(0,dtype=np.int64), np.empty(0,dtype=np.float64)
+        unique_rows,inverse=np.unique(np.concatenate(rows), return_inverse=True)
+        return unique_rows, np.bincount(inverse, weights=np.concatenate(contributions))
+
+    def match(
+        self,
+        terms: List[str]):
+
+        rows=[self._postings(term)[0] for term in set(terms)]
+        return self._accumulate(rows, [np.ones(r.shape[0]) for r in rows])
+
+    def bm25(
+        self,
+        terms: List[str],
+        k1: float=1.2,
+        b: float=0.75):
+
+        live=self.alive[:self.size]
+        num_docs=int(live.sum())
+        if num_docs==0:
+            return self._accumulate([],[])
+        average_length=max(self.lengths[:self.size][live].mean(), 1e-9)
+
+        matched_rows,contributions=[],[]
+        for term in set(terms):
+            rows,frequencies=self._postings(term)
+            if rows.shape[0]==0:
+                continue
+            idf=np.log(1.0+(num_docs-rows.shape[0]+0.5)/(rows.shape[0]+0.5))
+            norm=k1*(1.0-b+b*self.lengths[rows]/average_length)
+            matched_rows.append(rows)
+            contributions.append(idf*frequencies*(k1+1.0)/(frequencies+norm))
+        return self._accumulate(matched_rows, contributions)
+
+    def ranking(
+        self,
+        matches: Tuple[np.ndarray,np.ndarray],
+        k: int,
+        allowed_ids: Optional[pl.Series]=None):
+
+        rows,scores=matches
+        ids=np.array([self.ids[row] for row in rows.tolist()],dtype=object)
+        if allowed_ids is not None:
+            keep=np.isin(ids, allowed_ids.to_numpy())
+            ids,scores=ids[keep],scores[keep]
+        order=np.argsort(-scores, kind="stable")[:k]
+        return ids[order]
+
+class KeywordIndex():
+    """
+    Lexical indexes for one table: an inverted index over the `keywords`
+    list column and a BM25 index over the free-text `description` column.
+    """
+
+    def __init__(
+        self,
+        id_column: str,
+        keywords_column: str="keywords",
+        description_column: str="description"):
+
+        self.id_column=id_column
+        self.keywords_column=keywords_column
+        self.description_column=description_column
+        self.keywords=InvertedIndex()
+        self.descriptions=InvertedIndex()
+
+    def build(
+        self,
+        frame: pl.DataFrame):
+
+        self.keywords=InvertedIndex()
+        self.descriptions=InvertedIndex()
+        self.append(frame)
+
+    def append(
+        self,
+        batch_df: pl.DataFrame):
+
+        ids=batch_df[self.id_column].to_list()
+        alive=(~batch_df["deleted"].fill_null(False)).to_list() if "deleted" in batch_df.columns else None
+        self.keywords.add(ids, [normalize_keywords(keywords) for keywords in batch_df[self.keywords_column].to_list()], alive)
+        self.descriptions.add(ids, [tokenize(text) for text in batch_df[self.description_column].to_list()], alive)
+
+    def patch(
+        self,
+        batch_df: pl.DataFrame):
+
+        ids=batch_df[self.id_column].to_list()
+        if self.keywords_column in batch_df.columns:
+            self.keywords.add(ids, [normalize_keywords(keywords) for keywords in batch_df[self.keywords_column].to_list()])
+        if self.description_column in batch_df.columns:
+            self.descriptions.add(ids, [tokenize(text) for text in batch_df[self.description_column].to_list()])
+        if "deleted" in batch_df.columns:
+            alive=(~batch_df["deleted"].fill_null(False)).to_list()
+            self.keywords.set_alive(ids, alive)
+            self.descriptions.set_alive(ids, alive)
+
+    def keyword_ranking(
+        self,
+        text: str,
+        k: int,
+        allowed_ids: Optional[pl.Series]=None):
+
+        return self.match_keywords(tokenize(text)+[text], k, allowed_ids)
+
+    def match_keywords(
+        self,
+        keywords: List[str],
+        k: int,
+        allowed_ids: Optional[pl.Series]=None):
+
+        return self.keywords.ranking(self.keywords.match(normalize_keywords(keywords)), k, allowed_ids)
+
+    def bm25_ranking(
+        self,
+        text: str,
+        k: int,
+        allowed_ids: Optional[pl.Series]=None):
+
+        return self.descriptions.ranking(self.descriptions.bm25(tokenize(text)), k, allowed_ids)
@@ -1,13 +1,103 @@
 from gyaan.structure.schema import *
 from gyaan.utils.io import *
+from gyaan.utils.maintenance import MaintenanceScheduler, MaintenancePolicy
+from gyaan.utils.coordinator import WriterCoordinator
+from gyaan.structure.vector import VectorIndex, top_k
+from gyaan.structure.graph import AdjacencyIndex, NodeIdSet
+from gyaan.structure.keyword import KeywordIndex, reciprocal_rank_fusion
 
 import polars as pl
+import pyarrow as pa
+import numpy as np
 import asyncio
+import sys
+import time
 
-from typing import Optional,Dict, List, Any
+from typing import Optional,Dict, List, Callable, NamedTuple, AsyncIterator, Union, Any
+from datetime import datetime
 import os
 from uuid import uuid4
 
+ID_COLUMNS={
+    "nodes":"node_id",
+    "edges":"edge_id"
+}
+
+# Written at the root of a MemoryStore, whose tables hold many memories
+STORE_MARKER="store.json"
+
+# Columns added to change feed rows, named as in Delta's change data feed
+CHANGE_TYPE="_change_type"
+COMMIT_VERSION="_commit_version"
+
+def apply_batch(
+    frame: pl.DataFrame,
+    batch_df: pl.DataFrame,
+    id_column: str,
+    mode: str):
+
+    batch_df=batch_df.cast({col: frame.schema[col] for col in batch_df.columns})
+    if mode=="append":
+        return pl.concat([frame, batch_df.select(frame.columns)])
+    elif mode=="update":
+        return frame.update(batch_df, on=id_column, include_nulls=True)
+    else:
+        raise ValueError(f"Unknown batch mode: {mode}")
+
+def generate_ids(
+    n: int):
+    """`n` random UUID4 strings, generated as one vectorized batch."""
+
+    raw=np.frombuffer(os.urandom(16*n),dtype=np.uint8).reshape(n,16).copy()
+    raw[:,6]=raw[:,6]&0x0F|0x40
+    raw[:,8]=raw[:,8]&0x3F|0x80
+    digits=pl.Series(np.frombuffer(raw.tobytes().hex().encode(),dtype="S32").astype("U32"))
+    return pl.select(pl.concat_str([digits.str.slice(start,length) for start,length in ((0,8),(8,4),(12,4),(16,4),(20,12))], separator="-")).to_series()
+
+def _estimated_size(
+    value: Any,
+    seen: set):
+    """Bytes held by a derived index, walked through its attributes and containers."""
+
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        # Views over frame columns or other arrays are counted with their owner
+        return value.nbytes if value.base is None else 0
+    if hasattr(value, "estimated_size"):
+        return value.estimated_size()
+    if isinstance(value, (dict,list,set,tuple)):
+        items=list(value.values() if isinstance(value, dict) else value)
+        size=sys.getsizeof(value)
+        # Containers of scalars are counted shallowly, without walking every element
+        if items and not isinstance(items[0], (str,bytes,int,float,bool,type(None))):
+            size+=sum(_estimated_size(item, seen) for item in items)
+        return size
+    if type(value).__module__.startswith("gyaan."):
+        return sum(_estimated_size(attribute, seen) for attribute in vars(value).values())
+    return 0
+
+class ImportResult(NamedTuple):
+    rows: int
+    commits: int
+    version: Optional[int]
+
+class WriteResult(list):
+    """
+    Ids written by one call. `version` is the table version that made the
+    write visible; pass it as `min_version` to a later read for
+    read-your-writes from another Memory instance.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        version: Optional[int]):
+
+        super().__init__(ids)
+        self.version=version
+
 class Memory():
 
     def __init__(
@@ -16,36 +106,76 @@ class Memory():
         title: str,
         description: str,
         embedding: Optional[List[float]]=[0.0]*1024,
-        keywords: Optional[List[str]]=["keyword"]):
+        keywords: Optional[List[str]]=["keyword"],
+        memory_id: Optional[str]=None,
+        shared: bool=False):
 
-        self.id=str(uuid4())
+        self.id=memory_id or str(uuid4())
         self.title=title
         self.description=description
         self.embedding=embedding
         self.keywords=keywords
         self.memory_storage_path=memory_path
         self.deleted=False
+        self.shared=shared
+        self.embedding_dim=None
+        self.lazy=False
+        self.mmap_embeddings=False
         self._lock=asyncio.Lock()
+        self._writes_in_flight=0
+        self._last_write=time.monotonic()
+        self.maintenance=None
+        self.coordinator=None
+        self.read_only=False
+        # (table, index name) pairs built on first use; vector indexes wait
+        # for the first vector search so loading never depends on them
+        self._unbuilt={(table,"vector") for table in ID_COLUMNS}
 
         self.metadata_path=os.path.abspath(os.path.join(self.memory_storage_path,"metadata"))
         self.nodes_path=os.path.abspath(os.path.join(self.memory_storage_path,"nodes"))
         self.edges_path=os.path.abspath(os.path.join(self.memory_storage_path,"edges"))
+        self.index_path=os.path.abspath(os.path.join(self.memory_storage_path,"indexes"))
+        self.table_versions={"nodes":-1,"edges":-1}
 
         os.makedirs(self.memory_storage_path,exist_ok=True)
+        os.makedirs(self.index_path,exist_ok=True)
 
-    
-    async def _initialize_tables(
+        self.indexes={
+            table:{
+                "vector":VectorIndex(id_column, path=os.path.join(self.index_path,self._index_name(f"{table}_ivf.npz"))),
+                "keyword":KeywordIndex(id_column)
+            }
+            for table,id_column in ID_COLUMNS.items()
+        }
+        self.indexes["nodes"]["ids"]=NodeIdSet()
+        self.indexes["edges"]["adjacency"]=AdjacencyIndex()
+
+    def _index_name(
         self,
-        node_attributes: Optional[Dict[Any,Any]]={},
-        edge_attributes: Optional[Dict[Any,Any]]={}):
+        name: str):
 
-        node_schema=generate_node_schema(node_attributes)
-        edge_schema=generate_edge_schema(edge_attributes)
+        # Memories in a shared store keep their index files side by side
+        return f"{self.id}_{name}" if self.shared else name
 
-        self.node_columns=list(node_schema.keys())
-        self.edge_columns=list(edge_schema.keys())
+    def _filters(self):
+        return [("memory_id","=",self.id)] if self.shared else None
+
+    def _own_rows(
+        self,
+        table: str,
+        batch_df: pl.DataFrame,
+        mode: str):
+        """Rows of a shared-table batch that belong to this memory."""
 
-        metadata_df=pl.DataFrame(data=[{
+        if not self.shared:
+            return batch_df
+        if mode=="append":
+            return batch_df.filter(pl.col("memory_id")==self.id)
+        id_column=ID_COLUMNS[table]
+        return batch_df.filter(pl.col(id_column).is_in(getattr(self,table)[id_column]))
+    
+    def _metadata_df(self):
+        return pl.DataFrame(data=[{
             "id":self.id,
             "title":self.title,
             "description":self.description,
@@ -54,10 +184,42 @@ class Memory():
             "deleted":self.deleted,
             "memory_storage_path":self.memory_storage_path,
             "node_attributes":self.node_columns,
-            "edge_attributes":self.edge_columns
-        }])
+            "edge_attributes":self.edge_columns,
+            "embedding_dim":self.embedding_dim
+        }],schema=MEMORY_SCHEMA)
 
-        
+    def _conform(
+        self,
+        frame: pl.DataFrame):
+
+        if self.embedding_dim is None or "embedding" not in frame.columns:
+            return frame
+        return frame.with_columns(pl.col("embedding").cast(embedding_dtype(self.embedding_dim)))
+
+    def _check_embeddings(
+        self,
+        batch_df: pl.DataFrame):
+
+        if self.embedding_dim is None or "embedding" not in batch_df.columns:
+            return
+        embeddings=batch_df["embedding"]
+        lengths=embeddings.list.len() if isinstance(embeddings.dtype, pl.List) else pl.Series([embeddings.dtype.size]*embeddings.len())
+        wrong=lengths.filter(lengths.is_not_null() & (lengths!=self.embedding_dim)).unique().sort().to_list()
+        if wrong:
+            raise ValueError(f"Embeddings should have {self.embedding_dim} dimensions, got lengths {wrong}")
+
+    async def _initialize_tables(
+        self,
+        node_attributes: Optional[Dict[Any,Any]]={},
+        edge_attributes: Optional[Dict[Any,Any]]={}):
+
+        node_schema=generate_node_schema(node_attributes, self.embedding_dim)
+        edge_schema=generate_edge_schema(edge_attributes, self.embedding_dim)
+
+        self.node_columns=list(node_schema.keys())
+        self.edge_columns=list(edge_schema.keys())
+
+        metadata_df=self._metadata_df()
 
         self.nodes=pl.DataFrame(schema=node_schema)
         self.edges=pl.DataFrame(schema=edge_schema)
@@ -65,13 +227,380 @@ class Memory():
         await create_table(f"file://{self.metadata_path}", metadata_df)
         await create_table(f"file://{self.nodes_path}", self.nodes)
         await create_table(f"file://{self.edges_path}", self.edges)
+
+        self.table_versions["nodes"]=await table_version(f"file://{self.nodes_path}")
+        self.table_versions["edges"]=await table_version(f"file://{self.edges_path}")
+        self._build_indexes("nodes")
+        self._build_indexes("edges")
     
-    async def _load_nodes_edges(self):
-        self.nodes=await read_table(f"file://{self.nodes_path}")
+    async def _load_nodes_edges(
+        self,
+        versions: Optional[Dict[str,int]]=None):
+
+        if self.lazy:
+            self.nodes,self.edges=None,None
+            for table in ID_COLUMNS:
+                self.table_versions[table]=versions[table] if versions is not None else await table_version(f"file://{getattr(self,f'{table}_path')}")
+            self.node_columns=(await self.scan_nodes()).collect_schema().names()
+            self.edge_columns=(await self.scan_edges()).collect_schema().names()
+            return
+
+        for table in ID_COLUMNS:
+            version=versions[table] if versions is not None else None
+            if self.mmap_embeddings:
+                await self._map_table(table, version)
+            else:
+                frame,self.table_versions[table]=await read_versioned_table(f"file://{getattr(self,f'{table}_path')}", version, filters=self._filters())
+                setattr(self,table,self._conform(frame))
+                self._build_indexes(table)
         self.node_columns=self.nodes.columns
-        self.edges=await read_table(f"file://{self.edges_path}")
         self.edge_columns=self.edges.columns
 
+    async def _map_table(
+        self,
+        table: str,
+        target: Optional[int]=None):
+        """
+        Load a table with its embedding column mapped from the newest
+        embedding sidecar: only the other columns are read from Delta, at the
+        sidecar's version, and later commits up to `target` (the latest by
+        default) are applied from the log. The sidecar is rewritten when it
+        was missing or behind, except by read-only snapshots.
+        """
+
+        table_path=f"file://{getattr(self,f'{table}_path')}"
+        id_column=ID_COLUMNS[table]
+        sidecar=open_sidecar(self.index_path, self._index_name(f"{table}_embeddings"))
+        if sidecar is not None and target is not None and sidecar[0]>target:
+            sidecar=None
+        frame=None
+        if sidecar is not None:
+            version,embeddings=sidecar
+            try:
+                columns=(await scan_table(table_path, version=version)).collect_schema().names()
+                frame,_=await read_versioned_table(table_path, version, [col for col in columns if col!="embedding"], self._filters())
+            except Exception:
+                # The files of that version may have been vacuumed
+                frame=None
+            if frame is not None and frame.height==embeddings.height:
+                # Reorder the small columns rather than gathering the embeddings
+                frame=(embeddings.select(id_column)
+                       .join(self._conform(frame), on=id_column, how="left", maintain_order="left")
+                       .with_columns(embeddings["embedding"])
+                       .select(columns))
+            if frame is None or frame.height!=embeddings.height or frame["deleted"].null_count():
+                frame=None
+
+        if frame is None:
+            frame,version=await read_versioned_table(table_path, target, filters=self._filters())
+            frame=self._conform(frame)
+        setattr(self,table,frame)
+        self.table_versions[table]=version
+        self._build_indexes(table)
+
+        await self._catch_up(table, target if target is not None else await table_version(table_path))
+        if not self.read_only and (sidecar is None or sidecar[0]<self.table_versions[table]):
+            await self.save_embeddings([table])
+
+    async def save_embeddings(
+        self,
+        tables: Optional[List[str]]=None):
+        """
+        Write the cached ids and embeddings of each table to a memory-mappable
+        sidecar under `indexes/`, tagged with the cached table version, for
+        loads with mmap_embeddings=True.
+        """
+
+        assert not self.lazy, "Embedding sidecars are only written for memories loaded with lazy=False"
+        self._check_writable()
+        paths={}
+        for table in tables or ID_COLUMNS:
+            embeddings=getattr(self,table).select(ID_COLUMNS[table],"embedding")
+            paths[table]=await write_sidecar(self.index_path, self._index_name(f"{table}_embeddings"), embeddings, self.table_versions[table])
+        return paths
+
+    def _build_indexes(
+        self,
+        table: str):
+
+        for name,index in self.indexes[table].items():
+            if (table,name) not in self._unbuilt:
+                index.build(getattr(self,table))
+
+    def estimated_size(self):
+        """
+        Approximate bytes held in memory: the frames' estimated size plus the
+        arrays and containers of the derived indexes. Strings held in Python
+        containers are not counted.
+        """
+
+        seen=set()
+        size=0
+        for table in ID_COLUMNS:
+            if getattr(self,table) is not None:
+                size+=getattr(self,table).estimated_size()
+            size+=_estimated_size(self.indexes[table], seen)
+        return size
+
+    def _index(
+        self,
+        table: str,
+        name: str):
+
+        assert not self.lazy, "Derived indexes are only kept for memories loaded with lazy=False"
+        if (table,name) in self._unbuilt:
+            self._unbuilt.discard((table,name))
+            self.indexes[table][name].build(getattr(self,table))
+        return self.indexes[table][name]
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError(f"Memory is a read-only snapshot at versions {self.table_versions}")
+
+    async def _acknowledge_maintenance(
+        self,
+        table: str,
+        version: int):
+
+        async with self._lock:
+            await self._catch_up(table, version)
+
+    async def _refresh_table(
+        self,
+        table: str,
+        batch_df: pl.DataFrame,
+        version: Optional[int],
+        mode: str):
+
+        async with self._lock:
+            cached_version=self.table_versions[table]
+            if version is None or version<=cached_version:
+                return
+
+            if self.lazy or version>cached_version+1:
+                await self._catch_up(table, version)
+                return
+
+            batch_df=self._own_rows(table, batch_df, mode)
+            setattr(self,table,apply_batch(getattr(self,table), batch_df, ID_COLUMNS[table], mode))
+            for name,index in self.indexes[table].items():
+                if (table,name) in self._unbuilt:
+                    continue
+                if mode=="append":
+                    index.append(batch_df)
+                else:
+                    index.patch(batch_df)
+            self.table_versions[table]=version
+
+    async def _catch_up(
+        self,
+        table: str,
+        version: int):
+        """Bring the cached table up to `version` from the commit log, falling back to a full reload."""
+
+        if version<=self.table_versions[table]:
+            return
+        if self.lazy:
+            self.table_versions[table]=version
+            return
+        try:
+            await self._apply_log(table, version)
+        except FileNotFoundError:
+            # Snapshots stay at their version
+            await self._reload_table(table, version if self.read_only else None)
+
+    async def _apply_log(
+        self,
+        table: str,
+        version: int):
+
+        table_path=f"file://{getattr(self,f'{table}_path')}"
+        id_column=ID_COLUMNS[table]
+        for entry in await read_commit_log(table_path, self.table_versions[table]+1, version):
+            if entry.schema_changed:
+                await self._reload_table(table, version if self.read_only else None)
+                return
+            if entry.operation not in MAINTENANCE_OPERATIONS and (entry.added or entry.removed):
+                added=await read_data_files(table_path, entry.added) if entry.added else None
+                if added is not None and self.shared:
+                    added=added.filter(pl.col("memory_id")==self.id)
+                removed_ids=[]
+                # Merges that only update rows re-add every row of the files they remove
+                if entry.removed and not (entry.operation=="MERGE" and not entry.metrics.get("num_target_rows_deleted")):
+                    removed=(await read_data_files(table_path, entry.removed, [id_column]))[id_column]
+                    removed_ids=removed.filter(~removed.is_in(added[id_column])).to_list() if added is not None else removed.to_list()
+                self._apply_rows(table, added, removed_ids)
+            self.table_versions[table]=entry.version
+
+    def _apply_rows(
+        self,
+        table: str,
+        added: Optional[pl.DataFrame],
+        removed_ids: List[str]):
+
+        frame=getattr(self,table)
+        id_column=ID_COLUMNS[table]
+        added=frame.clear() if added is None else self._conform(added).cast(frame.schema).select(frame.columns)
+
+        changed=frame[id_column].is_in(added[id_column]) | frame[id_column].is_in(pl.Series(removed_ids,dtype=pl.String))
+        existing=frame.filter(changed)
+        setattr(self,table,pl.concat([frame.filter(~changed), added]))
+
+        is_new=~added[id_column].is_in(existing[id_column])
+        gone=existing.filter(pl.col(id_column).is_in(removed_ids)).with_columns(deleted=pl.lit(True))
+        for name,index in self.indexes[table].items():
+            if (table,name) in self._unbuilt:
+                continue
+            if is_new.any():
+                index.append(added.filter(is_new))
+            if not is_new.all():
+                index.patch(added.filter(~is_new))
+            if gone.height:
+                index.patch(gone)
+
+    async def _reload_table(
+        self,
+        table: str,
+        version: Optional[int]=None):
+        """Read the table again at `version`, the latest by default."""
+
+        if self.lazy:
+            self.table_versions[table]=version if version is not None else await table_version(f"file://{getattr(self,f'{table}_path')}")
+            return
+        frame,self.table_versions[table]=await read_versioned_table(f"file://{getattr(self,f'{table}_path')}", version, filters=self._filters())
+        setattr(self,table,self._conform(frame))
+        self._build_indexes(table)
+
+    async def _commit(
+        self,
+        table: str,
+        batch_df: pl.DataFrame,
+        mode: str):
+
+        self._check_writable()
+        table_path=f"file://{getattr(self,f'{table}_path')}"
+        self._check_embeddings(batch_df)
+        batch_df=self._conform(batch_df)
+        if self.shared and mode=="update":
+            # Updates only match rows of this memory in the shared tables
+            batch_df=batch_df.with_columns(memory_id=pl.lit(self.id))
+        self._writes_in_flight+=1
+        try:
+            if self.coordinator is not None:
+                result=await self.coordinator.submit(table_path, batch_df, mode, ID_COLUMNS[table])
+                batch_df,version=result.batch,result.version
+            elif coalescing_enabled():
+                result=await get_coalescer(table_path).submit(batch_df, mode, ID_COLUMNS[table])
+                batch_df,version=result.batch,result.version
+            elif mode=="append":
+                version=await insert_table(table_path, batch_df, coalesce=False)
+            else:
+                version=await update_table(table_path, batch_df, id_column=ID_COLUMNS[table], coalesce=False)
+
+            await self._refresh_table(table, batch_df, version, mode)
+            return version if version is not None else self.table_versions[table]
+        finally:
+            self._writes_in_flight-=1
+            self._last_write=time.monotonic()
+
+    async def collect_garbage(
+        self,
+        retention_hours: float=24,
+        incremental: bool=True,
+        max_rows: Optional[int]=10_000):
+        """
+        Physically remove nodes and edges that have been soft-deleted for more
+        than `retention_hours`, then apply the purge to the cached frames from
+        the commit log. Incremental passes purge at most `max_rows` tombstones
+        per table and only rewrite and re-read the files that hold them; a
+        full pass purges every eligible tombstone, compacts the table
+        afterwards and rebuilds the derived indexes from the cached frames.
+        The replaced files are freed from disk by the next vacuum.
+        """
+
+        self._check_writable()
+        reports={}
+        for table,id_column in ID_COLUMNS.items():
+            table_path=f"file://{getattr(self,f'{table}_path')}"
+            before=await table_health(table_path)
+            purged,version=await purge_tombstones(table_path, id_column, retention_hours, max_rows if incremental else None)
+            if purged and not incremental:
+                await compact(table_path)
+            after=await table_health(table_path)
+
+            if purged:
+                # Only the files the purge rewrote are read; compaction commits are skipped
+                async with self._lock:
+                    await self._catch_up(table, after.version)
+                    if not incremental and not self.lazy:
+                        # A full pass drops the purged rows from the indexes too
+                        self._build_indexes(table)
+
+            reports[table]={
+                "purged_rows":purged,
+                "version":version,
+                "bytes_before":before.bytes,
+                "bytes_after":after.bytes,
+                "bytes_reclaimed":max(before.bytes-after.bytes, 0)
+            }
+        return reports
+
+    async def start_coordination(
+        self,
+        **options: Any):
+        """
+        Route this memory's writes through a single elected writer process
+        shared by every process that opens the same directory. See
+        WriterCoordinator for the options.
+        """
+
+        if self.coordinator is None:
+            self.coordinator=await WriterCoordinator(self.memory_storage_path, **options).start()
+        return self.coordinator
+
+    async def stop_coordination(self):
+        if self.coordinator is not None:
+            await self.coordinator.stop()
+            self.coordinator=None
+
+    def idle_time(self):
+        """Seconds since the last write finished, or 0 while a write is in flight."""
+        return 0.0 if self._writes_in_flight else time.monotonic()-self._last_write
+
+    def _maintenance_scheduler(
+        self,
+        policy: Optional[MaintenancePolicy]=None):
+
+        self._check_writable()
+        if self.maintenance is None:
+            self.maintenance=MaintenanceScheduler(
+                tables={
+                    "nodes":(f"file://{self.nodes_path}",["memory_id"] if self.shared else ["node_id"]),
+                    "edges":(f"file://{self.edges_path}",["memory_id"] if self.shared else ["source_node_id"])
+                },
+                policy=policy,
+                idle_time=self.idle_time,
+                on_commit=self._acknowledge_maintenance)
+        elif policy is not None:
+            self.maintenance.policy=policy
+        return self.maintenance
+
+    def start_maintenance(
+        self,
+        policy: Optional[MaintenancePolicy]=None):
+
+        return self._maintenance_scheduler(policy).start()
+
+    async def stop_maintenance(self):
+        if self.maintenance is not None:
+            await self.maintenance.stop()
+
+    async def maintain(
+        self,
+        force: bool=False):
+
+        return await self._maintenance_scheduler().check(force)
+
     async def update_metadata(
         self,
         title: Optional[str],
@@ -91,37 +620,42 @@ class Memory():
         async with self._lock:
             self.__dict__.update(filtered_update)
             
-        metadata_df=pl.DataFrame(data=[{
-            "id":self.id,
-            "title":self.title,
-            "description":self.description,
-            "embedding":self.embedding,
-            "keywords":self.keywords,
-            "deleted":self.deleted,
-            "memory_storage_path":self.memory_storage_path,
-            "node_attributes":self.node_columns,
-            "edge_attributes":self.edge_columns
-        }])
-
-        await create_table(f"file://{self.metadata_path}", metadata_df,mode="overwrite")
+        await self._write_metadata()
     
     async def soft_delete(self):
         async with self._lock:
             self.deleted=True
 
-        metadata_df=pl.DataFrame(data=[{
-            "id":self.id,
-            "title":self.title,
-            "description":self.description,
-            "embedding":self.embedding,
-            "keywords":self.keywords,
-            "deleted":self.deleted,
-            "memory_storage_path":self.memory_storage_path,
-            "node_attributes":self.node_columns,
-            "edge_attributes":self.edge_columns
-        }])
+        await self._write_metadata()
+
+    async def _write_metadata(self):
+        self._check_writable()
+        metadata_df=self._metadata_df()
+
+        if self.shared:
+            # A store's metadata table holds one row per memory
+            await update_table(f"file://{self.metadata_path}", metadata_df, id_column="id", coalesce=False)
+        else:
+            # Overwriting the schema too upgrades metadata tables written before `embedding_dim` existed
+            await create_table(f"file://{self.metadata_path}", metadata_df, mode="overwrite", schema_mode="overwrite")
+
+    async def read_metadata(self):
+        """This memory's persisted metadata row."""
 
-        await create_table(f"file://{self.metadata_path}", metadata_df,mode="overwrite")
+        metadata_df=await read_table(f"file://{self.metadata_path}")
+        return metadata_df.filter(pl.col("id")==self.id)
+
+    async def _join_store(self):
+        # A new memory has no rows yet, so only the shared schema is read
+        for table in ID_COLUMNS:
+            table_path=f"file://{getattr(self,f'{table}_path')}"
+            schema=(await scan_table(table_path)).collect_schema()
+            setattr(self,table,self._conform(pl.DataFrame(schema=schema)))
+            self.table_versions[table]=await table_version(table_path)
+            self._build_indexes(table)
+        self.node_columns=self.nodes.columns
+        self.edge_columns=self.edges.columns
+        await insert_table(f"file://{self.metadata_path}", self._metadata_df())
 
     @classmethod
     async def create(
@@ -132,31 +666,74 @@ class Memory():
         embedding: Optional[List[float]] = [], 
         keywords: Optional[List[str]] = [], 
         node_attributes: Optional[Dict[Any, Any]] = {}, 
-        edge_attributes: Optional[Dict[Any, Any]] = {}):
+        edge_attributes: Optional[Dict[Any, Any]] = {},
+        embedding_dim: Optional[int] = None):
         
         memory = cls(memory_path, title, description, embedding, keywords)
+        memory.embedding_dim=embedding_dim
         await memory._initialize_tables(node_attributes=node_attributes,edge_attributes=edge_attributes)
         return memory
     
     @classmethod 
-    async def load(cls,memory_path:str):
+    async def load(
+        cls,
+        memory_path:str,
+        lazy: bool=False,
+        mmap_embeddings: bool=False,
+        memory_id: Optional[str]=None,
+        version: Optional[Dict[str,int]]=None,
+        as_of: Optional[Union[float,datetime]]=None):
+        """
+        With `mmap_embeddings`, embeddings are memory-mapped from a sidecar
+        kept next to the indexes instead of being decoded from Parquet, so
+        opening is fast and processes loading the same memory share the
+        embedding pages. The first such load writes the sidecar.
+
+        `memory_path` may also be a MemoryStore, in which case `memory_id`
+        picks the memory to open as a view over the shared tables.
+
+        With `version` (table -> Delta version, as in table_versions) or
+        `as_of` (a datetime or seconds since the epoch), the memory is
+        opened as a read-only snapshot of the tables at that point, with its
+        derived indexes built on first use. Snapshots of soft-deleted
+        memories can still be opened.
+        """
+
+        assert version is None or as_of is None, "Pass either a version or an as_of time"
+        historical=version is not None or as_of is not None
+
         metadata_path=os.path.abspath(os.path.join(memory_path,"metadata"))
+        shared=os.path.exists(os.path.join(memory_path,STORE_MARKER))
+        if shared and memory_id is None:
+            raise ValueError("Memory path is a shared store; pass the memory_id to open")
 
         try:
             metadata_df=await read_table(f"file://{metadata_path}")
+            if memory_id is not None:
+                metadata_df=metadata_df.filter(pl.col("id")==memory_id)
             metadata_dict=metadata_df.to_dict(as_series=False)
         except:
             raise ValueError("Memory not found")
-        if metadata_dict["deleted"][0]==False:
+        if not metadata_dict["id"]:
+            raise ValueError("Memory not found")
+        if metadata_dict["deleted"][0]==False or historical:
             memory=cls(
                 memory_path,
                 metadata_dict["title"][0],
                 metadata_dict["description"][0],
                 metadata_dict["embedding"][0],
-                metadata_dict["keywords"][0]
+                metadata_dict["keywords"][0],
+                memory_id=metadata_dict["id"][0],
+                shared=shared
             )
-
-            await memory._load_nodes_edges()
+            memory.embedding_dim=metadata_dict.get("embedding_dim",[None])[0]
+            memory.lazy=lazy
+            memory.mmap_embeddings=mmap_embeddings and not lazy
+            if historical:
+                memory._freeze()
+                await memory._load_nodes_edges(await memory._versions_at(version, as_of))
+            else:
+                await memory._load_nodes_edges()
             return memory
         
         else:
@@ -191,19 +768,414 @@ class Memory():
 
         insertion_df=pl.DataFrame(data=update_dict)
 
-        await insert_table(f"file://{self.nodes_path}", insertion_df)
+        version=await self._commit("nodes", insertion_df, mode="append")
+
+        return WriteResult(node_ids, version)
+    
+    async def _bulk_import(
+        self,
+        table: str,
+        source: Any,
+        batch_rows: int,
+        commit_rows: Optional[int],
+        target_file_size: Optional[int],
+        format: Optional[str],
+        validate: Optional[Callable[[pl.DataFrame],None]]=None):
+
+        self._check_writable()
+        table_path=f"file://{getattr(self,f'{table}_path')}"
+        id_column=ID_COLUMNS[table]
+        schema=(await self._scan(table)).collect_schema()
+        columns=schema.names()
+        required=[col for col in columns if col not in ("memory_id",id_column,"deleted")]
+
+        def prepare(batch_df: pl.DataFrame):
+            missing=[col for col in required if col not in batch_df.columns]
+            unknown=[col for col in batch_df.columns if col not in schema]
+            if missing or unknown:
+                raise ValueError(f"Import columns do not match the {table} table: missing {missing}, unknown {unknown}. Correct attributes are: {columns}")
+            self._check_embeddings(batch_df)
+            ids=generate_ids(batch_df.height)
+            batch_df=batch_df.with_columns(**{
+                "memory_id":pl.lit(self.id),
+                id_column:pl.col(id_column).fill_null(ids) if id_column in batch_df.columns else ids,
+                "deleted":pl.col("deleted").fill_null(False) if "deleted" in batch_df.columns else pl.lit(False)
+            })
+            batch_df=batch_df.select(columns).cast(dict(schema))
+            if validate is not None:
+                validate(batch_df)
+            return batch_df
+
+        batches=(prepare(batch_df) for batch_df in iter_batches(source, batch_rows, format))
+        rows,commits,version=0,0,None
+        self._writes_in_flight+=1
+        try:
+            while True:
+                committed,written=await append_batches(table_path, batches, commit_rows, target_file_size)
+                if written==0:
+                    break
+                rows,commits,version=rows+written,commits+1,committed
+        finally:
+            self._writes_in_flight-=1
+            self._last_write=time.monotonic()
+
+        if version is not None:
+            async with self._lock:
+                await self._catch_up(table, version)
+        return ImportResult(rows, commits, version)
+
+    async def bulk_import_nodes(
+        self,
+        source: Any,
+        batch_rows: int=100_000,
+        commit_rows: Optional[int]=None,
+        target_file_size: Optional[int]=None,
+        format: Optional[str]=None):
+        """
+        Stream nodes from a Parquet, JSON-lines or Arrow IPC file, an Arrow
+        reader or an iterable of batches (see iter_batches) into the nodes
+        table, `batch_rows` at a time. Each batch must carry every node column
+        except `memory_id`, `node_id` and `deleted`; missing or null node ids
+        are generated. Batches are streamed into one commit per `commit_rows`
+        rows (a single commit by default) written as files of about
+        `target_file_size` bytes, and the cached frame and indexes are
+        updated once at the end.
+        """
+
+        return await self._bulk_import("nodes", source, batch_rows, commit_rows, target_file_size, format)
+
+    async def bulk_import_edges(
+        self,
+        source: Any,
+        batch_rows: int=100_000,
+        commit_rows: Optional[int]=None,
+        target_file_size: Optional[int]=None,
+        format: Optional[str]=None,
+        check_endpoints: bool=True):
+        """
+        Stream edges into the edges table like bulk_import_nodes. With
+        `check_endpoints`, a batch that references a missing or deleted node
+        raises ValueError and nothing from the uncommitted batches is written.
+        """
+
+        live=(await self._live("nodes")).select("node_id") if check_endpoints and self.lazy else None
+
+        def validate(batch_df: pl.DataFrame):
+            endpoints=pl.concat([batch_df["source_node_id"], batch_df["target_node_id"]]).unique()
+            if live is None:
+                missing=self._index("nodes","ids").missing(endpoints.to_list())
+            else:
+                missing=endpoints.to_frame("node_id").lazy().join(live, on="node_id", how="anti").collect()["node_id"].to_list()
+            if missing:
+                raise ValueError(f"Edges reference {len(missing)} missing or deleted nodes, e.g. {missing[:5]}")
+
+        return await self._bulk_import("edges", source, batch_rows, commit_rows, target_file_size, format, validate if check_endpoints else None)
+
+    async def _scan(
+        self,
+        table: str,
+        ids: Optional[List[str]]=None,
+        columns: Optional[List[str]]=None):
+
+        # Snapshots scan the table as of their version
+        scan=await scan_table(f"file://{getattr(self,f'{table}_path')}", version=self.table_versions[table] if self.read_only else None)
+        predicate=pl.col("deleted") == False
+        if self.shared:
+            predicate&=pl.col("memory_id")==self.id
+        if ids is not None:
+            predicate&=pl.col(ID_COLUMNS[table]).is_in(ids)
+        scan=scan.filter(predicate)
+        if columns is not None:
+            scan=scan.select(columns)
+        if self.embedding_dim is not None and "embedding" in scan.collect_schema().names():
+            scan=scan.with_columns(pl.col("embedding").cast(embedding_dtype(self.embedding_dim)))
+        return scan
+
+    async def refresh(
+        self,
+        tables: Optional[List[str]]=None):
+        """
+        Apply commits made by other writers since the cached versions. Only
+        the commit log entries after the cached version and the files they
+        add are read; the table is reloaded only if the log has been cleaned
+        up or the schema changed.
+        """
+
+        self._check_writable()
+        for table in tables or ID_COLUMNS:
+            version=await table_version(f"file://{getattr(self,f'{table}_path')}")
+            async with self._lock:
+                await self._catch_up(table, version)
+        return dict(self.table_versions)
+
+    async def _versions_at(
+        self,
+        version: Optional[Dict[str,int]],
+        as_of: Optional[Union[float,datetime]]):
+        """Table versions of a snapshot, given directly or as the last commits at or before `as_of`."""
+
+        if as_of is None:
+            # Nodes and edges are versioned independently, so one number cannot name a snapshot
+            if not isinstance(version, dict):
+                raise ValueError(f"Snapshot versions map each table to a version, e.g. {{'nodes': 3, 'edges': 1}}, not {version!r}; use as_of for a point in time")
+            missing=[table for table in ID_COLUMNS if table not in version]
+            if missing:
+                raise ValueError(f"Snapshot versions are missing for: {missing}")
+            return {table:version[table] for table in ID_COLUMNS}
+
+        timestamp=as_of.timestamp() if isinstance(as_of, datetime) else as_of
+        versions={}
+        for table in ID_COLUMNS:
+            versions[table]=await version_as_of(f"file://{getattr(self,f'{table}_path')}", timestamp)
+            if versions[table] is None:
+                raise ValueError(f"The {table} table has no version at or before {as_of}")
+        return versions
+
+    def _freeze(self):
+        self.read_only=True
+        self._unbuilt={(table,name) for table in ID_COLUMNS for name in self.indexes[table]}
+        for table in ID_COLUMNS:
+            # Snapshots reuse the saved IVF centroids but never save over them
+            self.indexes[table]["vector"].path=None
+
+    async def _rewind(
+        self,
+        table: str,
+        version: int):
+        """
+        The cached frame as it was at `version`, or None if the commit log
+        cannot tell. Every change rewrites a row's file, so a row untouched
+        since `version` is unchanged, and a touched row's state at `version`
+        is its copy in the first file removed after it.
+        """
+
+        current=self.table_versions[table]
+        frame=getattr(self,table)
+        if version==current:
+            return frame
+        if version>current:
+            return None
+        table_path=f"file://{getattr(self,f'{table}_path')}"
+        id_column=ID_COLUMNS[table]
+        try:
+            entries=await read_commit_log(table_path, version+1, current)
+        except FileNotFoundError:
+            return None
+        if any(entry.schema_changed for entry in entries):
+            return None
+
+        seen=frame[id_column].clear()
+        before=[]
+        for entry in entries:
+            # Compaction moves rows without changing them
+            if entry.operation in MAINTENANCE_OPERATIONS:
+                continue
+            if entry.removed:
+                removed=self._own(await read_data_files(table_path, entry.removed))
+                removed=removed.filter(~pl.col(id_column).is_in(seen))
+                before.append(self._conform(removed).cast(frame.schema).select(frame.columns))
+                seen=pl.concat([seen, removed[id_column]])
+            if entry.added:
+                # Rows first seen in an added file were inserted after `version`
+                added=self._own(await read_data_files(table_path, entry.added, [id_column,"memory_id"]))[id_column]
+                seen=pl.concat([seen, added.filter(~added.is_in(seen))])
+        return pl.concat([frame.filter(~pl.col(id_column).is_in(seen))]+before)
+
+    async def snapshot(
+        self,
+        version: Optional[Dict[str,int]]=None,
+        as_of: Optional[Union[float,datetime]]=None):
+        """
+        Read-only view of this memory at `version` (table -> Delta version)
+        or `as_of` a time. Rather than re-reading the tables, the cached
+        frames are rewound through the commit log, reading only the files
+        removed since; untouched rows are taken from this memory and the
+        saved IVF centroids are reused. The view builds its derived indexes
+        on first use and falls back to reading the old version when the log
+        has been cleaned up. Snapshots of lazy memories scan that version.
+        """
+
+        assert (version is None)!=(as_of is None), "Pass either a version or an as_of time"
+        view=Memory(self.memory_storage_path, self.title, self.description, self.embedding, self.keywords, memory_id=self.id, shared=self.shared)
+        view.embedding_dim=self.embedding_dim
+        view.lazy=self.lazy
+        view._freeze()
+        versions=await self._versions_at(version, as_of)
+        if self.lazy:
+            await view._load_nodes_edges(versions)
+            return view
 
         async with self._lock:
-            self.nodes=await read_table(f"file://{self.nodes_path}")
-            self.node_columns=self.nodes.columns
+            for table in ID_COLUMNS:
+                frame=await self._rewind(table, versions[table])
+                if frame is None:
+                    frame,_=await read_versioned_table(f"file://{getattr(self,f'{table}_path')}", versions[table], filters=self._filters())
+                    frame=self._conform(frame)
+                setattr(view, table, frame)
+                view.table_versions[table]=versions[table]
+        view.node_columns=view.nodes.columns
+        view.edge_columns=view.edges.columns
+        return view
 
-        return node_ids
-    
-    async def get_nodes(self):
-        return self.nodes.filter(pl.col("deleted") == False)
+    def _own(
+        self,
+        frame: pl.DataFrame):
+
+        return frame.filter(pl.col("memory_id")==self.id) if self.shared else frame
+
+    def _diff_commit(
+        self,
+        table: str,
+        added: pl.DataFrame,
+        removed: pl.DataFrame):
+        """Rows whose content changed between the files a commit removed and the ones it added."""
+
+        id_column=ID_COLUMNS[table]
+        if removed.height==0:
+            return added.with_columns(pl.lit("insert").alias(CHANGE_TYPE))
+
+        common=[col for col in added.columns if col in removed.columns and col!=id_column]
+        matched=added.join(removed.select([id_column]+common), on=id_column, how="left", suffix="_old")
+        unchanged=pl.all_horizontal([pl.col(col).eq_missing(pl.col(f"{col}_old")) for col in common])
+        change=(
+            pl.when(pl.col("deleted_old").is_null()).then(pl.lit("insert"))
+            .when(unchanged).then(pl.lit(None))
+            .when(pl.col("deleted") & ~pl.col("deleted_old")).then(pl.lit("delete"))
+            .otherwise(pl.lit("update")))
+        changed=matched.with_columns(change.alias(CHANGE_TYPE)).filter(pl.col(CHANGE_TYPE).is_not_null()).select(added.columns+[CHANGE_TYPE])
+
+        # Rows a commit drops outright (tombstone GC, merges that delete) only count if they were still live
+        dropped=removed.join(added.select(id_column), on=id_column, how="anti").filter(pl.col("deleted") == False)
+        dropped=dropped.with_columns(deleted=pl.lit(True), **{CHANGE_TYPE:pl.lit("delete")})
+        return pl.concat([changed, dropped], how="diagonal_relaxed")
+
+    async def _changes(
+        self,
+        table: str,
+        start_version: int,
+        end_version: int):
+        """Yield (version, changed rows) for each commit in [start_version, end_version] that changed this memory."""
+
+        table_path=f"file://{getattr(self,f'{table}_path')}"
+        try:
+            entries=await read_commit_log(table_path, start_version, end_version)
+        except FileNotFoundError:
+            raise ValueError(f"The {table} commit log from version {start_version} has been cleaned up; reload the memory instead")
+
+        for entry in entries:
+            # CREATE TABLE and metadata-only commits touch no data files
+            if entry.operation in MAINTENANCE_OPERATIONS or not (entry.added or entry.removed):
+                continue
+            if not entry.removed:
+                # Appends are read a file at a time
+                for path in entry.added:
+                    yield entry.version, self._diff_commit(table, self._own(await read_data_files(table_path, [path])), pl.DataFrame())
+                continue
+            removed=self._own(await read_data_files(table_path, entry.removed))
+            if entry.added:
+                added=self._own(await read_data_files(table_path, entry.added))
+            else:
+                added=removed.clear()
+            yield entry.version, self._diff_commit(table, added, removed)
+
+    def _change_frame(
+        self,
+        version: int,
+        rows: pl.DataFrame):
+
+        return self._conform(rows).with_columns(pl.lit(version, dtype=pl.Int64).alias(COMMIT_VERSION))
+
+    async def changes_since(
+        self,
+        version: int,
+        table: str="nodes",
+        end_version: Optional[int]=None):
+        """
+        Rows of `table` inserted, updated or deleted after `version`, up to
+        `end_version` (the latest by default), found from the commit log
+        rather than by diffing snapshots. Each row is its content after the
+        change, with `_change_type` ("insert", "update" or "delete") and
+        `_commit_version`; a row changed in several commits appears once per
+        commit. Raises ValueError once the log has been cleaned up.
+        """
+
+        assert table in ID_COLUMNS, "Table must be nodes or edges"
+        if end_version is None:
+            end_version=await table_version(f"file://{getattr(self,f'{table}_path')}")
+        frames=[self._change_frame(commit, rows) async for commit,rows in self._changes(table, version+1, end_version) if rows.height]
+        if not frames:
+            frame=(await self._scan(table)).clear().collect()
+            return frame.with_columns(pl.lit(None, dtype=pl.String).alias(CHANGE_TYPE), pl.lit(None, dtype=pl.Int64).alias(COMMIT_VERSION))
+        return pl.concat(frames, how="diagonal_relaxed")
+
+    async def subscribe(
+        self,
+        table: str="nodes",
+        version: Optional[int]=None,
+        poll_interval: float=0.5,
+        batch_rows: int=10_000) -> AsyncIterator[pa.RecordBatch]:
+        """
+        Stream the changes to `table` after `version` (the cached version
+        by default) as Arrow record batches of at most `batch_rows` rows, in
+        commit order, polling for new commits every `poll_interval` seconds.
+        Only one commit's files are held at a time. A consumer that stops
+        can resume from the last `_commit_version` it fully applied.
+        """
+
+        assert table in ID_COLUMNS, "Table must be nodes or edges"
+        table_path=f"file://{getattr(self,f'{table}_path')}"
+        cursor=self.table_versions[table] if version is None else version
+        while True:
+            latest=await table_version(table_path)
+            if latest<=cursor:
+                await asyncio.sleep(poll_interval)
+                continue
+            async for commit,rows in self._changes(table, cursor+1, latest):
+                if rows.height:
+                    for batch in self._change_frame(commit, rows).to_arrow().to_batches(max_chunksize=batch_rows):
+                        yield batch
+            cursor=latest
+
+    async def _get(
+        self,
+        table: str,
+        ids: Optional[List[str]]=None,
+        columns: Optional[List[str]]=None,
+        min_version: Optional[int]=None):
+
+        if min_version is not None and min_version>self.table_versions[table]:
+            await self.refresh([table])
+
+        if self.lazy:
+            return await (await self._scan(table, ids, columns)).collect_async()
+
+        predicate=pl.col("deleted") == False
+        if ids is not None:
+            predicate&=pl.col(ID_COLUMNS[table]).is_in(ids)
+        frame=getattr(self,table).filter(predicate)
+        return frame.select(columns) if columns is not None else frame
+
+    async def scan_nodes(
+        self,
+        node_ids: Optional[List[str]]=None,
+        columns: Optional[List[str]]=None):
+
+        return await self._scan("nodes", node_ids, columns)
+
+    async def get_nodes(
+        self,
+        columns: Optional[List[str]]=None,
+        min_version: Optional[int]=None):
+
+        return await self._get("nodes", columns=columns, min_version=min_version)
     
-    async def get_nodes_by_id(self, node_ids: List[str]):
-        return self.nodes.filter((pl.col("deleted") == False) & (pl.col("node_id").is_in(node_ids)))
+    async def get_nodes_by_id(
+        self,
+        node_ids: List[str],
+        columns: Optional[List[str]]=None,
+        min_version: Optional[int]=None):
+
+        return await self._get("nodes", node_ids, columns, min_version)
     
     async def update_nodes(
         self, 
@@ -216,31 +1188,51 @@ class Memory():
         }
 
         update_df=pl.DataFrame(data=update_dict)
-        await update_table(table_path=f"file://{self.nodes_path}",update_df=update_df,id_column="node_id")
-
-        async with self._lock:
-            self.nodes=await read_table(f"file://{self.nodes_path}")
-            self.node_columns=self.nodes.columns
+        version=await self._commit("nodes", update_df, mode="update")
 
-        return node_ids
+        return WriteResult(node_ids, version)
     
+    async def _missing_nodes(
+        self,
+        node_ids: List[str]):
+
+        if not self.lazy:
+            return self._index("nodes","ids").missing(node_ids)
+        found=set((await self._get("nodes", node_ids, ["node_id"]))["node_id"].to_list())
+        return [node_id for node_id in dict.fromkeys(node_ids) if node_id not in found]
+
+    async def _incident_edges(
+        self,
+        node_ids: List[str]):
+
+        if not self.lazy:
+            return self._index("edges","adjacency").incident_edges(node_ids)
+        scan=await self._scan("edges", columns=["edge_id","source_node_id","target_node_id"])
+        incident=await scan.filter(pl.col("source_node_id").is_in(node_ids) | pl.col("target_node_id").is_in(node_ids)).collect_async()
+        return incident["edge_id"].to_list()
+
     async def delete_nodes(
         self, 
-        node_ids: List[str]):
-        
+        node_ids: List[str],
+        cascade: bool=False):
+
+        # Delta commits are per table, so incident edges are deleted first:
+        # a failure in between leaves a live node without edges rather than
+        # dangling edges.
+        if cascade:
+            edge_ids=await self._incident_edges(node_ids)
+            if edge_ids:
+                await self.delete_edges(edge_ids)
+
         update_dict={
             "node_id":node_ids,
             "deleted":[True]*len(node_ids)
         }
 
         update_df=pl.DataFrame(data=update_dict)
-        await update_table(table_path=f"file://{self.nodes_path}",update_df=update_df,id_column="node_id")
-
-        async with self._lock:
-            self.nodes=await read_table(f"file://{self.nodes_path}")
-            self.node_columns=self.nodes.columns
+        version=await self._commit("nodes", update_df, mode="update")
 
-        return node_ids
+        return WriteResult(node_ids, version)
     
     async def add_edges(
         self,
@@ -251,12 +1243,18 @@ class Memory():
         descriptions: List[str],
         keywords: List[List[str]],
         embeddings: List[List[float]],
+        check_endpoints: bool=True,
         **edge_attributes: List[Any]):
 
         batch_size=len(source_nodes)
 
         assert len(target_nodes)==batch_size, "All edges should have source and target nodes"
 
+        if check_endpoints:
+            missing=await self._missing_nodes(source_nodes+target_nodes)
+            if missing:
+                raise ValueError(f"Edges reference {len(missing)} missing or deleted nodes, e.g. {missing[:5]}")
+
         edge_ids=[str(uuid4()) for _ in range(batch_size)]
 
         update_dict={
@@ -277,19 +1275,101 @@ class Memory():
 
         insertion_df=pl.DataFrame(data=update_dict)
 
-        await insert_table(f"file://{self.edges_path}", insertion_df)
+        version=await self._commit("edges", insertion_df, mode="append")
 
-        async with self._lock:
-            self.edges=await read_table(f"file://{self.edges_path}")
-            self.edge_columns=self.edges.columns
+        return WriteResult(edge_ids, version)
+
+    async def _search(
+        self,
+        table: str,
+        query_vector: List[float],
+        k: int,
+        filter: Optional[pl.Expr]):
+
+        index=self._index(table,"vector")
+        frame=getattr(self,table)
+        id_column=ID_COLUMNS[table]
+        allowed_ids=frame.filter(filter)[id_column] if filter is not None else None
+
+        ids,scores=index.search(query_vector, k=k, allowed_ids=allowed_ids)
+        return self._hits(table, ids, scores)
+
+    def _hits(
+        self,
+        table: str,
+        ids: List[str],
+        scores: List[float]):
+
+        frame=getattr(self,table)
+        id_column=ID_COLUMNS[table]
+        hits=pl.DataFrame({id_column:list(ids),"score":list(scores)},schema={id_column:pl.String,"score":pl.Float64})
+        return hits.join(frame, on=id_column, how="left").select(frame.columns+["score"])
+
+    async def _hybrid_search(
+        self,
+        table: str,
+        text: Optional[str],
+        query_vector: Optional[List[float]],
+        k: int,
+        filter: Optional[pl.Expr],
+        candidates: Optional[int]):
+
+        vector_index=self._index(table,"vector")
+        keyword_index=self._index(table,"keyword")
+        candidates=candidates or 10*k
+        id_column=ID_COLUMNS[table]
+        allowed_ids=getattr(self,table).filter(filter)[id_column] if filter is not None else None
+
+        rankings=[]
+        if query_vector is not None:
+            ids,_=vector_index.search(query_vector, k=candidates, allowed_ids=allowed_ids)
+            rankings.append(np.array(ids,dtype=object))
+        if text:
+            rankings.append(keyword_index.keyword_ranking(text, candidates, allowed_ids))
+            rankings.append(keyword_index.bm25_ranking(text, candidates, allowed_ids))
+
+        ids,scores=reciprocal_rank_fusion(rankings, k=k)
+        return self._hits(table, ids.tolist(), scores.tolist())
+
+    async def hybrid_search(
+        self,
+        text: Optional[str],
+        vector: Optional[List[float]],
+        k: int=10,
+        filter: Optional[pl.Expr]=None,
+        candidates: Optional[int]=None):
+
+        return await self._hybrid_search("nodes", text, vector, k, filter, candidates)
+
+    async def search_nodes(
+        self,
+        query_vector: List[float],
+        k: int=10,
+        filter: Optional[pl.Expr]=None):
 
-        return edge_ids
+        return await self._search("nodes", query_vector, k, filter)
 
-    async def get_edges(self):
-        return self.edges.filter(pl.col("deleted") == False)
+    async def scan_edges(
+        self,
+        edge_ids: Optional[List[str]]=None,
+        columns: Optional[List[str]]=None):
+
+        return await self._scan("edges", edge_ids, columns)
+
+    async def get_edges(
+        self,
+        columns: Optional[List[str]]=None,
+        min_version: Optional[int]=None):
+
+        return await self._get("edges", columns=columns, min_version=min_version)
     
-    async def get_edges_by_id(self, edge_ids: List[str]):
-        return self.edges.filter((pl.col("deleted") == False) & (pl.col("edge_id").is_in(edge_ids)))
+    async def get_edges_by_id(
+        self,
+        edge_ids: List[str],
+        columns: Optional[List[str]]=None,
+        min_version: Optional[int]=None):
+
+        return await self._get("edges", edge_ids, columns, min_version)
     
     async def update_edges(
         self,
@@ -302,13 +1382,9 @@ class Memory():
         }
 
         update_df=pl.DataFrame(data=update_dict)
-        await update_table(table_path=f"file://{self.edges_path}",update_df=update_df,id_column="edge_id")
-
-        async with self._lock:
-            self.edges=await read_table(f"file://{self.edges_path}")
-            self.edges_columns=self.edges.columns
+        version=await self._commit("edges", update_df, mode="update")
 
-        return edge_ids
+        return WriteResult(edge_ids, version)
 
     async def delete_edges(
         self,
@@ -320,11 +1396,220 @@ class Memory():
         }
 
         update_df=pl.DataFrame(data=update_dict)
-        await update_table(table_path=f"file://{self.edges_path}",update_df=update_df,id_column="edge_id")
+        version=await self._commit("edges", update_df, mode="update")
 
-        async with self._lock:
-            self.edges=await read_table(f"file://{self.edges_path}")
-            self.edges_columns=self.edges.columns
+        return WriteResult(edge_ids, version)
+
+    async def search_edges(
+        self,
+        query_vector: List[float],
+        k: int=10,
+        filter: Optional[pl.Expr]=None):
+
+        return await self._search("edges", query_vector, k, filter)
+
+    async def hybrid_search_edges(
+        self,
+        text: Optional[str],
+        vector: Optional[List[float]],
+        k: int=10,
+        filter: Optional[pl.Expr]=None,
+        candidates: Optional[int]=None):
+
+        return await self._hybrid_search("edges", text, vector, k, filter, candidates)
+
+    async def neighbors(
+        self,
+        node_id: str,
+        direction: str="out"):
+
+        return self._index("edges","adjacency").neighbors(node_id, direction=direction)
+
+    async def k_hop(
+        self,
+        node_ids: List[str],
+        k: int=1,
+        direction: str="out"):
+
+        return self._index("edges","adjacency").k_hop(node_ids, k=k, direction=direction)
+
+    async def degree(
+        self,
+        node_id: str,
+        direction: str="out"):
+
+        return self._index("edges","adjacency").degree(node_id, direction=direction)
+
+    async def _live(
+        self,
+        table: str):
+
+        if self.lazy:
+            return await self._scan(table)
+        return getattr(self,table).lazy().filter(pl.col("deleted") == False)
+
+    async def subgraph(
+        self,
+        node_ids: List[str],
+        hops: int=1,
+        max_nodes: Optional[int]=None,
+        edge_filter: Optional[pl.Expr]=None,
+        direction: str="both"):
+        """
+        Breadth-first neighbourhood of `node_ids` up to `hops` away, following
+        live edges that pass `edge_filter`. Each hop is one semi-join of the
+        frontier against the edges. Once `max_nodes` would be exceeded, the
+        newly reached nodes with the heaviest connecting edge are kept and
+        the expansion stops. Returns (nodes, edges): the reached nodes with
+        their `hop` distance, and the edges between them.
+        """
+
+        assert direction in ("out","in","both"), "Direction must be out, in or both"
+        nodes=await self._live("nodes")
+        edges=await self._live("edges")
+        if edge_filter is not None:
+            edges=edges.filter(edge_filter)
+
+        frontier=(await nodes.join(pl.LazyFrame({"node_id":list(dict.fromkeys(node_ids))},schema={"node_id":pl.String}), on="node_id", how="semi")
+                  .select("node_id").collect_async())
+        if max_nodes is not None:
+            frontier=frontier.head(max_nodes)
+        reached=frontier.with_columns(hop=pl.lit(0,dtype=pl.UInt32))
+
+        for hop in range(1, hops+1):
+            if frontier.height==0 or (max_nodes is not None and reached.height>=max_nodes):
+                break
+            steps=[]
+            if direction in ("out","both"):
+                steps.append(edges.join(frontier.lazy(), left_on="source_node_id", right_on="node_id", how="semi")
+                             .select(pl.col("target_node_id").alias("node_id"),"weight"))
+            if direction in ("in","both"):
+                steps.append(edges.join(frontier.lazy(), left_on="target_node_id", right_on="node_id", how="semi")
+                             .select(pl.col("source_node_id").alias("node_id"),"weight"))
+            candidates=(pl.concat(steps)
+                        .join(reached.lazy(), on="node_id", how="anti")
+                        .join(nodes, on="node_id", how="semi")
+                        .group_by("node_id").agg(pl.col("weight").max()))
+            candidates=await candidates.collect_async()
+
+            if max_nodes is not None and reached.height+candidates.height>max_nodes:
+                candidates=candidates.sort(["weight","node_id"], descending=[True,False]).head(max_nodes-reached.height)
+            frontier=candidates.select("node_id")
+            reached=pl.concat([reached, frontier.with_columns(hop=pl.lit(hop,dtype=pl.UInt32))])
+
+        subgraph_nodes=nodes.join(reached.lazy(), on="node_id", how="inner")
+        subgraph_edges=(edges.join(reached.lazy().select("node_id"), left_on="source_node_id", right_on="node_id", how="semi")
+                        .join(reached.lazy().select("node_id"), left_on="target_node_id", right_on="node_id", how="semi"))
+        return tuple(await pl.collect_all_async([subgraph_nodes, subgraph_edges]))
+
+    def _graph_hits(
+        self,
+        scores: np.ndarray,
+        seeds: np.ndarray,
+        k: int,
+        include_seeds: bool):
+
+        adjacency=self._index("edges","adjacency")
+        live_nodes=self._index("nodes","ids").ids
+        scores=scores.copy()
+        if not include_seeds:
+            scores[seeds]=0.0
+
+        candidates=int((scores>0).sum())
+        limit=min(candidates, max(2*k, k+16))
+        hits=[]
+        while limit>0:
+            order=top_k(scores, limit)
+            hits=[i for i in order.tolist() if scores[i]>0 and adjacency.node_ids[i] in live_nodes][:k]
+            if len(hits)==k or limit>=candidates:
+                break
+            limit=min(candidates, 4*limit)
+        return self._hits("nodes", [adjacency.node_ids[i] for i in hits], scores[hits].tolist())
+
+    def _seeds(
+        self,
+        seed_node_ids: List[str],
+        seed_weights: Optional[List[float]]):
+
+        adjacency=self._index("edges","adjacency")
+        known=[i for i,node_id in enumerate(seed_node_ids) if node_id in adjacency.ordinal_of]
+        seeds=adjacency.lookup(seed_node_ids)
+        weights=np.asarray(seed_weights,dtype=np.float64)[known] if seed_weights is not None else None
+        return seeds, weights
+
+    async def personalized_pagerank(
+        self,
+        seed_node_ids: List[str],
+        alpha: float=0.85,
+        top_k: int=10,
+        seed_weights: Optional[List[float]]=None,
+        direction: str="out",
+        weighted: bool=True,
+        include_seeds: bool=False,
+        max_iterations: int=100,
+        tolerance: float=1e-6):
+        """
+        Rank nodes by PageRank restarted at the seed nodes (optionally
+        weighted, e.g. by vector search scores) over edge weights.
+        Returns the top nodes with a `score` column.
+        """
+
+        seeds,weights=self._seeds(seed_node_ids, seed_weights)
+        scores=self._index("edges","adjacency").personalized_pagerank(
+            seeds, weights, alpha=alpha, max_iterations=max_iterations, tolerance=tolerance,
+            direction=direction, weighted=weighted)
+        return self._graph_hits(scores, seeds, top_k, include_seeds)
+
+    async def spreading_activation(
+        self,
+        seed_node_ids: List[str],
+        decay: float=0.5,
+        hops: int=3,
+        threshold: float=1e-3,
+        top_k: int=10,
+        seed_weights: Optional[List[float]]=None,
+        direction: str="out",
+        weighted: bool=True,
+        include_seeds: bool=False):
+
+        seeds,weights=self._seeds(seed_node_ids, seed_weights)
+        scores=self._index("edges","adjacency").spreading_activation(
+            seeds, weights, decay=decay, hops=hops, threshold=threshold,
+            direction=direction, weighted=weighted)
+        return self._graph_hits(scores, seeds, top_k, include_seeds)
+
+    async def configure_vector_search(
+        self,
+        quantization: Optional[str]=None,
+        rescore_factor: int=4,
+        n_probe: Optional[int]=None):
+        """
+        Score vector search candidates on "int8" or "binary" codes and
+        re-rank the best `rescore_factor * k` at full precision; None turns
+        quantization off. Codes are kept in a sidecar per table under
+        `indexes/` and reused while the table version is unchanged.
+        """
+
+        for table in ID_COLUMNS:
+            self._index(table,"vector").configure(
+                quantization, rescore_factor, n_probe,
+                codes_path=os.path.join(self.index_path,self._index_name(f"{table}_{quantization}.npz")) if quantization else None,
+                version=self.table_versions[table])
+
+    def _embedding_matrix(
+        self,
+        table: str):
+
+        assert self.embedding_dim is not None, "Embedding matrices need a memory created with embedding_dim"
+        frame=getattr(self,table)
+        try:
+            return frame["embedding"].to_numpy(allow_copy=False)
+        except RuntimeError:
+            setattr(self,table,frame.rechunk())
+            return getattr(self,table)["embedding"].to_numpy(allow_copy=False)
+
+    def node_embedding_matrix(self):
+        return self._embedding_matrix("nodes")
 
-        return edge_ids
-    
\ No newline at end of file
+    def edge_embedding_matrix(self):
+        return self._embedding_matrix("edges")
@@ -1,4 +1,5 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import polars as pl
 
 MEMORY_SCHEMA={
     "id": str,  
@@ -9,7 +10,8 @@ MEMORY_SCHEMA={
     "deleted": bool,
     "memory_storage_path":str,
     "node_attributes":List[str],
-    "edge_attributes":List[str]
+    "edge_attributes":List[str],
+    "embedding_dim":int
 }
 
 NODE_SCHEMA={
@@ -36,13 +38,20 @@ EDGE_SCHEMA={
     "deleted": bool
 }
 
-def generate_node_schema(custom_attributes: Dict[Any,Any]):
+def embedding_dtype(embedding_dim: Optional[int]):
+    if embedding_dim is None:
+        return List[float]
+    return pl.Array(pl.Float32, embedding_dim)
+
+def generate_node_schema(custom_attributes: Dict[Any,Any], embedding_dim: Optional[int]=None):
     node_schema = NODE_SCHEMA.copy()
+    node_schema["embedding"]=embedding_dtype(embedding_dim)
     node_schema.update(custom_attributes)
     return node_schema
 
-def generate_edge_schema(custom_attributes: Dict[Any,Any]):
+def generate_edge_schema(custom_attributes: Dict[Any,Any], embedding_dim: Optional[int]=None):
     edge_schema=EDGE_SCHEMA.copy()
+    edge_schema["embedding"]=embedding_dtype(embedding_dim)
     edge_schema.update(custom_attributes)
     return edge_schema
     
\ No newline at end of file
@@ -0,0 +1,163 @@
+from gyaan.structure.schema import *
+from gyaan.structure.memory import Memory, ID_COLUMNS, STORE_MARKER
+from gyaan.utils.io import *
+from gyaan.utils.maintenance import MaintenanceScheduler, MaintenancePolicy
+
+import polars as pl
+import json
+
+from typing import Optional, Dict, List, Union, Any
+from datetime import datetime
+import os
+
+class MemoryStore():
+    """
+    One set of Delta tables (metadata, nodes and edges) shared by many
+    memories with the same node and edge attributes and embedding size.
+    Rows are told apart by `memory_id`. Memories created or opened here are
+    views over the shared tables, so a new memory adds a metadata row
+    rather than three tables, and queries over many memories are one scan.
+
+    Maintenance Z-orders the tables by `memory_id`, which keeps each
+    memory's rows in a few files that reads of one memory find through file
+    statistics. The tables are not Hive-partitioned by memory: with many
+    small memories that would bring back a directory and a few small files
+    per memory.
+    """
+
+    def __init__(
+        self,
+        store_path: str):
+
+        self.store_path=os.path.abspath(store_path)
+        self.metadata_path=os.path.join(self.store_path,"metadata")
+        self.nodes_path=os.path.join(self.store_path,"nodes")
+        self.edges_path=os.path.join(self.store_path,"edges")
+        self.embedding_dim=None
+        self.maintenance=None
+
+    @classmethod
+    async def create(
+        cls,
+        store_path: str,
+        node_attributes: Optional[Dict[Any,Any]]={},
+        edge_attributes: Optional[Dict[Any,Any]]={},
+        embedding_dim: Optional[int]=None):
+
+        store=cls(store_path)
+        store.embedding_dim=embedding_dim
+        os.makedirs(store.store_path,exist_ok=True)
+
+        await create_table(f"file://{store.metadata_path}", pl.DataFrame(schema=MEMORY_SCHEMA))
+        await create_table(f"file://{store.nodes_path}", pl.DataFrame(schema=generate_node_schema(node_attributes, embedding_dim)))
+        await create_table(f"file://{store.edges_path}", pl.DataFrame(schema=generate_edge_schema(edge_attributes, embedding_dim)))
+        with open(os.path.join(store.store_path,STORE_MARKER),"w") as f:
+            json.dump({"embedding_dim":embedding_dim}, f)
+        return store
+
+    @classmethod
+    async def load(
+        cls,
+        store_path: str):
+
+        store=cls(store_path)
+        marker=os.path.join(store.store_path,STORE_MARKER)
+        if not os.path.exists(marker):
+            raise ValueError("Memory store not found")
+        with open(marker) as f:
+            store.embedding_dim=json.load(f).get("embedding_dim")
+        return store
+
+    async def create_memory(
+        self,
+        title: str,
+        description: str,
+        embedding: Optional[List[float]]=[],
+        keywords: Optional[List[str]]=[]):
+
+        memory=Memory(self.store_path, title, description, embedding, keywords, shared=True)
+        memory.embedding_dim=self.embedding_dim
+        await memory._join_store()
+        return memory
+
+    async def open(
+        self,
+        memory_id: str,
+        lazy: bool=False,
+        mmap_embeddings: bool=False,
+        version: Optional[Dict[str,int]]=None,
+        as_of: Optional[Union[float,datetime]]=None):
+
+        return await Memory.load(self.store_path, lazy=lazy, mmap_embeddings=mmap_embeddings, memory_id=memory_id, version=version, as_of=as_of)
+
+    async def memories(
+        self,
+        include_deleted: bool=False):
+        """Metadata rows of the memories in the store."""
+
+        metadata_df=await read_table(f"file://{self.metadata_path}")
+        return metadata_df if include_deleted else metadata_df.filter(pl.col("deleted") == False)
+
+    async def _scan(
+        self,
+        table: str,
+        memory_ids: Optional[List[str]],
+        columns: Optional[List[str]]):
+
+        scan=await scan_table(f"file://{getattr(self,f'{table}_path')}")
+        predicate=pl.col("deleted") == False
+        if memory_ids is not None:
+            predicate&=pl.col("memory_id").is_in(memory_ids)
+        scan=scan.filter(predicate)
+        if columns is not None:
+            scan=scan.select(columns)
+        if self.embedding_dim is not None and "embedding" in scan.collect_schema().names():
+            scan=scan.with_columns(pl.col("embedding").cast(embedding_dtype(self.embedding_dim)))
+        return scan
+
+    async def scan_nodes(
+        self,
+        memory_ids: Optional[List[str]]=None,
+        columns: Optional[List[str]]=None):
+        """Live nodes of `memory_ids` (every memory by default) as one lazy scan."""
+
+        return await self._scan("nodes", memory_ids, columns)
+
+    async def scan_edges(
+        self,
+        memory_ids: Optional[List[str]]=None,
+        columns: Optional[List[str]]=None):
+
+        return await self._scan("edges", memory_ids, columns)
+
+    def _maintenance_scheduler(
+        self,
+        policy: Optional[MaintenancePolicy]=None):
+
+        if self.maintenance is None:
+            self.maintenance=MaintenanceScheduler(
+                tables={
+                    "metadata":(f"file://{self.metadata_path}",["id"]),
+                    **{table:(f"file://{getattr(self,f'{table}_path')}",["memory_id"]) for table in ID_COLUMNS}
+                },
+                # Clustering by memory is what keeps single-memory reads cheap
+                policy=policy or MaintenancePolicy(z_order_every=1))
+        elif policy is not None:
+            self.maintenance.policy=policy
+        return self.maintenance
+
+    def start_maintenance(
+        self,
+        policy: Optional[MaintenancePolicy]=None):
+
+        return self._maintenance_scheduler(policy).start()
+
+    async def stop_maintenance(self):
+        if self.maintenance is not None:
+            await self.maintenance.stop()
+
+    async def maintain(
+        self,
+        force: bool=False):
+
+        return await self._maintenance_scheduler().check(force)
@@ -0,0 +1,424 @@
+import numpy as np
+import polars as pl
+
+from typing import Optional, List
+import os
+
+def common_dim(
+    embeddings: pl.Series):
+    """The most common embedding length of a column, 0 if it has none."""
+
+    if isinstance(embeddings.dtype, pl.Array):
+        return embeddings.dtype.size
+    lengths=embeddings.list.len().drop_nulls()
+    return int(lengths.mode().max()) if lengths.len() else 0
+
+def fitting_rows(
+    embeddings: pl.Series,
+    dim: int):
+    """Mask of the rows holding an embedding of length `dim`."""
+
+    if isinstance(embeddings.dtype, pl.Array):
+        fits=embeddings.is_not_null() & (embeddings.dtype.size==dim)
+    else:
+        fits=(embeddings.list.len()==dim).fill_null(False)
+    return fits.to_numpy()
+
+def embedding_matrix(
+    embeddings: pl.Series,
+    dim: Optional[int]=None):
+    """
+    Float32 matrix of an embedding column with `dim` columns, the most
+    common length by default. Null rows and rows of another length are left
+    as zeros.
+    """
+
+    if dim is None:
+        dim=common_dim(embeddings)
+    if embeddings.len()==0:
+        return np.zeros((0,dim),dtype=np.float32)
+    fits=fitting_rows(embeddings, dim)
+    if fits.all():
+        if isinstance(embeddings.dtype, pl.List):
+            embeddings=embeddings.list.to_array(dim)
+        return np.ascontiguousarray(embeddings.to_numpy(), dtype=np.float32)
+    vectors=np.zeros((embeddings.len(),dim),dtype=np.float32)
+    if fits.any():
+        vectors[fits]=embedding_matrix(embeddings.filter(pl.Series(fits)), dim)
+    return vectors
+
+def normalize(
+    vectors: np.ndarray):
+
+    norms=np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms>0)
+
+def inverse_norms(
+    vectors: np.ndarray):
+
+    norms=np.linalg.norm(vectors, axis=-1)
+    return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms>0)
+
+def top_k(
+    scores: np.ndarray,
+    k: int):
+
+    if scores.shape[0]<=k:
+        return np.argsort(-scores, kind="stable")
+    candidates=np.argpartition(-scores, k-1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+QUANTIZATIONS=("int8","binary")
+
+def quantize(
+    vectors: np.ndarray,
+    quantization: str):
+    """
+    int8: symmetric per-vector scale, codes in [-127, 127].
+    binary: sign bits packed eight per byte.
+    Returns (codes, scales); scales is None for binary codes.
+    """
+
+    assert quantization in QUANTIZATIONS, f"Quantization must be one of {QUANTIZATIONS}"
+    if quantization=="binary":
+        return np.packbits(vectors>0, axis=-1), None
+    scales=np.abs(vectors).max(axis=-1, initial=0.0)/127.0
+    scales=np.where(scales>0, scales, 1.0).astype(np.float32)
+    return np.round(vectors/scales[...,None]).astype(np.int8), scales
+
+class VectorIndex():
+    """
+    Inverted-file (IVF) cosine index over an embedding column.
+
+    Vectors are bucketed under k-means centroids and a query only scores the
+    buckets of its `n_probe` nearest centroids. Below `min_train_size` live
+    vectors the index answers exactly. The trained centroids are persisted at
+    `path` so reopening a memory only re-assigns vectors instead of retraining.
+
+    Vectors are kept as given, next to their inverse norms, so `build` can
+    adopt the embedding column's own buffer (e.g. a memory-mapped sidecar)
+    instead of a private normalized copy. A read-only buffer is copied by the
+    first write that has to modify or grow it.
+
+    The index dimension is the most common embedding length when it is
+    built. Rows holding an embedding of another length, or none, are kept
+    but never returned by a search.
+
+    With `quantization` set, candidates are first scored on int8 or binary
+    codes (int8 dot products or Hamming distance) and only the best
+    `rescore_factor * k` are re-ranked with the full-precision vectors.
+    """
+
+    def __init__(
+        self,
+        id_column: str,
+        embedding_column: str="embedding",
+        path: Optional[str]=None,
+        n_probe: int=8,
+        min_train_size: int=4096,
+        retrain_growth: float=2.0,
+        kmeans_iterations: int=10,
+        quantization: Optional[str]=None,
+        rescore_factor: int=4):
+
+        self.id_column=id_column
+        self.embedding_column=embedding_column
+        self.path=path
+        self.n_probe=n_probe
+        self.min_train_size=min_train_size
+        self.retrain_growth=retrain_growth
+        self.kmeans_iterations=kmeans_iterations
+        self.quantization=quantization
+        self.rescore_factor=rescore_factor
+
+        self.centroids=None
+        self.trained_size=0
+        if self.path is not None and os.path.exists(self.path):
+            with np.load(self.path) as saved:
+                self.centroids=saved["centroids"]
+                self.trained_size=int(saved["trained_size"])
+
+        self._reset(0)
+
+    def _reset(
+        self,
+        dim: int):
+
+        if dim and self.centroids is not None and self.centroids.shape[1]!=dim:
+            self.centroids=None
+            self.trained_size=0
+        self.dim=dim
+        self.size=0
+        self.ids=np.empty(0,dtype=object)
+        self.vectors=np.empty((0,dim),dtype=np.float32)
+        self.inv_norms=np.empty(0,dtype=np.float32)
+        self.alive=np.empty(0,dtype=bool)
+        self.fits=np.empty(0,dtype=bool)
+        self.lists=np.empty(0,dtype=np.int32)
+        self.row_of={}
+        self._reset_codes()
+
+    def _reset_codes(
+        self,
+        recompute: bool=True):
+
+        capacity=self.vectors.shape[0]
+        if self.quantization is None:
+            self.codes,self.scales=None,None
+        else:
+            self.codes,self.scales=quantize(np.zeros((capacity,self.dim),dtype=np.float32), self.quantization)
+            if recompute and self.size:
+                self._set_codes(np.arange(self.size), self.vectors[:self.size], self.inv_norms[:self.size])
+
+    def _set_codes(
+        self,
+        rows: np.ndarray,
+        vectors: np.ndarray,
+        inv_norms: np.ndarray):
+
+        if self.quantization is None:
+            return
+        codes,scales=quantize(vectors*inv_norms[:,None], self.quantization)
+        self.codes[rows]=codes
+        if scales is not None:
+            self.scales[rows]=scales
+
+    def _reserve(
+        self,
+        extra: int):
+
+        needed=self.size+extra
+        capacity=self.vectors.shape[0]
+        if needed<=capacity:
+            return
+        capacity=max(needed, 2*capacity, 64)
+        grow=capacity-self.vectors.shape[0]
+        self.ids=np.concatenate([self.ids, np.empty(grow,dtype=object)])
+        self.vectors=np.concatenate([self.vectors, np.zeros((grow,self.dim),dtype=np.float32)])
+        self.inv_norms=np.concatenate([self.inv_norms, np.zeros(grow,dtype=np.float32)])
+        self.alive=np.concatenate([self.alive, np.zeros(grow,dtype=bool)])
+        self.fits=np.concatenate([self.fits, np.zeros(grow,dtype=bool)])
+        self.lists=np.concatenate([self.lists, np.full(grow,-1,dtype=np.int32)])
+        if self.quantization is not None:
+            codes,scales=quantize(np.zeros((grow,self.dim),dtype=np.float32), self.quantization)
+            self.codes=np.concatenate([self.codes, codes])
+            if scales is not None:
+                self.scales=np.concatenate([self.scales, scales])
+
+    def _assign(
+        self,
+        vectors: np.ndarray):
+
+        if self.centroids is None or vectors.shape[0]==0:
+            return np.full(vectors.shape[0],-1,dtype=np.int32)
+        return np.argmax(vectors@self.centroids.T, axis=1).astype(np.int32)
+
+    def _searchable(self):
+        return self.alive[:self.size] & self.fits[:self.size]
+
+    def _train(self):
+        live=np.flatnonzero(self._searchable())
+        n_lists=int(np.clip(np.sqrt(live.shape[0]),1,4096))
+        rng=np.random.default_rng(0)
+        sample=normalize(self.vectors[rng.choice(live, size=min(live.shape[0],256*n_lists), replace=False)])
+
+        centroids=sample[rng.choice(sample.shape[0], size=n_lists, replace=False)]
+        for _ in range(self.kmeans_iterations):
+            assignment=np.argmax(sample@centroids.T, axis=1)
+            sums=np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty=np.bincount(assignment, minlength=n_lists)==0
+            sums[empty]=centroids[empty]
+            centroids=normalize(sums)
+
+        self.centroids=centroids
+        self.trained_size=live.shape[0]
+        self.lists[:self.size]=self._assign(self.vectors[:self.size])
+        if self.path is not None:
+            np.savez(self.path, centroids=self.centroids, trained_size=self.trained_size)
+
+    def _maybe_train(self):
+        live=int(self._searchable().sum())
+        if live<self.min_train_size:
+            return
+        if self.centroids is None or live>self.retrain_growth*max(self.trained_size,1):
+            self._train()
+
+    def build(
+        self,
+        frame: pl.DataFrame):
+
+        vectors=embedding_matrix(frame[self.embedding_column])
+        self._reset(vectors.shape[1])
+        if frame.height==0:
+            return
+
+        self.vectors=vectors
+        self.inv_norms=np.zeros(frame.height,dtype=np.float32)
+        self.ids=np.empty(frame.height,dtype=object)
+        self.alive=np.zeros(frame.height,dtype=bool)
+        self.fits=np.zeros(frame.height,dtype=bool)
+        self.lists=np.full(frame.height,-1,dtype=np.int32)
+        self._reset_codes(recompute=False)
+        self._insert(np.arange(frame.height), frame, vectors)
+
+    def append(
+        self,
+        batch_df: pl.DataFrame):
+
+        if batch_df.height==0:
+            return
+        # An empty index takes the dimension of its first batch
+        vectors=embedding_matrix(batch_df[self.embedding_column], self.dim if self.size else None)
+        if self.size==0 and self.dim!=vectors.shape[1]:
+            self._reset(vectors.shape[1])
+
+        self._reserve(batch_df.height)
+        rows=np.arange(self.size, self.size+batch_df.height)
+        self.vectors[rows]=vectors
+        self._insert(rows, batch_df, vectors)
+
+    def _insert(
+        self,
+        rows: np.ndarray,
+        batch_df: pl.DataFrame,
+        vectors: np.ndarray):
+
+        ids=batch_df[self.id_column].to_numpy()
+        if "deleted" in batch_df.columns:
+            alive=~batch_df["deleted"].to_numpy().astype(bool)
+        else:
+            alive=np.ones(batch_df.height,dtype=bool)
+        inv_norms=inverse_norms(vectors)
+
+        self.ids[rows]=ids
+        self.inv_norms[rows]=inv_norms
+        self.alive[rows]=alive
+        self.fits[rows]=fitting_rows(batch_df[self.embedding_column], self.dim)
+        self.lists[rows]=self._assign(vectors)
+        self._set_codes(rows, vectors, inv_norms)
+        self.row_of.update(zip(ids.tolist(), rows.tolist()))
+        self.size+=batch_df.height
+
+        self._maybe_train()
+
+    def patch(
+        self,
+        batch_df: pl.DataFrame):
+
+        rows=np.array([self.row_of.get(i,-1) for i in batch_df[self.id_column].to_list()],dtype=np.int64)
+        known=rows>=0
+        rows=rows[known]
+
+        if self.embedding_column in batch_df.columns:
+            embeddings=batch_df[self.embedding_column].filter(pl.Series(known))
+            vectors=embedding_matrix(embeddings, self.dim)
+            inv_norms=inverse_norms(vectors)
+            if not self.vectors.flags.writeable:
+                self.vectors=self.vectors.copy()
+            self.vectors[rows]=vectors
+            self.inv_norms[rows]=inv_norms
+            self.fits[rows]=fitting_rows(embeddings, self.dim)
+            self.lists[rows]=self._assign(vectors)
+            self._set_codes(rows, vectors, inv_norms)
+        if "deleted" in batch_df.columns:
+            self.alive[rows]=~batch_df["deleted"].filter(pl.Series(known)).to_numpy().astype(bool)
+
+    def search(
+        self,
+        query_vector: List[float],
+        k: int=10,
+        allowed_ids: Optional[pl.Series]=None):
+
+        if self.size and len(query_vector)!=self.dim:
+            raise ValueError(f"Query vector should have {self.dim} dimensions, got {len(query_vector)}")
+        query=normalize(np.asarray(query_vector,dtype=np.float32))
+        mask=self._searchable()
+        if allowed_ids is not None:
+            mask&=np.isin(self.ids[:self.size], allowed_ids.to_numpy())
+
+        candidates=np.flatnonzero(mask)
+        if self.centroids is not None:
+            probes=top_k(self.centroids@query, self.n_probe)
+            probed=candidates[np.isin(self.lists[candidates], probes)]
+            if probed.shape[0]>=k:
+                candidates=probed
+
+        shortlist=k*self.rescore_factor
+        if self.quantization is not None and candidates.shape[0]>shortlist:
+            candidates=candidates[top_k(self._code_scores(candidates, query), shortlist)]
+
+        scores=(self.vectors[candidates]@query)*self.inv_norms[candidates]
+        # Near-ties are below float32 resolution, so the leaders are re-ranked in float64
+        candidates=candidates[top_k(scores, max(2*k, k+16))]
+        scores=normalize(self.vectors[candidates].astype(np.float64))@normalize(np.asarray(query_vector,dtype=np.float64))
+        order=top_k(scores, k)
+        return self.ids[candidates[order]].tolist(), scores[order].tolist()
+
+    def _code_scores(
+        self,
+        rows: np.ndarray,
+        query: np.ndarray):
+
+        query_codes,query_scale=quantize(query, self.quantization)
+        if self.quantization=="binary":
+            return -np.bitwise_count(self.codes[rows]^query_codes).sum(axis=1,dtype=np.int32)
+        return np.einsum("ij,j->i", self.codes[rows], query_codes, dtype=np.int32)*self.scales[rows]
+
+    def configure(
+        self,
+        quantization: Optional[str]=None,
+        rescore_factor: Optional[int]=None,
+        n_probe: Optional[int]=None,
+        codes_path: Optional[str]=None,
+        version: Optional[int]=None):
+        """
+        Switch quantization and search knobs. When `codes_path` holds codes
+        written at the same table `version` they are adopted as is;
+        otherwise the codes are computed and written there.
+        """
+
+        assert quantization is None or quantization in QUANTIZATIONS, f"Quantization must be one of {QUANTIZATIONS}"
+        if rescore_factor is not None:
+            self.rescore_factor=rescore_factor
+        if n_probe is not None:
+            self.n_probe=n_probe
+        if quantization==self.quantization:
+            return
+
+        self.quantization=quantization
+        self._reset_codes(recompute=False)
+        if codes_path is not None and self.load_codes(codes_path, version):
+            return
+        self._reset_codes()
+        if codes_path is not None:
+            self.save_codes(codes_path, version)
+
+    def save_codes(
+        self,
+        path: str,
+        version: int):
+
+        if self.quantization is None:
+            return
+        codes={"codes":self.codes[:self.size]}
+        if self.scales is not None:
+            codes["scales"]=self.scales[:self.size]
+        np.savez(path, ids=self.ids[:self.size].astype(str), version=version, quantization=self.quantization, **codes)
+
+    def load_codes(
+        self,
+        path: str,
+        version: int):
+        """Adopt codes from a sidecar written at the same table version; returns False if it is stale."""
+
+        if self.quantization is None or not os.path.exists(path):
+            return False
+        with np.load(path) as saved:
+            if (int(saved["version"])!=version or str(saved["quantization"])!=self.quantization
+                    or saved["ids"].shape[0]!=self.size or not np.array_equal(saved["ids"], self.ids[:self.size].astype(str))):
+                return False
+            self.codes[:self.size]=saved["codes"]
+            if self.scales is not None:
+                self.scales[:self.size]=saved["scales"]
+        return True
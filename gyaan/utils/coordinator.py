@@ -0,0 +1,288 @@
+from gyaan.utils.io import WriteCoalescer, CommitResult
+
+import polars as pl
+import portalocker
+
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import secrets
+import socket
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Listener, Client, Connection
+from typing import Optional, Dict, Tuple, Any
+
+class WriterCoordinator():
+    """
+    Single-writer coordination for one memory directory across processes.
+
+    The first process to take an exclusive lock on `writer.lock` becomes the
+    writer: it listens on a local socket and commits batches from every
+    process through one group-commit coalescer per table, so commits are
+    serialized instead of racing Delta's optimistic concurrency. Every other
+    process forwards its batches over IPC and gets back the version and rows
+    of the commit they landed in. When the writer exits its lock is released
+    and the next submit elects a new one. A batch in flight when the writer
+    dies fails with ConnectionError, because it may or may not have been
+    committed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        connect_timeout: float=5.0,
+        window: float=0.005,
+        max_rows: int=50_000):
+
+        self.directory=os.path.abspath(directory)
+        self.lock_path=os.path.join(self.directory,"writer.lock")
+        self.address_path=os.path.join(self.directory,"writer.json")
+        self.connect_timeout=connect_timeout
+        self.window=window
+        self.max_rows=max_rows
+        self.is_writer=False
+
+        self._loop=None
+        self._elect_lock=None
+        self._lock_file=None
+        self._listener=None
+        self._address=None
+        self._authkey=None
+        self._stopping=False
+        self._clients=set()
+        self._coalescers: Dict[str,WriteCoalescer]={}
+
+        self._connection: Optional[Connection]=None
+        self._send_lock=threading.Lock()
+        self._pending: Dict[int,Tuple[Connection,asyncio.Future]]={}
+        self._request_ids=itertools.count()
+
+    async def start(self):
+        self._loop=asyncio.get_running_loop()
+        self._elect_lock=asyncio.Lock()
+        async with self._elect_lock:
+            await self._elect()
+        return self
+
+    async def _elect(self):
+        deadline=time.monotonic()+self.connect_timeout
+        while True:
+            if self._try_lock():
+                self._serve()
+                return
+            try:
+                await asyncio.to_thread(self._connect)
+                return
+            except (OSError, EOFError, ValueError, KeyError) as e:
+                # The writer may have just exited or not yet published its address
+                if time.monotonic()>deadline:
+                    raise ConnectionError(f"Could not reach the writer process for {self.directory}: {e}")
+                await asyncio.sleep(0.05)
+
+    def _try_lock(self):
+        lock_file=open(self.lock_path,"a+")
+        try:
+            portalocker.lock(lock_file, portalocker.LOCK_EX | portalocker.LOCK_NB)
+        except portalocker.exceptions.LockException:
+            lock_file.close()
+            return False
+        self._lock_file=lock_file
+        return True
+
+    def _serve(self):
+        digest=hashlib.sha1(self.directory.encode()).hexdigest()[:16]
+        self._address=os.path.join(tempfile.gettempdir(),f"gyaan-{digest}-{os.getpid()}.sock")
+        if os.path.exists(self._address):
+            os.unlink(self._address)
+        self._authkey=secrets.token_bytes(32)
+        self._listener=Listener(self._address, family="AF_UNIX", authkey=self._authkey)
+        self._stopping=False
+
+        staging=f"{self.address_path}.{os.getpid()}"
+        with open(os.open(staging, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),"w") as f:
+            json.dump({"address":self._address,"authkey":self._authkey.hex(),"pid":os.getpid()}, f)
+        os.replace(staging, self.address_path)
+
+        self.is_writer=True
+        threading.Thread(target=self._accept_loop, name="gyaan-writer", daemon=True).start()
+
+    def _accept_loop(self):
+        while not self._stopping:
+            try:
+                connection=self._listener.accept()
+            except OSError:
+                if self._stopping:
+                    return
+                continue
+            if self._stopping:
+                connection.close()
+                return
+            self._clients.add(connection)
+            threading.Thread(target=self._handle, args=(connection,), name="gyaan-writer-client", daemon=True).start()
+
+    def _handle(
+        self,
+        connection: Connection):
+
+        send_lock=threading.Lock()
+
+        def reply(request_id, future):
+            try:
+                message=(request_id, True, future.result())
+            except Exception as e:
+                message=(request_id, False, f"{type(e).__name__}: {e}")
+            try:
+                with send_lock:
+                    connection.send(message)
+            except OSError:
+                pass
+
+        try:
+            while True:
+                request_id,table_path,batch_df,mode,id_column=connection.recv()
+                future=asyncio.run_coroutine_threadsafe(self._commit(table_path, batch_df, mode, id_column), self._loop)
+                future.add_done_callback(lambda future, request_id=request_id: reply(request_id, future))
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._clients.discard(connection)
+            connection.close()
+
+    async def _commit(
+        self,
+        table_path: str,
+        batch_df: pl.DataFrame,
+        mode: str,
+        id_column: Optional[str]):
+
+        if table_path not in self._coalescers:
+            self._coalescers[table_path]=WriteCoalescer(table_path, window=self.window, max_rows=self.max_rows)
+        return await self._coalescers[table_path].submit(batch_df, mode, id_column)
+
+    def _connect(self):
+        with open(self.address_path) as f:
+            address=json.load(f)
+        connection=Client(address["address"], family="AF_UNIX", authkey=bytes.fromhex(address["authkey"]))
+        self._connection=connection
+        threading.Thread(target=self._receive_loop, args=(connection,), name="gyaan-writer-replies", daemon=True).start()
+
+    def _receive_loop(
+        self,
+        connection: Connection):
+
+        try:
+            while True:
+                request_id,ok,payload=connection.recv()
+                self._loop.call_soon_threadsafe(self._resolve, request_id, ok, payload)
+        except (EOFError, OSError):
+            self._loop.call_soon_threadsafe(self._disconnected, connection)
+
+    def _resolve(
+        self,
+        request_id: int,
+        ok: bool,
+        payload: Any):
+
+        _,future=self._pending.pop(request_id, (None, None))
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(f"Writer process failed to commit: {payload}"))
+
+    def _disconnected(
+        self,
+        connection: Connection):
+
+        if self._connection is connection:
+            self._connection=None
+        for request_id,(sent_on,future) in list(self._pending.items()):
+            if sent_on is not connection:
+                continue
+            del self._pending[request_id]
+            if not future.done():
+                future.set_exception(ConnectionError("Writer process went away; the batch may or may not have been committed"))
+
+    def _send(
+        self,
+        connection: Connection,
+        message: tuple):
+
+        with self._send_lock:
+            connection.send(message)
+
+    async def submit(
+        self,
+        table_path: str,
+        batch_df: pl.DataFrame,
+        mode: str,
+        id_column: Optional[str]=None) -> CommitResult:
+
+        resent=False
+        while True:
+            if self.is_writer:
+                return await self._commit(table_path, batch_df, mode, id_column)
+            if self._connection is None:
+                async with self._elect_lock:
+                    if self._connection is None and not self.is_writer:
+                        await self._elect()
+                continue
+
+            connection=self._connection
+            request_id=next(self._request_ids)
+            future=self._loop.create_future()
+            self._pending[request_id]=(connection, future)
+            try:
+                await asyncio.to_thread(self._send, connection, (request_id, table_path, batch_df, mode, id_column))
+            except OSError:
+                # Never delivered, so it is safe to re-elect and resend once
+                self._pending.pop(request_id, None)
+                if future.done():
+                    future.exception()
+                else:
+                    future.cancel()
+                if self._connection is connection:
+                    self._connection=None
+                if resent:
+                    raise ConnectionError(f"Could not reach the writer process for {self.directory}")
+                resent=True
+                continue
+            return await future
+
+    async def stop(self):
+        if self.is_writer:
+            self.is_writer=False
+            self._stopping=True
+            for coalescer in self._coalescers.values():
+                await coalescer.flush()
+            try:
+                Client(self._address, family="AF_UNIX", authkey=self._authkey).close()
+            except Exception:
+                pass
+            self._listener.close()
+            for connection in list(self._clients):
+                _shutdown(connection)
+            if os.path.exists(self.address_path):
+                with open(self.address_path) as f:
+                    if json.load(f).get("pid")==os.getpid():
+                        os.unlink(self.address_path)
+            portalocker.unlock(self._lock_file)
+            self._lock_file.close()
+            self._lock_file=None
+        elif self._connection is not None:
+            _shutdown(self._connection)
+            self._connection=None
+
+def _shutdown(
+    connection: Connection):
+
+    # close() alone does not wake a thread blocked in recv() on the same socket
+    try:
+        socket.socket(fileno=os.dup(connection.fileno())).shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
@@ -1,55 +1,575 @@
 import polars as pl
 import pyarrow as pa
-from deltalake import DeltaTable, write_deltalake
+import pyarrow.parquet as pq
+from deltalake import DeltaTable, write_deltalake, CommitProperties
 import asyncio
-from typing import Optional, List
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Optional, List, Tuple, Dict, NamedTuple, Iterator, Any
+from uuid import uuid4
+import io
+import itertools
+import os
+import time
+import json
+import weakref
+from urllib.parse import unquote
+
+COMMIT_TOKEN_KEY="gyaan.commit"
+
+# Commits that rewrite or delete files without changing the table's rows.
+MAINTENANCE_OPERATIONS=("OPTIMIZE","VACUUM START","VACUUM END")
+
+EXECUTOR_KINDS=("thread","process","inline")
+
+IMPORT_FORMATS={
+    ".parquet":"parquet",
+    ".pq":"parquet",
+    ".jsonl":"jsonl",
+    ".ndjson":"jsonl",
+    ".arrow":"ipc",
+    ".ipc":"ipc",
+    ".feather":"ipc"
+}
+
+_executor: Optional[Executor]=None
+_executor_kind: str=os.environ.get("GYAAN_IO_EXECUTOR","thread")
+_executor_workers: Optional[int]=int(os.environ["GYAAN_IO_WORKERS"]) if "GYAAN_IO_WORKERS" in os.environ else None
+
+def configure_executor(
+    kind: str="thread",
+    max_workers: Optional[int]=None):
+
+    global _executor, _executor_kind, _executor_workers
+    assert kind in EXECUTOR_KINDS, f"Executor kind must be one of {EXECUTOR_KINDS}"
+
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor=None
+    _executor_kind=kind
+    _executor_workers=max_workers
+
+def get_executor():
+    global _executor
+    if _executor is None and _executor_kind!="inline":
+        workers=_executor_workers or min(8, (os.cpu_count() or 1)+4)
+        if _executor_kind=="process":
+            _executor=ProcessPoolExecutor(max_workers=workers)
+        else:
+            _executor=ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gyaan-io")
+    return _executor
+
+async def run_blocking(fn, *args, **kwargs):
+    executor=get_executor()
+    if executor is None:
+        return fn(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args, **kwargs))
+
+class CommitResult(NamedTuple):
+    ids: Optional[List[Any]]
+    version: Optional[int]
+    batch: pl.DataFrame
+
+class TableHealth(NamedTuple):
+    version: int
+    files: int
+    bytes: int
+    average_file_size: float
+    versions_since_optimize: int
+
+class LogEntry(NamedTuple):
+    version: int
+    operation: Optional[str]
+    metrics: Dict[str,Any]
+    added: List[str]
+    removed: List[str]
+    schema_changed: bool
+
+class WriteCoalescer():
+    """
+    Group commit for one Delta table. Inserts and updates submitted within
+    `window` seconds (or until `max_rows` are pending) are written as a single
+    append and one merge per update column set. Each caller gets back its own
+    ids together with the version and rows of the commit it landed in.
+    """
+
+    def __init__(
+        self,
+        table_path: str,
+        window: float=0.005,
+        max_rows: int=50_000,
+        num_retries: int=3):
+
+        assert table_path.startswith("file://"), "Table path must be a file URI"
+
+        self.table_path=table_path
+        self.window=window
+        self.max_rows=max_rows
+        self.num_retries=num_retries
+        self.commits=0
+
+        self._pending=[]
+        self._pending_rows=0
+        self._timer=None
+        self._flush_tasks=set()
+        self._flush_lock=asyncio.Lock()
+
+    async def submit(
+        self,
+        batch_df: pl.DataFrame,
+        mode: str,
+        id_column: Optional[str]=None):
+
+        assert mode in ("append","update"), "Mode must be append or update"
+        assert batch_df.height>0, "Data to be written should be non-empty"
+
+        future=asyncio.get_running_loop().create_future()
+        self._pending.append((mode, id_column, batch_df, future))
+        self._pending_rows+=batch_df.height
+
+        if self._pending_rows>=self.max_rows:
+            self._schedule_flush(0)
+        elif self._timer is None:
+            self._schedule_flush(self.window)
+        return await future
+
+    def _schedule_flush(
+        self,
+        delay: float):
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer=asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        task=asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        async with self._flush_lock:
+            pending,self._pending=self._pending,[]
+            self._pending_rows=0
+            self._timer=None
+
+            groups: Dict[Tuple,List]={}
+            for mode,id_column,batch_df,future in pending:
+                key=(mode, id_column, tuple(batch_df.columns))
+                groups.setdefault(key,[]).append((batch_df, future))
+
+            for (mode,id_column,_),requests in sorted(groups.items(), key=lambda item: item[0][0]!="append"):
+                try:
+                    batch=pl.concat([batch_df for batch_df,_ in requests], how="vertical_relaxed")
+                    if mode=="append":
+                        version=await insert_table(self.table_path, batch, num_retries=self.num_retries, coalesce=False)
+                    else:
+                        keys=[id_column]+(["memory_id"] if "memory_id" in batch.columns else [])
+                        batch=batch.unique(subset=keys, keep="last", maintain_order=True)
+                        version=await update_table(self.table_path, batch, id_column=id_column, num_retries=self.num_retries, coalesce=False)
+                    self.commits+=1
+                except Exception as e:
+                    for _,future in requests:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for batch_df,future in requests:
+                    if not future.done():
+                        ids=batch_df[id_column].to_list() if id_column is not None else None
+                        future.set_result(CommitResult(ids, version, batch))
+
+_coalescers=weakref.WeakKeyDictionary()
+_coalesce_writes: bool=os.environ.get("GYAAN_COALESCE_WRITES","0")=="1"
+_coalesce_options: Dict[str,Any]={}
+
+def configure_coalescing(
+    enabled: bool=True,
+    window: float=0.005,
+    max_rows: int=50_000):
+
+    global _coalesce_writes, _coalesce_options
+    _coalesce_writes=enabled
+    _coalesce_options={"window":window,"max_rows":max_rows}
+
+def coalescing_enabled():
+    return _coalesce_writes
+
+def get_coalescer(
+    table_path: str):
+
+    per_loop=_coalescers.setdefault(asyncio.get_running_loop(),{})
+    if table_path not in per_loop:
+        per_loop[table_path]=WriteCoalescer(table_path, **_coalesce_options)
+    return per_loop[table_path]
+
+def _commit_properties(commit_token: str):
+    return CommitProperties(custom_metadata={COMMIT_TOKEN_KEY:commit_token})
+
+def _find_commit_version(
+    table_path: str,
+    commit_token: str,
+    lookback: int=16):
+
+    dt=DeltaTable(table_path)
+    for limit in (lookback, None):
+        for entry in dt.history(limit=limit):
+            if entry.get(COMMIT_TOKEN_KEY)==commit_token:
+                return entry["version"]
+    return None
+
+def _write_table(
+    table_path: str,
+    data: pl.DataFrame,
+    mode: str,
+    schema_mode: Optional[str]=None):
+
+    data.write_delta(table_path, mode=mode, delta_write_options={"schema_mode":schema_mode} if schema_mode else None)
+
+def _read_table(
+    table_path: str,
+    version: Optional[int]=None,
+    columns: Optional[List[str]]=None,
+    filters: Optional[List[Tuple[str,str,Any]]]=None):
+
+    dt = DeltaTable(table_path, version=version)
+    return pl.from_arrow(dt.to_pyarrow_table(columns=columns, filters=filters)), dt.version()
+
+def _table_version(
+    table_path: str):
+
+    return DeltaTable(table_path).version()
+
+def _append_table(
+    table_path: str,
+    insertion_df: pl.DataFrame,
+    commit_token: str,
+    schema_mode: Optional[str]=None):
+
+    options={"commit_properties":_commit_properties(commit_token)}
+    if schema_mode:
+        options["schema_mode"]=schema_mode
+    insertion_df.write_delta(table_path, mode="append", delta_write_options=options)
+    return _find_commit_version(table_path, commit_token)
+
+def _merge_table(
+    table_path: str,
+    source_df: pl.DataFrame,
+    id_column: str,
+    commit_token: str,
+    update_columns: Optional[List[str]]=None):
+
+    predicate=f"source.{id_column}=target.{id_column}"
+    if "memory_id" in source_df.columns:
+        # Rows of a shared table only match within their own memory
+        predicate+=" AND source.memory_id=target.memory_id"
+    merger=source_df.write_delta(
+        table_path,
+        mode="merge",
+        delta_merge_options={
+            "predicate": predicate,
+            "source_alias": "source",
+            "target_alias": "target",
+            "commit_properties": _commit_properties(commit_token)
+        })
+    if update_columns is None:
+        merger.when_matched_delete().execute()
+    else:
+        merger.when_matched_update(updates={col: f"source.{col}" for col in update_columns if col!="memory_id"}).execute()
+    return _find_commit_version(table_path, commit_token)
+
+def _optimize_table(
+    table_path: str,
+    z_order_index: Optional[List[str]],
+    retention_hours: Optional[int],
+    dry_delete: Optional[bool]):
+
+    dt = DeltaTable(table_path)
+    if z_order_index is not None:
+        stats=dt.optimize.z_order(z_order_index)
+    else:
+        stats=dt.optimize.compact()
+    dt.vacuum(retention_hours=retention_hours, dry_run=dry_delete, enforce_retention_duration=False)
+    return stats
+
+def _table_health(
+    table_path: str,
+    history_limit: int):
+
+    dt=DeltaTable(table_path)
+    sizes=dt.get_add_actions(flatten=True).column("size_bytes").to_pylist()
+    versions_since_optimize=0
+    for entry in dt.history(limit=history_limit):
+        if entry.get("operation")=="OPTIMIZE":
+            break
+        if entry.get("operation") not in MAINTENANCE_OPERATIONS:
+            versions_since_optimize+=1
+    total=int(sum(sizes))
+    return TableHealth(dt.version(), len(sizes), total, total/len(sizes) if sizes else 0.0, versions_since_optimize)
+
+def _local_path(
+    table_path: str):
+
+    return table_path[len("file://"):]
+
+def _read_commit_log(
+    table_path: str,
+    start_version: int,
+    end_version: int):
+
+    log_path=os.path.join(_local_path(table_path),"_delta_log")
+    entries=[]
+    for version in range(start_version, end_version+1):
+        operation,metrics,added,removed,schema_changed=None,{},[],[],False
+        with open(os.path.join(log_path,f"{version:020d}.json")) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                action=json.loads(line)
+                if "add" in action:
+                    added.append(unquote(action["add"]["path"]))
+                elif "remove" in action:
+                    removed.append(unquote(action["remove"]["path"]))
+                elif "metaData" in action:
+                    schema_changed=True
+                elif "commitInfo" in action:
+                    operation=action["commitInfo"].get("operation")
+                    metrics=action["commitInfo"].get("operationMetrics") or {}
+        entries.append(LogEntry(version, operation, metrics, added, removed, schema_changed))
+    return entries
+
+def _read_data_files(
+    table_path: str,
+    paths: List[str],
+    columns: Optional[List[str]]):
+
+    root=_local_path(table_path)
+    return pl.concat([pl.read_parquet(os.path.join(root,path), columns=columns) for path in paths], how="vertical_relaxed")
+
+def _append_batches(
+    table_path: str,
+    batches: Iterator[pl.DataFrame],
+    max_rows: Optional[int],
+    target_file_size: Optional[int],
+    commit_token: str):
+
+    first=next(batches, None)
+    if first is None:
+        return None,0
+    first=first.to_arrow(compat_level=pl.CompatLevel.newest())
+    rows=0
+    errors=[]
+
+    def stream():
+        nonlocal rows
+        try:
+            rows+=first.num_rows
+            yield from first.to_batches()
+            while max_rows is None or rows<max_rows:
+                batch=next(batches, None)
+                if batch is None:
+                    return
+                rows+=batch.height
+                yield from batch.to_arrow(compat_level=pl.CompatLevel.newest()).to_batches()
+        except Exception as e:
+            errors.append(e)
+            raise
+
+    try:
+        write_deltalake(
+            table_path,
+            pa.RecordBatchReader.from_batches(first.schema, stream()),
+            mode="append",
+            target_file_size=target_file_size,
+            commit_properties=_commit_properties(commit_token))
+    except Exception:
+        # Surface the reader's own error rather than the writer's wrapping of it
+        if errors:
+            raise errors[0]
+        raise
+    return _find_commit_version(table_path, commit_token),rows
+
+def _sidecar_files(
+    directory: str,
+    name: str):
+
+    found=[]
+    for entry in os.listdir(directory):
+        version=entry[len(name)+1:-len(".arrow")]
+        if entry.startswith(f"{name}.") and entry.endswith(".arrow") and version.isdigit():
+            found.append((int(version), os.path.join(directory,entry)))
+    return sorted(found)
+
+def _write_sidecar(
+    directory: str,
+    name: str,
+    data: pl.DataFrame,
+    version: int):
+
+    path=os.path.join(directory,f"{name}.{version:020d}.arrow")
+    staging=f"{path}.{os.getpid()}.tmp"
+    data.rechunk().write_ipc(staging, compression="uncompressed")
+    os.replace(staging, path)
+    # Processes still mapping an older file keep its pages until they drop it
+    for old_version,old_path in _sidecar_files(directory, name):
+        if old_version<version:
+            try:
+                os.unlink(old_path)
+            except FileNotFoundError:
+                pass
+    return path
+
+def _compact_table(
+    table_path: str,
+    z_order_index: Optional[List[str]],
+    target_size: Optional[int],
+    max_concurrent_tasks: Optional[int],
+    commit_token: str):
+
+    dt=DeltaTable(table_path)
+    options={
+        "target_size":target_size,
+        "max_concurrent_tasks":max_concurrent_tasks,
+        "commit_properties":_commit_properties(commit_token)
+    }
+    if z_order_index is not None:
+        stats=dt.optimize.z_order(z_order_index, **options)
+    else:
+        stats=dt.optimize.compact(**options)
+    version=_find_commit_version(table_path, commit_token) if stats["numFilesAdded"] or stats["numFilesRemoved"] else None
+    return stats, version
+
+def _version_as_of(
+    table_path: str,
+    timestamp: float):
+
+    for entry in DeltaTable(table_path).history():
+        if entry["timestamp"]<=timestamp*1000:
+            return entry["version"]
+    return None
+
+def _purge_tombstones(
+    table_path: str,
+    id_column: str,
+    cutoff_version: int,
+    max_rows: Optional[int],
+    commit_token: str):
+
+    # Rows already deleted in the cutoff snapshot have been tombstones for at
+    # least the retention window; file stats on `deleted` skip clean files.
+    tombstones=pl.scan_delta(table_path, version=cutoff_version, use_pyarrow=True).filter(pl.col("deleted")).select(id_column)
+    if max_rows is not None:
+        tombstones=tombstones.head(max_rows)
+    tombstones=tombstones.collect()
+    if tombstones.height==0:
+        return 0, None
+
+    metrics=tombstones.write_delta(
+        table_path,
+        mode="merge",
+        delta_merge_options={
+            "predicate": f"source.{id_column}=target.{id_column}",
+            "source_alias": "source",
+            "target_alias": "target",
+            "commit_properties": _commit_properties(commit_token)
+        }).when_matched_delete(predicate="target.deleted = true").execute()
+    if not metrics["num_target_rows_deleted"]:
+        return 0, None
+    return metrics["num_target_rows_deleted"], _find_commit_version(table_path, commit_token)
+
+def _vacuum_table(
+    table_path: str,
+    retention_hours: int,
+    dry_run: bool):
+
+    dt=DeltaTable(table_path)
+    removed=dt.vacuum(retention_hours=retention_hours, dry_run=dry_run, enforce_retention_duration=False)
+    return removed
 
 async def create_table(
     table_path: str,
     data: pl.DataFrame,
     mode: Optional[str]="ignore",
-    num_retries: Optional[int]=3):
+    num_retries: Optional[int]=3,
+    schema_mode: Optional[str]=None):
+    """`schema_mode` ("merge" or "overwrite") lets the write change the table's schema."""
 
     assert table_path.startswith("file://"), "Table path must be a file URI"
-    
+
     for attempt in range(num_retries):
         try:
-            data.write_delta(
-                table_path, 
-                mode=mode)
+            await run_blocking(_write_table, table_path, data, mode, schema_mode)
             break
         except Exception as e:
             if attempt == num_retries - 1:
                 raise e
             await asyncio.sleep((attempt+1)*0.1)
-    
+
 async def read_table(
     table_path: str):
 
     assert table_path.startswith("file://"), "Table path must be a file URI"
-    
+
     try:
-        dt = DeltaTable(table_path)
-        pyarrow_table = dt.to_pyarrow_table()
-        df = pl.from_arrow(pyarrow_table)
+        df,_=await run_blocking(_read_table, table_path)
         return df
     except Exception as e:
         print(f"Error reading with deltalake library directly: {e}")
-    
+
+async def read_versioned_table(
+    table_path: str,
+    version: Optional[int]=None,
+    columns: Optional[List[str]]=None,
+    filters: Optional[List[Tuple[str,str,Any]]]=None):
+    """
+    Read a table (at `version`, or the latest) with its version. `filters`
+    are pyarrow DNF predicates, e.g. [("memory_id","=",id)]; files whose
+    statistics rule them out are skipped.
+    """
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    return await run_blocking(_read_table, table_path, version, columns, filters)
+
+async def scan_table(
+    table_path: str,
+    version: Optional[int]=None):
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    # The pyarrow dataset built by deltalake carries each file's min/max stats,
+    # so filters pushed into the scan skip whole files before row groups.
+    # Building it reads the Delta log; not run_blocking, as a process pool cannot return a LazyFrame
+    return await asyncio.to_thread(pl.scan_delta, table_path, version=version, use_pyarrow=True)
+
+async def table_version(
+    table_path: str):
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    return await run_blocking(_table_version, table_path)
+
 async def insert_table(
     table_path:str,
     insertion_df: pl.DataFrame,
-    num_retries: Optional[int]=3):
-    
+    num_retries: Optional[int]=3,
+    coalesce: Optional[bool]=None,
+    schema_mode: Optional[str]=None):
+    """
+    With `schema_mode="merge"`, columns missing from the table are added to
+    it (and ones missing from the rows are filled with nulls); such writes
+    are never coalesced.
+    """
+
     assert table_path.startswith("file://"), "Table path must be a file URI"
     assert insertion_df.height>0, "Data to be inserted should be non-empty"
 
+    if schema_mode is None and (coalesce or (coalesce is None and _coalesce_writes)):
+        return (await get_coalescer(table_path).submit(insertion_df, "append")).version
+
+    commit_token=str(uuid4())
     for attempt in range(num_retries):
         try:
-            insertion_df.write_delta(
-                table_path, 
-                mode="append")
-            break
+            return await run_blocking(_append_table, table_path, insertion_df, commit_token, schema_mode)
         except Exception as e:
             if attempt == num_retries - 1:
                 raise e
@@ -59,25 +579,19 @@ async def update_table(
     table_path:str,
     update_df: pl.DataFrame,
     id_column: str="id",
-    num_retries: Optional[int]=3):
+    num_retries: Optional[int]=3,
+    coalesce: Optional[bool]=None):
 
     assert table_path.startswith("file://"), "Table path must be a file URI"
     assert update_df.height>0, "Data to be updated should be non-empty"
-    
-    predicate=f"source.{id_column}=target.{id_column}"
-    update_set = {col: f"source.{col}" for col in update_df.columns}
 
+    if coalesce or (coalesce is None and _coalesce_writes):
+        return (await get_coalescer(table_path).submit(update_df, "update", id_column)).version
+
+    commit_token=str(uuid4())
     for attempt in range(num_retries):
         try:
-            update_df.write_delta(
-                table_path,
-                mode="merge",
-                delta_merge_options={
-                    "predicate": predicate,
-                    "source_alias": "source",
-                    "target_alias": "target"
-                }).when_matched_update(updates=update_set).execute()
-            break
+            return await run_blocking(_merge_table, table_path, update_df, id_column, commit_token, update_df.columns)
         except Exception as e:
             if attempt == num_retries - 1:
                 raise e
@@ -88,23 +602,14 @@ async def delete_rows(
     ids_to_delete_df: pl.DataFrame,
     id_column: str = "id",
     num_retries: Optional[int] = 3):
-             
+
     assert table_path.startswith("file://"), "Table path must be a file URI"
     assert ids_to_delete_df.height>0, "Data to be deleted should be non-empty"
-    
-    predicate=f"source.{id_column}=target.{id_column}"
+
+    commit_token=str(uuid4())
     for attempt in range(num_retries):
         try:
-            ids_to_delete_df.write_delta(
-                table_path,
-                mode="merge",
-                delta_merge_options={
-                    "predicate": predicate,
-                    "source_alias": "source",
-                    "target_alias": "target"
-                }
-            ).when_matched_delete().execute()
-            break
+            return await run_blocking(_merge_table, table_path, ids_to_delete_df, id_column, commit_token)
         except Exception as e:
             if attempt == num_retries - 1:
                 raise e
@@ -116,19 +621,205 @@ async def optimize(
     retention_hours: Optional[int]=24,
     dry_delete: Optional[bool]=True,
     num_retries: Optional[int]=3):
-    
+
     assert table_path.startswith("file://"), "Table path must be a file URI"
-    
+
+    for attempt in range(num_retries):
+        try:
+            return await run_blocking(_optimize_table, table_path, z_order_index, retention_hours, dry_delete)
+        except Exception as e:
+            if attempt == num_retries - 1:
+                raise e
+            await asyncio.sleep((attempt+1)*0.1)
+
+async def table_health(
+    table_path: str,
+    history_limit: int=256):
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    return await run_blocking(_table_health, table_path, history_limit)
+
+async def compact(
+    table_path: str,
+    z_order_index: Optional[List[str]]=None,
+    target_size: Optional[int]=None,
+    max_concurrent_tasks: Optional[int]=None,
+    num_retries: Optional[int]=3):
+    """Bin-pack (or Z-order) the table without vacuuming. Returns (metrics, version)."""
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    commit_token=str(uuid4())
     for attempt in range(num_retries):
         try:
-            dt = DeltaTable(table_path)
-            if z_order_index is not None:
-                stats=dt.optimize.z_order(z_order_index)
-            else:
-                stats=dt.optimize.compact()
-            dt.vacuum(retention_hours=retention_hours, dry_run=dry_delete, enforce_retention_duration=False)
-            return stats
+            return await run_blocking(_compact_table, table_path, z_order_index, target_size, max_concurrent_tasks, commit_token)
         except Exception as e:
             if attempt == num_retries - 1:
                 raise e
-            await asyncio.sleep((attempt+1)*0.1)
\ No newline at end of file
+            await asyncio.sleep((attempt+1)*0.1)
+
+async def vacuum(
+    table_path: str,
+    retention_hours: int=24,
+    dry_run: bool=False,
+    num_retries: Optional[int]=3):
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    for attempt in range(num_retries):
+        try:
+            return await run_blocking(_vacuum_table, table_path, retention_hours, dry_run)
+        except Exception as e:
+            if attempt == num_retries - 1:
+                raise e
+            await asyncio.sleep((attempt+1)*0.1)
+
+async def purge_tombstones(
+    table_path: str,
+    id_column: str="id",
+    retention_hours: float=24,
+    max_rows: Optional[int]=None,
+    num_retries: Optional[int]=3):
+    """Physically delete rows soft-deleted more than `retention_hours` ago. Returns (rows_purged, version)."""
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    cutoff_version=await run_blocking(_version_as_of, table_path, time.time()-retention_hours*3600)
+    if cutoff_version is None:
+        return 0, None
+
+    commit_token=str(uuid4())
+    for attempt in range(num_retries):
+        try:
+            return await run_blocking(_purge_tombstones, table_path, id_column, cutoff_version, max_rows, commit_token)
+        except Exception as e:
+            if attempt == num_retries - 1:
+                raise e
+            await asyncio.sleep((attempt+1)*0.1)
+
+async def version_as_of(
+    table_path: str,
+    timestamp: float):
+    """Latest version committed at or before `timestamp` (seconds since the epoch), or None."""
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    return await run_blocking(_version_as_of, table_path, timestamp)
+
+async def read_commit_log(
+    table_path: str,
+    start_version: int,
+    end_version: int):
+    """Parse the JSON commits in [start_version, end_version]. Raises FileNotFoundError once a commit has been cleaned up."""
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+
+    return await run_blocking(_read_commit_log, table_path, start_version, end_version)
+
+async def read_data_files(
+    table_path: str,
+    paths: List[str],
+    columns: Optional[List[str]]=None):
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+    assert paths, "At least one data file is required"
+
+    return await run_blocking(_read_data_files, table_path, paths, columns)
+
+async def write_sidecar(
+    directory: str,
+    name: str,
+    data: pl.DataFrame,
+    version: int):
+    """
+    Write `data` as an uncompressed Arrow IPC file tagged with a table
+    version, replacing older versions of the same sidecar.
+    """
+
+    # Not run_blocking: a process executor would pickle the whole frame
+    return await asyncio.to_thread(_write_sidecar, directory, name, data, version)
+
+def open_sidecar(
+    directory: str,
+    name: str):
+    """
+    Memory-map the newest version of a sidecar. Returns (version, frame), or
+    None if there is none. The frame's buffers are views of the file, so
+    processes mapping the same file share its pages.
+    """
+
+    for version,path in reversed(_sidecar_files(directory, name)):
+        try:
+            return version, pl.read_ipc(path, memory_map=True, rechunk=False)
+        except FileNotFoundError:
+            continue
+    return None
+
+def iter_batches(
+    source: Any,
+    batch_rows: int=100_000,
+    format: Optional[str]=None) -> Iterator[pl.DataFrame]:
+    """
+    Stream `source` as DataFrames of at most `batch_rows` rows. The source
+    is a Parquet, JSON-lines or Arrow IPC file (picked by suffix unless
+    `format` is given), an Arrow table or record batch reader, or an
+    iterable of record batches or DataFrames.
+    """
+
+    if isinstance(source,(str,os.PathLike)):
+        path=os.fspath(source)
+        format=format or IMPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+        if format not in set(IMPORT_FORMATS.values()):
+            raise ValueError(f"Cannot tell the format of {path}; pass one of {sorted(set(IMPORT_FORMATS.values()))}")
+        batches=_file_batches(path, format, batch_rows)
+    elif isinstance(source, pl.DataFrame):
+        batches=[source]
+    elif isinstance(source, pa.Table):
+        batches=source.to_batches(max_chunksize=batch_rows)
+    else:
+        batches=source
+
+    for batch in batches:
+        frame=batch if isinstance(batch, pl.DataFrame) else pl.from_arrow(batch)
+        yield from frame.iter_slices(batch_rows)
+
+def _file_batches(
+    path: str,
+    format: str,
+    batch_rows: int):
+
+    if format=="parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_rows)
+    elif format=="ipc":
+        source=pa.memory_map(path)
+        try:
+            reader=pa.ipc.open_file(source)
+            batches=(reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            batches=pa.ipc.open_stream(source)
+        yield from batches
+    else:
+        with open(path,"rb") as f:
+            while lines:=list(itertools.islice(f, batch_rows)):
+                yield pl.read_ndjson(io.BytesIO(b"".join(lines)))
+
+async def append_batches(
+    table_path: str,
+    batches: Iterator[pl.DataFrame],
+    max_rows: Optional[int]=None,
+    target_file_size: Optional[int]=None):
+    """
+    Append DataFrames from `batches` to a table in a single commit, streaming
+    them to the writer so only a batch at a time is held. Stops after the
+    batch that reaches `max_rows`, leaving the rest for another call.
+    Returns (version, rows); rows is 0 once `batches` is exhausted. A
+    generator cannot be replayed, so failed commits are not retried.
+    """
+
+    assert table_path.startswith("file://"), "Table path must be a file URI"
+    commit_token=str(uuid4())
+
+    # Not run_blocking: the batches are a generator that a process pool cannot take
+    return await asyncio.to_thread(_append_batches, table_path, batches, max_rows, target_file_size, commit_token)
@@ -0,0 +1,161 @@
+from gyaan.utils.io import table_health, compact, vacuum, TableHealth
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional, List, Dict, Tuple, Callable, Awaitable, NamedTuple, Any
+
+class MaintenancePolicy(NamedTuple):
+    """
+    Thresholds for background table maintenance.
+
+    A table is compacted once it has at least `min_files` files and either
+    exceeds `max_files`, averages below `min_average_file_size` bytes, or has
+    taken `max_versions` commits since its last OPTIMIZE. Every
+    `z_order_every`-th compaction of a table with Z-order columns re-clusters
+    the whole table instead of bin-packing. Vacuum removes unreferenced files
+    older than `vacuum_retention_hours`, at most once per `vacuum_interval`.
+    Nothing runs until the owner has been idle for `idle_time` seconds, and a
+    table is compacted at most once per `min_interval` seconds.
+    """
+    min_files: int=8
+    max_files: int=64
+    min_average_file_size: int=16*1024*1024
+    max_versions: int=100
+    target_size: Optional[int]=None
+    max_concurrent_tasks: Optional[int]=1
+    z_order_every: int=10
+    vacuum_retention_hours: int=24
+    vacuum_interval: float=3600.0
+    min_interval: float=300.0
+    idle_time: float=5.0
+    check_interval: float=30.0
+
+def needs_compaction(
+    health: TableHealth,
+    policy: MaintenancePolicy):
+
+    if health.files<policy.min_files:
+        return False
+    return (health.files>policy.max_files
+            or health.average_file_size<policy.min_average_file_size
+            or health.versions_since_optimize>=policy.max_versions)
+
+class MaintenanceScheduler():
+    """
+    Periodically checks the health of a set of Delta tables and compacts,
+    Z-orders and vacuums them while their owner is idle.
+
+    `tables` maps a name to (table_path, z_order_columns). `idle_time` returns
+    how long the owner has gone without writing, and `on_commit` is awaited
+    with (name, version) after each compaction so cached views can account
+    for the data-neutral commit. Compaction is an optimistic Delta commit, so
+    a conflict with a live writer only fails that attempt; the table is
+    retried on a later check.
+    """
+
+    def __init__(
+        self,
+        tables: Dict[str,Tuple[str,Optional[List[str]]]],
+        policy: Optional[MaintenancePolicy]=None,
+        idle_time: Optional[Callable[[],float]]=None,
+        on_commit: Optional[Callable[[str,int],Awaitable[None]]]=None):
+
+        for table_path,_ in tables.values():
+            assert table_path.startswith("file://"), "Table path must be a file URI"
+
+        self.tables=tables
+        self.policy=policy or MaintenancePolicy()
+        self.idle_time=idle_time or (lambda: float("inf"))
+        self.on_commit=on_commit
+        self.history=deque(maxlen=100)
+
+        self._compactions={name:0 for name in tables}
+        self._last_compaction={name:float("-inf") for name in tables}
+        self._last_vacuum={name:float("-inf") for name in tables}
+        self._task=None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def _record(
+        self,
+        name: Optional[str],
+        action: str,
+        **details: Any):
+
+        report={"table":name,"action":action,"timestamp":time.time(),**details}
+        self.history.append(report)
+        return report
+
+    async def maintain_table(
+        self,
+        name: str,
+        force: bool=False):
+
+        table_path,z_order_columns=self.tables[name]
+        policy=self.policy
+        now=time.monotonic()
+        reports=[]
+
+        health=await table_health(table_path)
+        if force or (now-self._last_compaction[name]>=policy.min_interval and needs_compaction(health, policy)):
+            self._last_compaction[name]=now
+            self._compactions[name]+=1
+            z_order=z_order_columns if z_order_columns and self._compactions[name]%policy.z_order_every==0 else None
+            try:
+                stats,version=await compact(table_path, z_order, policy.target_size, policy.max_concurrent_tasks, num_retries=1)
+            except Exception as e:
+                reports.append(self._record(name, "compact_failed", error=str(e)))
+            else:
+                if version is not None and self.on_commit is not None:
+                    await self.on_commit(name, version)
+                reports.append(self._record(
+                    name, "z_order" if z_order else "compact", version=version,
+                    files_before=health.files, files_added=stats["numFilesAdded"], files_removed=stats["numFilesRemoved"]))
+
+        if force or now-self._last_vacuum[name]>=policy.vacuum_interval:
+            self._last_vacuum[name]=now
+            try:
+                removed=await vacuum(table_path, retention_hours=policy.vacuum_retention_hours, num_retries=1)
+            except Exception as e:
+                reports.append(self._record(name, "vacuum_failed", error=str(e)))
+            else:
+                reports.append(self._record(name, "vacuum", files_deleted=len(removed)))
+        return reports
+
+    async def check(
+        self,
+        force: bool=False):
+        """One maintenance pass over every table; skipped unless the owner is idle or `force` is set."""
+
+        reports=[]
+        for name in self.tables:
+            if not force and self.idle_time()<self.policy.idle_time:
+                break
+            reports.extend(await self.maintain_table(name, force))
+        return reports
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.policy.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                # Kept with the other reports; a failed pass is retried at the next interval
+                self._record(None, "check_failed", error=str(e))
+
+    def start(self):
+        if not self.running:
+            self._task=asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task=None
@@ -17,6 +17,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 from gyaan.utils.io import create_table, insert_table, read_table
+from deltalake import DeltaTable
 
 
 # Configure logging
@@ -33,6 +34,8 @@ ROWS_PER_BATCH = 100  # Number of rows per batch
 BASE_URL = "http://127.0.0.1:8000"
 DELTA_TABLE_PATH = "./test_delta_table"  # Path to store the Delta table
 DELTA_URI = f"file://{os.path.abspath(DELTA_TABLE_PATH)}"  # Full URI for Delta table
+COALESCE_WRITES = "--coalesce" in sys.argv  # Route inserts through the group-commit coalescer
+INGEST_TIMEOUT = 30  # Seconds to wait for all rows to become visible
 
 # FastAPI server setup
 app = FastAPI()
@@ -69,7 +72,7 @@ async def insert_data_endpoint(data: dict, background_tasks: BackgroundTasks):
         df = pl.DataFrame(data)
         
         # Insert the data
-        background_tasks.add_task(insert_table, DELTA_URI, df)
+        background_tasks.add_task(insert_table, DELTA_URI, df, coalesce=COALESCE_WRITES)
         return {"status": "success", "message": "Data insertion initiated"}
     except Exception as e:
         logger.error(f"Error inserting data: {e}")
@@ -104,10 +107,13 @@ async def table_stats_endpoint():
             "count": process_counts["len"].to_list()
         }
         
+        dt = DeltaTable(DELTA_URI)
         stats = {
             "total_rows": df.height,
             "unique_processes": df["process"].n_unique(),
-            "rows_per_process": process_counts_dict
+            "rows_per_process": process_counts_dict,
+            "version": dt.version(),
+            "num_files": len(dt.files())
         }
         return stats
     except Exception as e:
@@ -307,9 +313,14 @@ def main():
     
     total_time = time.time() - start_time
     
-    # Add a brief delay to allow operations to complete on the server
-    logger.info("\nWaiting briefly for server operations to complete...")
-    time.sleep(5)
+    # Wait for the background inserts to become visible in the table
+    logger.info("\nWaiting for server operations to complete...")
+    while time.time() - start_time < INGEST_TIMEOUT:
+        stats = get_table_stats()
+        if stats and stats.get("total_rows", 0) >= expected_total_rows:
+            break
+        time.sleep(0.05)
+    ingest_time = time.time() - start_time
     
     # Calculate success metrics
     successful_requests = [r for r in all_results if r["success"]]
@@ -322,6 +333,11 @@ def main():
     
     # Print test results
     logger.info(f"\nTest completed in {total_time:.2f} seconds")
+    logger.info(f"Write mode: {'coalesced' if COALESCE_WRITES else 'per-request commits'}")
+    if stats:
+        inserted_rows = stats["total_rows"] - 1
+        logger.info(f"Ingest throughput: {inserted_rows / ingest_time:.1f} rows/s ({inserted_rows} rows in {ingest_time:.2f}s)")
+        logger.info(f"Delta commits: {stats['version']}, data files: {stats['num_files']}")
     logger.info(f"Successful requests: {len(successful_requests)} out of {total_requests}")
     logger.info(f"Success rate: {(len(successful_requests) / total_requests) * 100:.1f}%")
     
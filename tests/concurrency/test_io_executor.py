@@ -0,0 +1,126 @@
+import asyncio
+import time
+import os
+import sys
+import logging
+from shutil import rmtree
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.utils import io
+from gyaan.utils.io import create_table, insert_table, read_table, configure_executor
+
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('io_executor_benchmark')
+
+# Constants
+INITIAL_ROWS = 200_000  # Rows in the table before the mixed load starts
+NUM_WRITERS = 4         # Concurrent coroutines inserting batches
+NUM_READERS = 4         # Concurrent coroutines reading the full table
+OPS_PER_CLIENT = 10     # Operations issued by each writer/reader
+ROWS_PER_BATCH = 100    # Rows per insert
+OP_INTERVAL = 0.05      # Seconds between operations scheduled by each client
+PROBE_INTERVAL = 0.005  # Sleep used to measure event loop stalls
+DELTA_TABLE_PATH = "./test_io_executor_table"
+DELTA_URI = f"file://{os.path.abspath(DELTA_TABLE_PATH)}"
+
+
+def make_batch(start: int, rows: int) -> pl.DataFrame:
+    return pl.DataFrame({
+        "id": np.arange(start, start + rows),
+        "value": np.random.random(rows),
+        "timestamp": [time.time()] * rows
+    })
+
+
+async def wait_until(scheduled: float):
+    await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+
+
+async def writer(client_id: int, start: float, latencies: list):
+    """Latency is measured from when the request was due, so loop stalls count against it"""
+    for op in range(OPS_PER_CLIENT):
+        scheduled = start + op * OP_INTERVAL
+        await wait_until(scheduled)
+        await insert_table(DELTA_URI, make_batch(INITIAL_ROWS + (client_id * OPS_PER_CLIENT + op) * ROWS_PER_BATCH, ROWS_PER_BATCH))
+        latencies.append(time.perf_counter() - scheduled)
+
+
+async def reader(start: float, latencies: list):
+    for op in range(OPS_PER_CLIENT):
+        scheduled = start + op * OP_INTERVAL
+        await wait_until(scheduled)
+        await read_table(DELTA_URI)
+        latencies.append(time.perf_counter() - scheduled)
+
+
+async def probe(stop: asyncio.Event, lags: list):
+    """Measure how late the event loop wakes a sleeping coroutine"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def run_mixed_load(kind: str) -> dict:
+    configure_executor(kind=kind)
+    await create_table(DELTA_URI, make_batch(0, INITIAL_ROWS), mode="overwrite")
+
+    write_latencies, read_latencies, loop_lags = [], [], []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, loop_lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[writer(i, start, write_latencies) for i in range(NUM_WRITERS)],
+        *[reader(start, read_latencies) for _ in range(NUM_READERS)]
+    )
+    total_time = time.perf_counter() - start
+    stop.set()
+    await probe_task
+
+    return {
+        "executor": kind,
+        "total_time": total_time,
+        "write_p50": float(np.percentile(write_latencies, 50)),
+        "write_p99": float(np.percentile(write_latencies, 99)),
+        "read_p50": float(np.percentile(read_latencies, 50)),
+        "read_p99": float(np.percentile(read_latencies, 99)),
+        "loop_lag_p99": float(np.percentile(loop_lags, 99)),
+        "loop_lag_max": float(max(loop_lags))
+    }
+
+
+def cleanup_delta_table():
+    """Remove the Delta table directory"""
+    if os.path.exists(DELTA_TABLE_PATH):
+        rmtree(DELTA_TABLE_PATH)
+
+
+def main():
+    results = []
+    try:
+        for kind in ("inline", "thread"):
+            cleanup_delta_table()
+            logger.info(f"Running mixed read/write load with executor={kind}")
+            results.append(asyncio.run(run_mixed_load(kind)))
+    finally:
+        cleanup_delta_table()
+        configure_executor(kind=io.EXECUTOR_KINDS[0])
+
+    timing_stats = pl.DataFrame(results)
+    print("\nMixed load latency (seconds), inline = before, thread = after:")
+    with pl.Config(tbl_cols=-1, tbl_width_chars=200):
+        print(timing_stats)
+
+
+if __name__ == "__main__":
+    main()
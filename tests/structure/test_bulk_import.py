@@ -0,0 +1,113 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.utils.io import table_health
+
+NUM_NODES=5000
+NUM_JSON_NODES=1000
+DIM=8
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_bulk_import/memory",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=DIM
+        )
+        rng=np.random.default_rng(5)
+        embeddings=rng.standard_normal((NUM_NODES,DIM)).astype(np.float32)
+        node_ids=[f"node-{i}" for i in range(NUM_NODES)]
+        pl.DataFrame({
+            "node_id":node_ids[:NUM_NODES//2]+[None]*(NUM_NODES-NUM_NODES//2),
+            "label":[f"Node {i}" for i in range(NUM_NODES)],
+            "weight":[1]*NUM_NODES,
+            "description":["Imported from parquet."]*NUM_NODES,
+            "keywords":[["parquet"]]*NUM_NODES,
+            "embedding":embeddings.tolist(),
+            "impact":list(range(NUM_NODES))
+        }).write_parquet("test_bulk_import/nodes.parquet", row_group_size=700)
+
+        # Parquet: one commit, supplied ids kept and missing ones generated
+        result=await mem.bulk_import_nodes("test_bulk_import/nodes.parquet", batch_rows=1000)
+        assert result.rows==NUM_NODES and result.commits==1 and result.version==mem.table_versions["nodes"]
+        assert mem.nodes.height==NUM_NODES and (await table_health(f"file://{mem.nodes_path}")).files==1
+        assert mem.nodes["node_id"].n_unique()==NUM_NODES and mem.nodes["memory_id"].unique().to_list()==[mem.id]
+        assert set(node_ids[:NUM_NODES//2])<=set(mem.nodes["node_id"].to_list())
+        results=await mem.search_nodes(embeddings[3].tolist(), k=1)
+        assert results["node_id"].to_list()==[node_ids[3]] and results["impact"].to_list()==[3]
+        generated=mem.nodes.filter(pl.col("impact")==NUM_NODES-1)["node_id"][0]
+        assert len(generated)==36 and (await mem.search_nodes(embeddings[-1].tolist(), k=1))["node_id"].to_list()==[generated]
+
+        # JSON lines, split into commits of about `commit_rows` rows
+        pl.DataFrame({
+            "label":[f"Json Node {i}" for i in range(NUM_JSON_NODES)],
+            "weight":[0.5]*NUM_JSON_NODES,
+            "description":["Imported from json lines."]*NUM_JSON_NODES,
+            "keywords":[["json"]]*NUM_JSON_NODES,
+            "embedding":rng.standard_normal((NUM_JSON_NODES,DIM)).tolist(),
+            "impact":[-1]*NUM_JSON_NODES
+        }).write_ndjson("test_bulk_import/nodes.jsonl")
+        result=await mem.bulk_import_nodes("test_bulk_import/nodes.jsonl", batch_rows=250, commit_rows=400)
+        assert result.rows==NUM_JSON_NODES and result.commits==2
+        assert mem.nodes.height==NUM_NODES+NUM_JSON_NODES
+        assert (await mem.hybrid_search("json", None, k=3))["impact"].to_list()==[-1]*3
+
+        # Arrow IPC edges between imported nodes
+        edges=pa.table({
+            "source_node_id":node_ids[:100],
+            "target_node_id":node_ids[100:200],
+            "label":["Imported Edge"]*100,
+            "weight":[1.0]*100,
+            "description":["Imported from arrow."]*100,
+            "keywords":[["arrow"]]*100,
+            "embedding":pa.array(embeddings[:100].tolist(), type=pa.list_(pa.float32(), DIM)),
+            "type":["link"]*100
+        })
+        with pa.OSFile("test_bulk_import/edges.arrow","wb") as sink:
+            with pa.ipc.new_file(sink, edges.schema) as writer:
+                writer.write_table(edges, max_chunksize=30)
+        result=await mem.bulk_import_edges("test_bulk_import/edges.arrow", batch_rows=64)
+        assert result.rows==100 and result.commits==1
+        assert await mem.neighbors(node_ids[7])==[node_ids[107]]
+
+        # Invalid batches raise before anything is committed
+        version=mem.table_versions["edges"]
+        dangling=edges.slice(0,10).set_column(0, "source_node_id", pa.array(["missing-node"]*10))
+        try:
+            await mem.bulk_import_edges(pa.concat_tables([edges.slice(0,50), dangling]), batch_rows=20)
+            raise AssertionError("Edges to missing nodes should be rejected")
+        except ValueError as e:
+            assert "missing-node" in str(e)
+        try:
+            await mem.bulk_import_nodes(pl.DataFrame({"label":["Incomplete"]}))
+            raise AssertionError("Batches without every column should be rejected")
+        except ValueError as e:
+            assert "missing" in str(e)
+        reloaded=await Memory.load(memory_path="test_bulk_import/memory")
+        assert reloaded.table_versions["edges"]==version and reloaded.edges.height==100
+        assert reloaded.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+
+        # Lazy memories validate endpoints with a scan
+        lazy=await Memory.load(memory_path="test_bulk_import/memory", lazy=True)
+        result=await lazy.bulk_import_edges(edges.slice(0,10))
+        assert result.rows==10 and lazy.table_versions["edges"]==result.version
+        assert (await lazy.get_edges()).height==110
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_bulk_import")
+
+asyncio.run(main())
@@ -0,0 +1,102 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import polars as pl
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.store import MemoryStore
+
+async def add_nodes(mem, labels, impact=0):
+    return await mem.add_nodes(
+        labels=labels,
+        weights=[0.0]*len(labels),
+        descriptions=["This is a test node."]*len(labels),
+        keywords=[["keywords"]]*len(labels),
+        embeddings=[[1.0,0.0,0.0,float(i)] for i in range(len(labels))],
+        impact=[impact]*len(labels)
+    )
+
+def changes(frame, change_type):
+    return sorted(frame.filter(pl.col("_change_type")==change_type)["node_id"].to_list())
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_change_feed/memory",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=4
+        )
+        start=mem.table_versions["nodes"]
+        node_ids=await add_nodes(mem, [f"Test Node {i}" for i in range(5)])
+        added=mem.table_versions["nodes"]
+
+        # Merges rewrite whole files, but only the rows whose content changed are reported
+        await mem.update_nodes(node_ids=node_ids[:1], impact=[7])
+        await mem.update_nodes(node_ids=node_ids[1:2], impact=[0])
+        await mem.delete_nodes(node_ids[2:3])
+        feed=await mem.changes_since(start)
+        assert changes(feed,"insert")==sorted(node_ids)
+        assert changes(feed,"update")==node_ids[:1] and changes(feed,"delete")==node_ids[2:3]
+        assert feed.filter(pl.col("_change_type")=="update")["impact"].to_list()==[7]
+        assert feed.filter(pl.col("_change_type")=="insert")["_commit_version"].unique().to_list()==[added]
+        assert feed.schema["embedding"]==mem.nodes.schema["embedding"]
+        assert (await mem.changes_since(added))["_commit_version"].min()>added
+        # Replaying from before the table existed skips the CREATE TABLE commit
+        replay=await mem.changes_since(-1)
+        assert replay.equals(feed)
+        async for batch in mem.subscribe(version=-1, poll_interval=0.05):
+            assert pl.from_arrow(batch)["node_id"].to_list()==feed["node_id"].to_list()[:batch.num_rows]
+            break
+        empty=await mem.changes_since(mem.table_versions["nodes"])
+        assert empty.height==0 and "_change_type" in empty.columns
+
+        # Compaction and purging tombstones change no live rows
+        version=mem.table_versions["nodes"]
+        await mem.maintain(force=True)
+        await mem.collect_garbage(retention_hours=0, incremental=False)
+        assert (await mem.changes_since(version)).height==0
+
+        # Subscribers stream later commits, including other writers', in bounded batches
+        await mem.refresh()
+        batches=[]
+        async def consume():
+            async for batch in mem.subscribe(poll_interval=0.05, batch_rows=4):
+                batches.append(batch)
+                if sum(b.num_rows for b in batches)>=11:
+                    return
+        consumer=asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        other=await Memory.load(memory_path="test_change_feed/memory")
+        late_ids=await add_nodes(other, [f"Late Node {i}" for i in range(10)])
+        await other.delete_nodes(late_ids[:1])
+        await asyncio.wait_for(consumer, timeout=30)
+        assert all(isinstance(batch, pa.RecordBatch) and batch.num_rows<=4 for batch in batches)
+        streamed=pl.from_arrow(pa.Table.from_batches(batches))
+        assert changes(streamed,"insert")==sorted(late_ids) and changes(streamed,"delete")==late_ids[:1]
+        assert streamed["_commit_version"].is_sorted()
+
+        # Store views only see their own rows
+        store=await MemoryStore.create(store_path="test_change_feed/store", node_attributes={"impact":int}, edge_attributes={"type":str}, embedding_dim=4)
+        first=await store.create_memory(title="First", description="First view.")
+        second=await store.create_memory(title="Second", description="Second view.")
+        start=first.table_versions["nodes"]
+        first_ids=await add_nodes(first, ["First Node"])
+        await add_nodes(second, ["Second Node"])
+        await second.update_nodes(node_ids=(await second.get_nodes())["node_id"].to_list(), impact=[3])
+        feed=await first.changes_since(start)
+        assert feed["node_id"].to_list()==first_ids and feed["_change_type"].to_list()==["insert"]
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_change_feed")
+
+asyncio.run(main())
@@ -0,0 +1,101 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import glob
+import os
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=500
+DIM=64
+
+def sidecars(mem, table):
+    return sorted(glob.glob(os.path.join(mem.index_path,f"{table}_embeddings.*.arrow")))
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_embedding_sidecar",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=DIM
+        )
+        rng=np.random.default_rng(3)
+        embeddings=rng.standard_normal((NUM_NODES,DIM)).astype(np.float32)
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=embeddings.tolist(),
+            impact=list(range(NUM_NODES))
+        )
+        await mem.add_edges(
+            source_nodes=node_ids[:10],
+            target_nodes=node_ids[10:20],
+            labels=["Test Edge"]*10,
+            weights=[1.0]*10,
+            descriptions=["This is a test edge."]*10,
+            keywords=[["keywords"]]*10,
+            embeddings=embeddings[:10].tolist(),
+            type=["link"]*10
+        )
+        await mem.delete_nodes(node_ids[:1], cascade=True)
+
+        # The first mapped load reads Delta and writes the sidecars
+        first=await Memory.load(memory_path="test_embedding_sidecar", mmap_embeddings=True)
+        assert [os.path.basename(path) for path in sidecars(mem,"nodes")]==[f"nodes_embeddings.{mem.table_versions['nodes']:020d}.arrow"]
+        assert len(sidecars(mem,"edges"))==1
+
+        mapped=await Memory.load(memory_path="test_embedding_sidecar", mmap_embeddings=True)
+        assert mapped.table_versions==mem.table_versions
+        assert mapped.nodes.columns==mem.nodes.columns
+        assert mapped.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+        assert mapped.edges.sort("edge_id").equals(mem.edges.sort("edge_id"))
+
+        query=embeddings[5].tolist()
+        expected=await mem.search_nodes(query, k=5)
+        results=await mapped.search_nodes(query, k=5)
+
+        # The frame and the vector index share the mapped buffer
+        index=mapped.indexes["nodes"]["vector"]
+        column=mapped.nodes["embedding"].to_numpy(allow_copy=False)
+        assert np.shares_memory(index.vectors, column) and not index.vectors.flags.writeable
+        assert results["node_id"].to_list()==expected["node_id"].to_list()
+        assert np.allclose(results["score"].to_numpy(), expected["score"].to_numpy())
+        assert node_ids[0] not in (await mapped.search_nodes(embeddings[0].tolist(), k=3))["node_id"].to_list()
+
+        # A stale sidecar is caught up from the commit log and rewritten
+        new_ids=await mem.add_nodes(
+            labels=["New Node"],
+            weights=[0.0],
+            descriptions=["This is a new node."],
+            keywords=[["keywords"]],
+            embeddings=[(-embeddings[5]).tolist()],
+            impact=[0]
+        )
+        await mem.update_nodes(node_ids=node_ids[6:7], impact=[-1])
+        caught_up=await Memory.load(memory_path="test_embedding_sidecar", mmap_embeddings=True)
+        assert caught_up.table_versions["nodes"]==mem.table_versions["nodes"]
+        assert caught_up.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+        assert (await caught_up.search_nodes((-embeddings[5]).tolist(), k=1))["node_id"].to_list()==new_ids
+        assert [os.path.basename(path) for path in sidecars(mem,"nodes")]==[f"nodes_embeddings.{mem.table_versions['nodes']:020d}.arrow"]
+
+        # Writes on a mapped memory copy the vectors before changing them
+        await mapped.update_nodes(node_ids=node_ids[7:8], embedding=[(-embeddings[8]*2).tolist()])
+        assert (await mapped.search_nodes((-embeddings[8]).tolist(), k=1))["node_id"].to_list()==node_ids[7:8]
+        assert (await first.get_nodes_by_id(node_ids[7:8], min_version=mapped.table_versions["nodes"]))["embedding"].to_list()==[(-embeddings[8]*2).tolist()]
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_embedding_sidecar")
+
+asyncio.run(main())
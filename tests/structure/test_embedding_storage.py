@@ -0,0 +1,73 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import numpy as np
+import polars as pl
+from deltalake import DeltaTable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=100
+DIM=8
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_embedding_storage",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=DIM
+        )
+        assert mem.nodes.schema["embedding"]==pl.Array(pl.Float32, DIM)
+
+        embeddings=np.random.default_rng(0).normal(size=(NUM_NODES,DIM))
+        for batch in range(2):
+            rows=slice(batch*NUM_NODES//2,(batch+1)*NUM_NODES//2)
+            node_ids=await mem.add_nodes(
+                labels=[f"Test Node {i}" for i in range(NUM_NODES//2)],
+                weights=[0.0]*(NUM_NODES//2),
+                descriptions=["This is a test node."]*(NUM_NODES//2),
+                keywords=[["keywords"]]*(NUM_NODES//2),
+                embeddings=embeddings[rows].tolist(),
+                impact=[0]*(NUM_NODES//2)
+            )
+
+        matrix=mem.node_embedding_matrix()
+        assert matrix.dtype==np.float32 and matrix.shape==(NUM_NODES,DIM)
+        assert np.allclose(matrix, embeddings.astype(np.float32))
+        assert np.shares_memory(matrix, mem.node_embedding_matrix())
+
+        stored=DeltaTable(f"file://{mem.nodes_path}").schema().to_pyarrow().field("embedding").type
+        print(f"Stored embedding type: {stored}")
+        assert str(stored.value_type)=="float"
+
+        await mem.update_nodes(node_ids=node_ids[:1], embedding=[[1.0]*DIM])
+        assert (await mem.get_nodes_by_id(node_ids[:1]))["embedding"].to_list()==[[1.0]*DIM]
+
+        wrong_dim=False
+        try:
+            await mem.update_nodes(node_ids=node_ids[:1], embedding=[[1.0]*(DIM+1)])
+        except Exception:
+            wrong_dim=True
+        assert wrong_dim
+
+        reloaded=await Memory.load(memory_path="test_embedding_storage")
+        assert reloaded.embedding_dim==DIM
+        assert reloaded.nodes.schema["embedding"]==pl.Array(pl.Float32, DIM)
+        assert reloaded.node_embedding_matrix().shape==(NUM_NODES,DIM)
+        assert reloaded.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+
+        lazy_mem=await Memory.load(memory_path="test_embedding_storage", lazy=True)
+        assert (await lazy_mem.get_nodes()).schema["embedding"]==pl.Array(pl.Float32, DIM)
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_embedding_storage")
+
+asyncio.run(main())
@@ -0,0 +1,108 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.store import MemoryStore
+from gyaan.structure import index as index_module
+from gyaan.structure.index import MemoryIndex
+
+NUM_MEMORIES=6
+
+async def create_memory(i):
+    mem=await Memory.create(
+        memory_path=f"test_federated_search/memory_{i}",
+        title=f"Memory {i}",
+        description=f"Memory number {i}.",
+        embedding=[float(i),1.0],
+        keywords=["federated"],
+        node_attributes={"impact":int},
+        edge_attributes={"type":str},
+        embedding_dim=4
+    )
+    await mem.add_nodes(
+        labels=[f"Memory {i} Node {j}" for j in range(3)],
+        weights=[0.0]*3,
+        descriptions=[f"Node {j} of memory {i}." for j in range(3)],
+        keywords=[["keywords"]]*3,
+        # Node j of memory i points at angle i*3+j, so the closest nodes to the query span memories
+        embeddings=[[1.0,0.1*(i*3+j),0.0,0.0] for j in range(3)],
+        impact=[i]*3
+    )
+    return mem
+
+async def main():
+    try:
+        memories=[await create_memory(i) for i in range(NUM_MEMORIES)]
+        store=await MemoryStore.create(store_path="test_federated_search/store", node_attributes={"impact":int}, edge_attributes={"type":str}, embedding_dim=4)
+        shared=await store.create_memory(title="Shared", description="A store view.", embedding=[0.0,1.0], keywords=["federated"])
+        await shared.add_nodes(
+            labels=["Shared Node"],
+            weights=[0.0],
+            descriptions=["Node of the shared memory."],
+            keywords=[["keywords"]],
+            embeddings=[[1.0,0.45,0.0,0.0]],
+            impact=[-1]
+        )
+        memories.append(shared)
+
+        memory_index=await MemoryIndex.create(index_path="test_federated_search/index")
+        for mem in memories:
+            await memory_index.add(mem)
+
+        query=[1.0,0.42,0.0,0.0]
+        expected=pl.concat([await mem.search_nodes(query, k=4) for mem in memories], how="diagonal_relaxed").sort("score", descending=True, maintain_order=True).head(4)
+
+        inline,timings=await memory_index.search_across(query_vector=query, k=4, processes=0)
+        assert inline["node_id"].to_list()==expected["node_id"].to_list()
+        assert inline["memory_id"].to_list()==expected["memory_id"].to_list()
+        assert shared.id in inline["memory_id"].to_list()
+        assert timings.height==len(memories) and not timings["cached"].any()
+
+        # Worker processes give the same merged results and keep their memories warm
+        hits,timings=await memory_index.search_across(query_vector=query, k=4, processes=2)
+        assert hits["node_id"].to_list()==expected["node_id"].to_list()
+        assert set(timings["worker"].to_list())<={0,1} and not timings["cached"].any()
+        workers=dict(zip(timings["memory_id"].to_list(), timings["worker"].to_list()))
+
+        await memories[5].add_nodes(
+            labels=["Late Node"],
+            weights=[0.0],
+            descriptions=["Added after the first search."],
+            keywords=[["keywords"]],
+            embeddings=[query],
+            impact=[5]
+        )
+        hits,timings=await memory_index.search_across(query_vector=query, k=2, processes=2, max_staleness=0.0)
+        assert timings["cached"].all()
+        assert dict(zip(timings["memory_id"].to_list(), timings["worker"].to_list()))==workers
+        assert hits["label"].to_list()[0]=="Late Node" and hits["memory_id"].to_list()[0]==memories[5].id
+
+        # Hybrid search and a subset of memories
+        hits,timings=await memory_index.search_across(query_vector=query, text="Node 2", memory_ids=[memories[1].id,memories[2].id], k=3, processes=2)
+        assert set(hits["memory_id"].to_list())<={memories[1].id,memories[2].id} and timings.height==2
+        try:
+            await memory_index.search_across(query_vector=query, memory_ids=["missing"], processes=0)
+            raise AssertionError("Unknown memories should be rejected")
+        except ValueError:
+            pass
+
+        # The per-process cache of loaded memories is bounded and cleared with the pool
+        hits,timings=await memory_index.search_across(query_vector=query, k=4, processes=0, cache_bytes=1)
+        assert hits["node_id"].to_list()[0]==(await memories[5].search_nodes(query, k=1))["node_id"][0]
+        assert len(index_module._search_cache)==1 and len(index_module._search_refreshed)==1
+        assert index_module._search_cache.stats().evictions==len(memories)-1
+        memory_index.close_search_pool()
+        assert index_module._search_cache is None and not index_module._search_refreshed
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_federated_search")
+
+# Worker processes are spawned and re-import this module
+if __name__=="__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import random
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=200
+NUM_EDGES=1000
+async def add_edges(mem, source_ids, target_ids):
+    num_edges=len(source_ids)
+    return await mem.add_edges(
+        source_nodes=source_ids,
+        target_nodes=target_ids,
+        labels=[f"Test edge {i}" for i in range(num_edges)],
+        weights=[1.0]*num_edges,
+        descriptions=["This is a test edge."]*num_edges,
+        keywords=[["keywords"]]*num_edges,
+        embeddings=[[1.0,2.0]]*num_edges,
+        type=["internal"]*num_edges
+    )
+
+async def expected_neighbors(mem, node_id, direction):
+    edges=await mem.get_edges()
+    found=set()
+    if direction in ("out","both"):
+        found|=set(edges.filter(pl.col("source_node_id")==node_id)["target_node_id"].to_list())
+    if direction in ("in","both"):
+        found|=set(edges.filter(pl.col("target_node_id")==node_id)["source_node_id"].to_list())
+    return found
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_graph_traversal",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=[[1.0,2.0]]*NUM_NODES,
+            impact=[0]*NUM_NODES
+        )
+
+        # A chain 0 -> 1 -> 2 -> 3 plus random edges among the remaining nodes
+        chain_edges=await add_edges(mem, node_ids[:3], node_ids[1:4])
+        rng=random.Random(0)
+        await add_edges(
+            mem,
+            [rng.choice(node_ids[4:]) for _ in range(NUM_EDGES)],
+            [rng.choice(node_ids[4:]) for _ in range(NUM_EDGES)])
+
+        assert await mem.neighbors(node_ids[1])==[node_ids[2]]
+        assert set(await mem.neighbors(node_ids[1], direction="both"))=={node_ids[0],node_ids[2]}
+        assert await mem.degree(node_ids[1], direction="in")==1
+        assert await mem.k_hop([node_ids[0]], k=2)==[node_ids[1],node_ids[2]]
+        assert await mem.k_hop([node_ids[3]], k=3, direction="in")==[node_ids[2],node_ids[1],node_ids[0]]
+
+        for node_id in rng.sample(node_ids[4:], 20):
+            for direction in ("out","in","both"):
+                assert set(await mem.neighbors(node_id, direction))==await expected_neighbors(mem, node_id, direction)
+
+        await mem.delete_edges(edge_ids=[chain_edges[1]])
+        assert await mem.neighbors(node_ids[1])==[]
+        assert await mem.k_hop([node_ids[0]], k=3)==[node_ids[1]]
+
+        reloaded=await Memory.load(memory_path="test_graph_traversal")
+        assert await reloaded.neighbors(node_ids[1])==[]
+        assert await reloaded.degree(node_ids[0])==1
+        for node_id in rng.sample(node_ids[4:], 20):
+            assert set(await reloaded.neighbors(node_id, "both"))==await expected_neighbors(mem, node_id, "both")
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_graph_traversal")
+
+asyncio.run(main())
@@ -0,0 +1,70 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_hybrid_search",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        node_ids=await mem.add_nodes(
+            labels=["Paris","Berlin","Tokyo","Python","Rust"],
+            weights=[1.0]*5,
+            descriptions=[
+                "Paris is the capital of France, known for the Eiffel Tower.",
+                "Berlin is the capital of Germany.",
+                "Tokyo is the capital of Japan and a very large city.",
+                "Python is a programming language.",
+                "Rust is a systems programming language focused on safety."
+            ],
+            keywords=[["city","france"],["city","germany"],["city","japan"],["language"],["language","systems"]],
+            embeddings=[[1.0,0.0],[0.9,0.1],[0.8,0.2],[0.0,1.0],[0.1,0.9]],
+            impact=[0,0,0,1,1]
+        )
+
+        results=await mem.hybrid_search("capital of France", vector=None, k=3)
+        print(results)
+        assert results["node_id"][0]==node_ids[0]
+
+        results=await mem.hybrid_search("programming language", vector=[0.1,0.9], k=2)
+        assert set(results["node_id"].to_list())=={node_ids[3],node_ids[4]}
+        assert results["score"].is_sorted(descending=True)
+
+        results=await mem.hybrid_search("japan", vector=[1.0,0.0], k=1)
+        assert results["node_id"].to_list()==[node_ids[2]]
+
+        results=await mem.hybrid_search("city", vector=[1.0,0.0], k=5, filter=pl.col("impact")==1)
+        assert set(results["node_id"].to_list())<={node_ids[3],node_ids[4]}
+
+        await mem.update_nodes(node_ids=[node_ids[3]], description=["Python is also a snake."], keywords=[["animal"]])
+        results=await mem.hybrid_search("snake animal", vector=None, k=1)
+        assert results["node_id"].to_list()==[node_ids[3]]
+        results=await mem.hybrid_search("programming", vector=None, k=5)
+        assert node_ids[3] not in results["node_id"].to_list()
+
+        await mem.delete_nodes(node_ids=[node_ids[0]])
+        results=await mem.hybrid_search("france", vector=[1.0,0.0], k=5)
+        assert node_ids[0] not in results["node_id"].to_list()
+
+        reloaded=await Memory.load(memory_path="test_hybrid_search")
+        results=await reloaded.hybrid_search("snake", vector=None, k=1)
+        assert results["node_id"].to_list()==[node_ids[3]]
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_hybrid_search")
+
+asyncio.run(main())
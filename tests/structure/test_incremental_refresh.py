@@ -0,0 +1,60 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=100
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_incremental_refresh",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=[[1.0,2.0]]*NUM_NODES,
+            impact=[0]*NUM_NODES
+        )
+        assert mem.table_versions["nodes"]==1
+
+        await mem.update_nodes(node_ids=node_ids[:10], impact=[1]*10)
+        await mem.delete_nodes(node_ids=node_ids[10:20])
+        assert mem.table_versions["nodes"]==3
+
+        reloaded=await Memory.load(memory_path="test_incremental_refresh")
+        assert reloaded.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+
+        other=await Memory.load(memory_path="test_incremental_refresh")
+        other_ids=await other.add_nodes(
+            labels=["Other Node"],
+            weights=[1.0],
+            descriptions=["Written by another instance."],
+            keywords=[["other"]],
+            embeddings=[[3.0,4.0]],
+            impact=[2]
+        )
+
+        # The next write sees a gap in the log and catches up from the commit log
+        await mem.update_nodes(node_ids=node_ids[:1], impact=[5])
+        assert mem.table_versions["nodes"]==5
+        assert mem.nodes.height==NUM_NODES+1
+        assert (await mem.get_nodes_by_id(other_ids)).height==1
+        assert (await mem.get_nodes()).height==NUM_NODES-10+1
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_incremental_refresh")
+
+asyncio.run(main())
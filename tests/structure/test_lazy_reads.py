@@ -0,0 +1,70 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=100
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_lazy_reads",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=[[1.0,2.0]]*NUM_NODES,
+            impact=list(range(NUM_NODES))
+        )
+        await mem.delete_nodes(node_ids=node_ids[:10])
+
+        lazy_mem=await Memory.load(memory_path="test_lazy_reads", lazy=True)
+        assert lazy_mem.nodes is None and lazy_mem.edges is None
+        assert lazy_mem.node_columns==mem.node_columns
+
+        scan=await lazy_mem.scan_nodes(node_ids=node_ids[5:15], columns=["node_id","impact"])
+        assert isinstance(scan, pl.LazyFrame)
+        print(scan.explain())
+        assert scan.collect().sort("impact")["node_id"].to_list()==node_ids[10:15]
+
+        assert (await lazy_mem.get_nodes()).height==NUM_NODES-10
+        assert (await lazy_mem.get_nodes(columns=["label"])).columns==["label"]
+        assert (await lazy_mem.get_nodes_by_id(node_ids[:20])).height==10
+
+        new_ids=await lazy_mem.add_nodes(
+            labels=["Lazy Node"],
+            weights=[0.0],
+            descriptions=["Written through a lazy memory."],
+            keywords=[["lazy"]],
+            embeddings=[[1.0,2.0]],
+            impact=[1000]
+        )
+        assert lazy_mem.nodes is None
+        assert (await lazy_mem.get_nodes_by_id(new_ids))["impact"].to_list()==[1000]
+        assert (await mem.get_nodes_by_id(node_ids[20:30], columns=["impact"]))["impact"].to_list()==list(range(20,30))
+
+        missing_index=False
+        try:
+            await lazy_mem.search_nodes([1.0,2.0])
+        except AssertionError:
+            missing_index=True
+        assert missing_index
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_lazy_reads")
+
+asyncio.run(main())
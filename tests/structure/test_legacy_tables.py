@@ -0,0 +1,92 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import os
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.index import MemoryIndex
+from gyaan.structure.schema import MEMORY_SCHEMA, generate_node_schema, generate_edge_schema
+from gyaan.utils.io import create_table, read_table
+
+# Metadata as written before `embedding_dim` was recorded
+LEGACY_MEMORY_SCHEMA={col: dtype for col,dtype in MEMORY_SCHEMA.items() if col!="embedding_dim"}
+
+async def create_legacy_memory(memory_path):
+    node_schema=generate_node_schema({"impact":int})
+    edge_schema=generate_edge_schema({"type":str})
+    memory_path=os.path.abspath(memory_path)
+    metadata_df=pl.DataFrame(data=[{
+        "id":"legacy-memory",
+        "title":"Legacy Memory",
+        "description":"Created before this release.",
+        "embedding":[1.0,0.0],
+        "keywords":["legacy"],
+        "deleted":False,
+        "memory_storage_path":memory_path,
+        "node_attributes":list(node_schema.keys()),
+        "edge_attributes":list(edge_schema.keys())
+    }], schema=LEGACY_MEMORY_SCHEMA)
+    await create_table(f"file://{memory_path}/metadata", metadata_df)
+    await create_table(f"file://{memory_path}/nodes", pl.DataFrame(schema=node_schema))
+    await create_table(f"file://{memory_path}/edges", pl.DataFrame(schema=edge_schema))
+    return metadata_df
+
+async def main():
+    try:
+        metadata_df=await create_legacy_memory("test_legacy_tables/memory")
+        await create_table(f"file://{os.path.abspath('test_legacy_tables/index')}", metadata_df)
+
+        mem=await Memory.load("test_legacy_tables/memory")
+        assert mem.embedding_dim is None
+        node_ids=await mem.add_nodes(
+            labels=["Legacy Node"],
+            weights=[0.0],
+            descriptions=["Added after the upgrade."],
+            keywords=[["keywords"]],
+            embeddings=[[1.0,0.0]],
+            impact=[1]
+        )
+
+        # Metadata writes upgrade the legacy table instead of failing on the new column
+        await mem.update_metadata(title="Renamed", description=None, embedding=None, keywords=None)
+        metadata=await mem.read_metadata()
+        assert metadata["title"].to_list()==["Renamed"] and metadata["embedding_dim"].to_list()==[None]
+
+        # Legacy indexes take both legacy and new memories
+        memory_index=await MemoryIndex.load("test_legacy_tables/index")
+        await memory_index.remove(mem)
+        await memory_index.add(mem)
+        new=await Memory.create(
+            memory_path="test_legacy_tables/new_memory",
+            title="New Memory",
+            description="Created after the upgrade.",
+            embedding=[0.0,1.0],
+            keywords=["legacy"],
+            node_attributes={"impact":int},
+            embedding_dim=2
+        )
+        await memory_index.add(new)
+        index_df=await read_table(f"file://{memory_index.index_path}")
+        assert sorted(index_df["title"].to_list())==["New Memory","Renamed"]
+        assert index_df.filter(pl.col("id")==new.id)["embedding_dim"].to_list()==[2]
+        opened=await memory_index.open_top_k(keywords=["legacy"], k=2)
+        assert {m.id for m in opened}=={mem.id,new.id}
+
+        await mem.soft_delete()
+        try:
+            await Memory.load("test_legacy_tables/memory")
+            raise AssertionError("Soft-deleted memories should not load")
+        except ValueError:
+            pass
+        reloaded=await Memory.load("test_legacy_tables/memory", version={"nodes":1,"edges":0})
+        assert reloaded.nodes["node_id"].to_list()==node_ids
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_legacy_tables")
+
+asyncio.run(main())
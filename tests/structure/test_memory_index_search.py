@@ -0,0 +1,62 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.index import MemoryIndex
+
+MEMORIES=[
+    ("Travel","Trips and places visited.",[1.0,0.0],["travel","cities"]),
+    ("Cooking","Recipes and kitchen notes.",[0.0,1.0],["food","recipes"]),
+    ("Work","Projects and meetings.",[0.7,0.7],["projects","meetings"]),
+    ("Legacy","Memory without an embedding.",[],["archive"])
+]
+
+async def main():
+    try:
+        memory_index=await MemoryIndex.create(index_path="test_memory_index_search/index")
+        memories=[]
+        for title,description,embedding,keywords in MEMORIES:
+            mem=await Memory.create(
+                memory_path=os.path.join("test_memory_index_search",title.lower()),
+                title=title,
+                description=description,
+                embedding=embedding,
+                keywords=keywords,
+                node_attributes={"impact":int},
+                edge_attributes={"type":str}
+            )
+            await memory_index.add(mem)
+            memories.append(mem)
+
+        results=await memory_index.search(vector=[0.9,0.1], k=2)
+        print(results)
+        assert results["title"].to_list()==["Travel","Work"]
+
+        results=await memory_index.search(keywords=["Recipes"], k=3)
+        assert results["title"].to_list()==["Cooking"]
+
+        results=await memory_index.search(vector=[0.0,1.0], keywords=["archive"], k=4)
+        assert set(results["title"].to_list())=={"Cooking","Legacy","Work","Travel"}
+        assert results["title"][0] in ("Cooking","Legacy")
+
+        opened=await memory_index.open_top_k(vector=[0.1,0.9], keywords=["food"], k=1)
+        assert len(opened)==1 and isinstance(opened[0], Memory)
+        assert opened[0].title=="Cooking" and opened[0].id==memories[1].id
+
+        await memory_index.remove(memories[1])
+        results=await memory_index.search(vector=[0.0,1.0], keywords=["food"], k=3)
+        assert "Cooking" not in results["title"].to_list()
+
+        reloaded=await MemoryIndex.load(index_path="test_memory_index_search/index")
+        results=await reloaded.search(vector=[1.0,0.0], k=1)
+        assert results["title"].to_list()==["Travel"]
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_memory_index_search")
+
+asyncio.run(main())
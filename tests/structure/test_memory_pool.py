@@ -0,0 +1,105 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import numpy as np
+import psutil
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.index import MemoryIndex, MemoryPool
+
+NUM_MEMORIES=4
+NUM_NODES=2000
+DIM=32
+
+async def create_memory(i, rng):
+    mem=await Memory.create(
+        memory_path=f"test_memory_pool/memory_{i}",
+        title=f"Memory {i}",
+        description=f"Memory number {i}.",
+        embedding=[float(i),1.0],
+        keywords=["pool"],
+        node_attributes={"impact":int},
+        edge_attributes={"type":str},
+        embedding_dim=DIM
+    )
+    await mem.add_nodes(
+        labels=[f"Memory {i} Node {j}" for j in range(NUM_NODES)],
+        weights=[0.0]*NUM_NODES,
+        descriptions=["This is a test node."]*NUM_NODES,
+        keywords=[["keywords"]]*NUM_NODES,
+        embeddings=rng.standard_normal((NUM_NODES,DIM)).tolist(),
+        impact=[i]*NUM_NODES
+    )
+    return mem
+
+async def main():
+    try:
+        rng=np.random.default_rng(9)
+        memories=[await create_memory(i, rng) for i in range(NUM_MEMORIES)]
+        paths=[f"test_memory_pool/memory_{i}" for i in range(NUM_MEMORIES)]
+
+        # The estimate covers the frames and the derived indexes
+        loaded=await Memory.load(paths[0])
+        size=loaded.estimated_size()
+        assert size>loaded.nodes.estimated_size()+loaded.edges.estimated_size()+NUM_NODES*8
+
+        # Concurrent gets of one memory share a single load
+        pool=MemoryPool(max_bytes=int(size*2.5))
+        loaded=await asyncio.gather(*[pool.get(paths[0]) for _ in range(5)])
+        assert all(mem is loaded[0] for mem in loaded)
+        assert pool.stats().misses==1 and pool.stats().hits==4 and len(pool)==1
+        assert await pool.get(paths[0]) is loaded[0] and pool.stats().hits==5
+
+        # The least recently used memory is evicted past the budget
+        await pool.get(paths[1])
+        await pool.get(paths[0])
+        await pool.get(paths[2])
+        assert (paths[0],None) in pool and (paths[2],None) in pool and (paths[1],None) not in pool
+        stats=pool.stats()
+        assert stats.evictions==1 and stats.memories==2 and stats.bytes<=pool.max_bytes
+
+        # Writes through a pooled memory are re-measured on the next get
+        mem=await pool.get(paths[2])
+        before=mem.estimated_size()
+        await mem.add_nodes(
+            labels=[f"New Node {j}" for j in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a new node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=rng.standard_normal((NUM_NODES,DIM)).tolist(),
+            impact=[2]*NUM_NODES
+        )
+        assert await pool.get(paths[2]) is mem
+        assert (paths[2],None) in pool and len(pool)==1 and pool.stats().bytes>before
+
+        # Failed loads are not cached and reach every waiter
+        results=await asyncio.gather(*[pool.get("test_memory_pool/missing") for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, Exception) for result in results)
+        assert ("test_memory_pool/missing",None) not in pool
+
+        # An RSS budget below the current RSS keeps only the latest memory
+        rss_pool=MemoryPool(max_rss=psutil.Process().memory_info().rss//2)
+        for path in paths:
+            await rss_pool.get(path)
+        assert len(rss_pool)==1 and (paths[-1],None) in rss_pool
+
+        # MemoryIndex.open_top_k can load through a pool
+        memory_index=await MemoryIndex.create(index_path="test_memory_pool/index")
+        for mem in memories[:2]:
+            await memory_index.add(mem)
+        index_pool=MemoryPool(max_bytes=size*10)
+        opened=await memory_index.open_top_k(keywords=["pool"], k=2, pool=index_pool)
+        again=await memory_index.open_top_k(keywords=["pool"], k=2, pool=index_pool)
+        assert [m.id for m in opened]==[m.id for m in again] and all(a is b for a,b in zip(opened,again))
+        assert index_pool.stats().misses==2 and index_pool.stats().hits==2
+        index_pool.clear()
+        assert len(index_pool)==0 and index_pool.stats().bytes==0
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_memory_pool")
+
+asyncio.run(main())
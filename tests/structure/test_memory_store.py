@@ -0,0 +1,134 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import glob
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.store import MemoryStore
+from gyaan.structure.index import MemoryIndex
+from gyaan.utils.io import configure_coalescing, table_health
+
+NUM_MEMORIES=20
+
+async def populate(mem, i):
+    node_ids=await mem.add_nodes(
+        labels=[f"Memory {i} Node {j}" for j in range(3)],
+        weights=[0.0]*3,
+        descriptions=[f"Node of memory {i}."]*3,
+        keywords=[["keywords"]]*3,
+        embeddings=[[float(i),float(j),1.0,0.0] for j in range(3)],
+        impact=[i]*3
+    )
+    await mem.add_edges(
+        source_nodes=node_ids[:1],
+        target_nodes=node_ids[1:2],
+        labels=["Test Edge"],
+        weights=[1.0],
+        descriptions=[f"Edge of memory {i}."],
+        keywords=[["keywords"]],
+        embeddings=[[float(i),0.0,0.0,1.0]],
+        type=["link"]
+    )
+    return node_ids
+
+async def main():
+    try:
+        store=await MemoryStore.create(
+            store_path="test_memory_store/store",
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=4
+        )
+        memories=[await store.create_memory(title=f"Memory {i}", description=f"Memory number {i}.", keywords=["store"]) for i in range(NUM_MEMORIES)]
+
+        # Concurrent writes from many memories coalesce into shared commits; each view keeps only its rows
+        configure_coalescing(True)
+        node_ids=await asyncio.gather(*[populate(mem, i) for i,mem in enumerate(memories)])
+        configure_coalescing(False)
+        assert len(glob.glob("test_memory_store/**/_delta_log", recursive=True))==3
+        for i,mem in enumerate(memories):
+            assert mem.nodes.height==3 and mem.edges.height==1
+            assert mem.nodes["memory_id"].unique().to_list()==[mem.id]
+            assert await mem.neighbors(node_ids[i][0])==[node_ids[i][1]]
+            results=await mem.search_nodes([float(i),0.0,1.0,0.0], k=5)
+            assert set(results["node_id"].to_list())==set(node_ids[i])
+
+        # Views catch up on their own rows only
+        mem=memories[3]
+        other=await store.open(mem.id)
+        assert other.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+        await memories[4].delete_nodes(node_ids[4][:1])
+        await other.update_nodes(node_ids=node_ids[3][:1], impact=[-3])
+        assert (await mem.get_nodes_by_id(node_ids[3][:1], min_version=other.table_versions["nodes"]))["impact"].to_list()==[-3]
+        assert mem.nodes.height==3 and memories[4].nodes.filter(pl.col("deleted")).height==1
+
+        # Updates and deletes through one view never touch another memory's rows
+        intruder,victim=memories[11],memories[12]
+        victim_edges=victim.edges["edge_id"].to_list()
+        await intruder.update_nodes(node_ids=node_ids[12][:1], label=["hijack"])
+        await intruder.delete_nodes(node_ids[12][1:2])
+        await intruder.update_edges(edge_ids=victim_edges, label=["hijack"])
+        await intruder.delete_edges(victim_edges)
+        assert intruder.nodes.height==3 and intruder.edges.height==1
+        victim=await store.open(victim.id)
+        assert victim.nodes.sort("node_id").equals(memories[12].nodes.sort("node_id"))
+        assert "hijack" not in victim.nodes["label"].to_list()+victim.edges["label"].to_list()
+        assert not victim.nodes["deleted"].any() and not victim.edges["deleted"].any()
+
+        lazy=await store.open(memories[5].id, lazy=True)
+        assert set((await lazy.get_nodes())["node_id"].to_list())==set(node_ids[5])
+
+        try:
+            await Memory.load("test_memory_store/store")
+            raise AssertionError("Opening a store without a memory id should fail")
+        except ValueError:
+            pass
+
+        # Metadata lives in one shared table
+        await memories[6].update_metadata(title="Renamed", description=None, embedding=None, keywords=None)
+        catalog=await store.memories()
+        assert catalog.height==NUM_MEMORIES
+        assert catalog.filter(pl.col("id")==memories[6].id)["title"].to_list()==["Renamed"]
+        assert catalog.filter(pl.col("id")==memories[7].id)["title"].to_list()==["Memory 7"]
+        await memories[8].soft_delete()
+        assert (await store.memories()).height==NUM_MEMORIES-1
+
+        # Cross-memory queries are one scan over the shared tables
+        counts=await (await store.scan_nodes([m.id for m in memories[:5]])).group_by("memory_id").len().collect_async()
+        assert sorted(counts["len"].to_list())==[2,3,3,3,3]
+        assert (await (await store.scan_edges()).collect_async()).height==NUM_MEMORIES
+
+        # Z-ordered compaction keeps views consistent
+        metadata_path=f"file://{store.metadata_path}"
+        assert (await table_health(metadata_path)).files>=NUM_MEMORIES
+        reports=await store.maintain(force=True)
+        assert {report["table"] for report in reports if report["action"]=="z_order"}=={"metadata","nodes","edges"}
+        assert (await table_health(metadata_path)).files==1
+        await mem.add_nodes(
+            labels=["Late Node"],
+            weights=[0.0],
+            descriptions=["Added after compaction."],
+            keywords=[["keywords"]],
+            embeddings=[[3.0,9.0,1.0,0.0]],
+            impact=[3]
+        )
+        reopened=await store.open(mem.id)
+        assert reopened.nodes.height==4 and reopened.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+
+        # Views can be indexed and opened from a MemoryIndex
+        memory_index=await MemoryIndex.create(index_path="test_memory_store/index")
+        await memory_index.add(memories[9])
+        await memory_index.add(memories[10])
+        opened=await memory_index.open_top_k(keywords=["store"], k=2)
+        assert {m.id for m in opened}=={memories[9].id,memories[10].id}
+        assert all(m.shared and m.nodes.height==3 for m in opened)
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_memory_store")
+
+asyncio.run(main())
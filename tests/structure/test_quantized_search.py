@@ -0,0 +1,95 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import os
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=3000
+DIM=256
+K=10
+async def recall(mem, queries, exact):
+    # Recall 1@K: the exact nearest neighbour is among the quantized top K
+    hits=0
+    for query,expected in zip(queries, exact):
+        results=await mem.search_nodes(query.tolist(), k=K)
+        hits+=expected in results["node_id"].to_list()
+    return hits/len(queries)
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_quantized_search",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=DIM
+        )
+        rng=np.random.default_rng(7)
+        embeddings=rng.standard_normal((NUM_NODES,DIM)).astype(np.float32)
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=embeddings.tolist(),
+            impact=[0]*NUM_NODES
+        )
+
+        queries=embeddings[:20]+0.5*rng.standard_normal((20,DIM)).astype(np.float32)
+        exact=[(await mem.search_nodes(query.tolist(), k=1))["node_id"][0] for query in queries]
+
+        await mem.configure_vector_search("int8")
+        index=mem.indexes["nodes"]["vector"]
+        assert index.codes.dtype==np.int8 and index.codes.shape[1]==DIM
+        int8_recall=await recall(mem, queries, exact)
+
+        await mem.configure_vector_search("binary", rescore_factor=10)
+        assert index.codes.dtype==np.uint8 and index.codes.shape[1]==DIM//8
+        binary_recall=await recall(mem, queries, exact)
+        print(f"Recall 1@{K}: int8 {int8_recall:.2f}, binary {binary_recall:.2f}")
+        assert int8_recall>=0.95 and binary_recall>=0.9
+
+        # Writes keep the codes in step
+        new_ids=await mem.add_nodes(
+            labels=["New Node"],
+            weights=[0.0],
+            descriptions=["This is a new node."],
+            keywords=[["keywords"]],
+            embeddings=[(-embeddings[0]).tolist()],
+            impact=[0]
+        )
+        assert (await mem.search_nodes((-embeddings[0]).tolist(), k=1))["node_id"].to_list()==new_ids
+        await mem.update_nodes(node_ids=node_ids[1:2], embedding=[(-embeddings[0]*2).tolist()])
+        assert set((await mem.search_nodes((-embeddings[0]).tolist(), k=2))["node_id"].to_list())=={new_ids[0],node_ids[1]}
+
+        sidecar=os.path.join(mem.index_path,"nodes_binary.npz")
+        assert os.path.exists(sidecar)
+
+        # A reopened memory at the same version adopts the sidecar instead of re-quantizing
+        reloaded=await Memory.load(memory_path="test_quantized_search")
+        await reloaded.configure_vector_search("binary", rescore_factor=10)
+        await reloaded.configure_vector_search(None)
+        await reloaded.configure_vector_search("binary", rescore_factor=10)
+        modified=os.path.getmtime(sidecar)
+        await reloaded.configure_vector_search(None)
+        await reloaded.configure_vector_search("binary", rescore_factor=10)
+        assert os.path.getmtime(sidecar)==modified
+        results=await reloaded.search_nodes((-embeddings[0]).tolist(), k=2)
+        assert set(results["node_id"].to_list())=={new_ids[0],node_ids[1]}
+
+        await mem.configure_vector_search(None)
+        assert index.codes is None
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_quantized_search")
+
+asyncio.run(main())
@@ -0,0 +1,92 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=50
+async def add_nodes(mem, count, offset=0):
+    return await mem.add_nodes(
+        labels=[f"Test Node {offset+i}" for i in range(count)],
+        weights=[0.0]*count,
+        descriptions=[f"Node number {offset+i}" for i in range(count)],
+        keywords=[["keywords"]]*count,
+        embeddings=[[float(offset+i),1.0] for i in range(count)],
+        impact=[0]*count
+    )
+
+async def main():
+    try:
+        reader=await Memory.create(
+            memory_path="test_read_your_writes",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+        writer=await Memory.load(memory_path="test_read_your_writes")
+
+        reloads=[]
+        reload_table=reader._reload_table
+        async def counting_reload(table):
+            reloads.append(table)
+            await reload_table(table)
+        reader._reload_table=counting_reload
+
+        node_ids=await add_nodes(writer, NUM_NODES)
+        assert node_ids.version==1 and writer.table_versions["nodes"]==1
+        assert reader.table_versions["nodes"]==0
+
+        found=await reader.get_nodes_by_id(node_ids[:3], min_version=node_ids.version)
+        assert found.height==3 and reader.table_versions["nodes"]==1
+
+        # Several commits from the other writer are applied from the log in one refresh
+        updated=await writer.update_nodes(node_ids=node_ids[:5], impact=[9]*5)
+        deleted=await writer.delete_nodes(node_ids=node_ids[5:10])
+        more_ids=await add_nodes(writer, 5, offset=NUM_NODES)
+        edge_ids=await writer.add_edges(
+            source_nodes=node_ids[10:15],
+            target_nodes=more_ids,
+            labels=["edge"]*5,
+            weights=[1.0]*5,
+            descriptions=["This is a test edge."]*5,
+            keywords=[["keywords"]]*5,
+            embeddings=[[1.0,0.0]]*5,
+            type=["test"]*5
+        )
+        assert updated.version<deleted.version<more_ids.version
+
+        versions=await reader.refresh()
+        assert versions=={"nodes":more_ids.version,"edges":edge_ids.version}
+        assert (await reader.get_nodes_by_id(node_ids[:5]))["impact"].to_list()==[9]*5
+        assert (await reader.get_nodes()).height==NUM_NODES-5+5
+        assert (await reader.search_nodes([float(NUM_NODES+2),1.0], k=1))["node_id"].to_list()==[more_ids[2]]
+        assert await reader.neighbors(node_ids[12])==[more_ids[2]]
+
+        # Physically purged rows disappear from the cache and the indexes
+        await writer.collect_garbage(retention_hours=0)
+        await reader.refresh()
+        assert reader.nodes.height==NUM_NODES and node_ids[5] not in reader.indexes["nodes"]["ids"].ids
+
+        # Compaction commits are skipped without reading any data
+        await writer.maintain(force=True)
+        await reader.refresh()
+
+        # The reader's own write after the gap is still applied incrementally
+        own=await reader.update_nodes(node_ids=[node_ids[20]], impact=[3])
+        assert own.version==reader.table_versions["nodes"]
+        assert reloads==[]
+
+        fresh=await Memory.load(memory_path="test_read_your_writes")
+        assert fresh.nodes.sort("node_id").equals(reader.nodes.sort("node_id"))
+        assert fresh.edges.sort("edge_id").equals(reader.edges.sort("edge_id"))
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_read_your_writes")
+
+asyncio.run(main())
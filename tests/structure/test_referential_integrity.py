@@ -0,0 +1,118 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=10
+async def add_edges(mem, source_ids, target_ids):
+    num_edges=len(source_ids)
+    return await mem.add_edges(
+        source_nodes=source_ids,
+        target_nodes=target_ids,
+        labels=[f"Test edge {i}" for i in range(num_edges)],
+        weights=[1.0]*num_edges,
+        descriptions=["This is a test edge."]*num_edges,
+        keywords=[["keywords"]]*num_edges,
+        embeddings=[[1.0,2.0]]*num_edges,
+        type=["internal"]*num_edges
+    )
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_referential_integrity",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=[[1.0,2.0]]*NUM_NODES,
+            impact=[0]*NUM_NODES
+        )
+
+        # A ring plus a self loop on node 0
+        edge_ids=await add_edges(mem, node_ids+[node_ids[0]], node_ids[1:]+node_ids[:1]+[node_ids[0]])
+
+        rejected=False
+        try:
+            await add_edges(mem, [node_ids[0]], ["missing-node"])
+        except ValueError as e:
+            print(e)
+            rejected=True
+        assert rejected
+        assert (await mem.get_edges()).height==NUM_NODES+1
+
+        # Without cascade the edges are left in place
+        await mem.delete_nodes(node_ids=[node_ids[5]])
+        assert (await mem.get_edges()).height==NUM_NODES+1
+
+        rejected=False
+        try:
+            await add_edges(mem, [node_ids[5]], [node_ids[6]])
+        except ValueError:
+            rejected=True
+        assert rejected
+
+        await mem.delete_nodes(node_ids=[node_ids[0],node_ids[5]], cascade=True)
+        remaining=await mem.get_edges()
+        assert set(edge_ids)-set(remaining["edge_id"].to_list())=={edge_ids[9],edge_ids[0],edge_ids[4],edge_ids[5],edge_ids[10]}
+        assert not remaining["source_node_id"].is_in([node_ids[0],node_ids[5]]).any()
+        assert not remaining["target_node_id"].is_in([node_ids[0],node_ids[5]]).any()
+
+        # A cascade interrupted before the node commit leaves the node live and no dangling edges
+        commit=mem._commit
+        async def failing_commit(table, batch_df, mode):
+            if table=="nodes":
+                raise OSError("Simulated failure before the node commit")
+            return await commit(table, batch_df, mode)
+        mem._commit=failing_commit
+        failed=False
+        try:
+            await mem.delete_nodes(node_ids=[node_ids[2]], cascade=True)
+        except OSError:
+            failed=True
+        del mem._commit
+        assert failed
+        live=(await mem.get_nodes())["node_id"]
+        remaining=await mem.get_edges()
+        assert node_ids[2] in live.to_list() and remaining.height==NUM_NODES+1-5-2
+        assert remaining["source_node_id"].is_in(live).all() and remaining["target_node_id"].is_in(live).all()
+
+        # Retrying finishes the cascade
+        await mem.delete_nodes(node_ids=[node_ids[2]], cascade=True)
+        assert node_ids[2] not in (await mem.get_nodes())["node_id"].to_list()
+
+        lazy_mem=await Memory.load(memory_path="test_referential_integrity", lazy=True)
+        rejected=False
+        try:
+            await add_edges(lazy_mem, [node_ids[1]], [node_ids[0]])
+        except ValueError:
+            rejected=True
+        assert rejected
+        await add_edges(lazy_mem, [node_ids[1]], [node_ids[3]])
+
+        await lazy_mem.delete_nodes(node_ids=[node_ids[1]], cascade=True)
+        remaining=await lazy_mem.get_edges()
+        assert not remaining["source_node_id"].is_in([node_ids[1]]).any()
+        assert not remaining["target_node_id"].is_in([node_ids[1]]).any()
+        assert remaining.height==NUM_NODES+1-5-2+1-1
+
+        reloaded=await Memory.load(memory_path="test_referential_integrity")
+        assert reloaded.indexes["nodes"]["ids"].ids==set(node_ids)-{node_ids[0],node_ids[1],node_ids[2],node_ids[5]}
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_referential_integrity")
+
+asyncio.run(main())
@@ -0,0 +1,137 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.store import MemoryStore
+from gyaan.utils.io import read_versioned_table
+
+NUM_NODES=50
+
+async def add_nodes(mem, labels, offset=0):
+    return await mem.add_nodes(
+        labels=labels,
+        weights=[0.0]*len(labels),
+        descriptions=["This is a test node."]*len(labels),
+        keywords=[["keywords"]]*len(labels),
+        embeddings=[[1.0,float(offset+i),0.0,0.0] for i in range(len(labels))],
+        impact=[offset+i for i in range(len(labels))]
+    )
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_snapshots/memory",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=4
+        )
+        node_ids=await add_nodes(mem, [f"Test Node {i}" for i in range(NUM_NODES)])
+        await mem.add_edges(
+            source_nodes=node_ids[:1],
+            target_nodes=node_ids[1:2],
+            labels=["Test Edge"],
+            weights=[1.0],
+            descriptions=["This is a test edge."],
+            keywords=[["keywords"]],
+            embeddings=[[0.0,1.0,0.0,0.0]],
+            type=["link"]
+        )
+        past=dict(mem.table_versions)
+        past_nodes=mem.nodes.sort("node_id")
+        time.sleep(0.05)
+        decision_time=time.time()
+        time.sleep(0.05)
+
+        # Later writes: updates, deletes, inserts, compaction and tombstone purges
+        await mem.update_nodes(node_ids=node_ids[:2], impact=[-1,-1], embedding=[[0.0,0.0,1.0,0.0]]*2)
+        await mem.delete_nodes(node_ids[2:3], cascade=True)
+        await mem.delete_nodes(node_ids[1:2], cascade=True)
+        new_ids=await add_nodes(mem, ["Late Node"], offset=NUM_NODES)
+        await mem.maintain(force=True)
+        await mem.collect_garbage(retention_hours=0, incremental=False)
+        await mem.update_nodes(node_ids=node_ids[3:4], impact=[-3])
+
+        # A snapshot of the live memory rewinds its frames from the log
+        snapshot=await mem.snapshot(past)
+        assert snapshot.read_only and snapshot.table_versions==past
+        assert snapshot.nodes.sort("node_id").equals(past_nodes)
+        expected,_=await read_versioned_table(f"file://{mem.nodes_path}", past["nodes"])
+        assert snapshot.nodes.height==expected.height==NUM_NODES
+        assert (await snapshot.search_nodes([0.0,0.0,1.0,0.0], k=1))["impact"].to_list()!=[-1]
+        assert ("nodes","keyword") in snapshot._unbuilt and ("nodes","vector") not in snapshot._unbuilt
+        assert await snapshot.neighbors(node_ids[0])==[node_ids[1]] and await mem.neighbors(node_ids[0])==[]
+        assert (await snapshot.get_nodes_by_id(node_ids[1:3]))["deleted"].to_list()==[False,False]
+        assert new_ids[0] not in snapshot.nodes["node_id"].to_list()
+
+        # The same state from a fresh load, by version or time
+        loaded=await Memory.load("test_snapshots/memory", version=past)
+        assert loaded.nodes.sort("node_id").equals(past_nodes) and loaded.edges.height==1
+        for version in (past["nodes"], {"nodes":past["nodes"]}):
+            try:
+                await Memory.load("test_snapshots/memory", version=version)
+                raise AssertionError("Incomplete snapshot versions should be rejected")
+            except ValueError:
+                pass
+        timed=await Memory.load("test_snapshots/memory", as_of=decision_time)
+        assert timed.table_versions==past
+        assert (await mem.snapshot(as_of=decision_time)).nodes.sort("node_id").equals(past_nodes)
+        mapped=await Memory.load("test_snapshots/memory", version=past, mmap_embeddings=True)
+        assert mapped.nodes.sort("node_id").equals(past_nodes)
+        lazy=await Memory.load("test_snapshots/memory", version=past, lazy=True)
+        assert (await lazy.get_nodes()).sort("node_id").equals(past_nodes)
+        assert (await (await lazy.snapshot(past)).get_nodes()).height==NUM_NODES
+
+        # Snapshots are read-only and do not follow the live memory
+        for write in (
+            lambda: snapshot.update_nodes(node_ids=node_ids[:1], impact=[5]),
+            lambda: snapshot.refresh(),
+            lambda: snapshot.maintain(force=True),
+            lambda: snapshot.get_nodes_by_id(node_ids[:1], min_version=past["nodes"]+1)):
+            try:
+                await write()
+                raise AssertionError("Snapshots should reject writes")
+            except ValueError:
+                pass
+        later_ids=await add_nodes(mem, ["Later Node"], offset=NUM_NODES+1)
+        assert later_ids[0] in mem.nodes["node_id"].to_list() and snapshot.nodes.sort("node_id").equals(past_nodes)
+
+        # Soft-deleted memories stay readable in the past
+        await mem.soft_delete()
+        try:
+            await Memory.load("test_snapshots/memory")
+            raise AssertionError("Soft-deleted memories should not load")
+        except ValueError:
+            pass
+        assert (await Memory.load("test_snapshots/memory", version=past)).nodes.height==NUM_NODES
+        try:
+            await Memory.load("test_snapshots/memory", as_of=0.0)
+            raise AssertionError("Times before the memory existed should be rejected")
+        except ValueError:
+            pass
+
+        # Store views snapshot their own rows
+        store=await MemoryStore.create(store_path="test_snapshots/store", node_attributes={"impact":int}, edge_attributes={"type":str}, embedding_dim=4)
+        first=await store.create_memory(title="First", description="First view.")
+        second=await store.create_memory(title="Second", description="Second view.")
+        first_ids=await add_nodes(first, ["First Node"])
+        await add_nodes(second, ["Second Node"])
+        versions=dict(first.table_versions)
+        await first.update_nodes(node_ids=first_ids, impact=[9])
+        await add_nodes(second, ["Another Node"])
+        view=await (await store.open(first.id)).snapshot(versions)
+        assert view.nodes["impact"].to_list()==[0] and view.nodes["memory_id"].to_list()==[first.id]
+        assert (await store.open(first.id, version=versions)).nodes["impact"].to_list()==[0]
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_snapshots")
+
+asyncio.run(main())
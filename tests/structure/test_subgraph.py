@@ -0,0 +1,77 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=8
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_subgraph",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+        n=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=[[1.0,2.0]]*NUM_NODES,
+            impact=[0]*NUM_NODES
+        )
+        # 0 -> 1 -> 2 -> 3, 0 -> 4 (light), 5 -> 0 (cites), 6 -> 7 disconnected
+        edges=[(0,1,0.9,"link"),(1,2,0.5,"link"),(2,3,0.5,"link"),(0,4,0.1,"link"),(5,0,0.7,"cites"),(6,7,1.0,"link")]
+        await mem.add_edges(
+            source_nodes=[n[s] for s,_,_,_ in edges],
+            target_nodes=[n[t] for _,t,_,_ in edges],
+            labels=["edge"]*len(edges),
+            weights=[w for _,_,w,_ in edges],
+            descriptions=["This is a test edge."]*len(edges),
+            keywords=[["keywords"]]*len(edges),
+            embeddings=[[1.0,0.0]]*len(edges),
+            type=[t for _,_,_,t in edges]
+        )
+
+        nodes,sub_edges=await mem.subgraph([n[0]], hops=1)
+        print(nodes.select("label","hop"))
+        assert dict(zip(nodes["node_id"].to_list(), nodes["hop"].to_list()))=={n[0]:0,n[1]:1,n[4]:1,n[5]:1}
+        assert sub_edges.height==3
+        assert nodes.columns==mem.node_columns+["hop"] and sub_edges.columns==mem.edge_columns
+
+        nodes,sub_edges=await mem.subgraph([n[0]], hops=3, direction="out")
+        assert dict(zip(nodes["node_id"].to_list(), nodes["hop"].to_list()))=={n[0]:0,n[1]:1,n[4]:1,n[2]:2,n[3]:3}
+        assert set(sub_edges["target_node_id"].to_list())=={n[1],n[2],n[3],n[4]}
+
+        # The budget keeps the heaviest connections and stops expanding
+        nodes,sub_edges=await mem.subgraph([n[0]], hops=3, max_nodes=3)
+        assert set(nodes["node_id"].to_list())=={n[0],n[1],n[5]}
+        assert sub_edges.height==2
+
+        nodes,_=await mem.subgraph([n[0]], hops=2, edge_filter=pl.col("type")=="link")
+        assert set(nodes["node_id"].to_list())=={n[0],n[1],n[2],n[4]}
+
+        await mem.delete_nodes(node_ids=[n[1]])
+        nodes,sub_edges=await mem.subgraph([n[0], n[1], "missing"], hops=3, direction="out")
+        assert set(nodes["node_id"].to_list())=={n[0],n[4]}
+        assert sub_edges["target_node_id"].to_list()==[n[4]]
+
+        lazy_mem=await Memory.load(memory_path="test_subgraph", lazy=True)
+        lazy_nodes,lazy_edges=await lazy_mem.subgraph([n[0]], hops=2)
+        nodes,sub_edges=await mem.subgraph([n[0]], hops=2)
+        assert lazy_nodes.sort("node_id").equals(nodes.sort("node_id"))
+        assert lazy_edges.sort("edge_id").equals(sub_edges.sort("edge_id"))
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_subgraph")
+
+asyncio.run(main())
@@ -0,0 +1,85 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.structure.index import MemoryIndex
+from gyaan.utils.maintenance import MaintenancePolicy
+from gyaan.utils.io import table_health
+
+NUM_BATCHES=10
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_table_maintenance/memory",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        node_ids=[]
+        for batch in range(NUM_BATCHES):
+            node_ids+=await mem.add_nodes(
+                labels=[f"Test Node {batch}"],
+                weights=[0.0],
+                descriptions=["This is a test node."],
+                keywords=[["keywords"]],
+                embeddings=[[1.0,2.0]],
+                impact=[batch]
+            )
+        before=await table_health(f"file://{mem.nodes_path}")
+        assert before.files==NUM_BATCHES and before.versions_since_optimize==NUM_BATCHES+1
+
+        # A busy memory is left alone
+        mem.start_maintenance(MaintenancePolicy(min_files=4, idle_time=60.0, check_interval=0.01))
+        await asyncio.sleep(0.1)
+        assert (await table_health(f"file://{mem.nodes_path}")).files==NUM_BATCHES
+        await mem.stop_maintenance()
+        assert not mem.maintenance.running
+
+        # Background failures are kept in the history rather than printed
+        async def failing_check(force=False):
+            raise RuntimeError("table unavailable")
+        mem.maintenance.check=failing_check
+        mem.maintenance.start()
+        await asyncio.sleep(0.05)
+        await mem.stop_maintenance()
+        del mem.maintenance.check
+        failures=[report for report in mem.maintenance.history if report["action"]=="check_failed"]
+        assert failures and failures[-1]["error"]=="table unavailable" and failures[-1]["table"] is None
+
+        mem.maintenance.policy=MaintenancePolicy(min_files=4, idle_time=0.0)
+        reports=await mem.maintain()
+        print(reports)
+        assert [report["action"] for report in reports if report["table"]=="nodes"]==["compact","vacuum"]
+        after=await table_health(f"file://{mem.nodes_path}")
+        assert after.files==1 and after.versions_since_optimize==0
+
+        # The compaction commit is data-neutral, so the next write is still applied incrementally
+        assert mem.table_versions["nodes"]==after.version
+        await mem.update_nodes(node_ids=node_ids[:1], impact=[100])
+        assert (await mem.get_nodes_by_id(node_ids[:1]))["impact"].to_list()==[100]
+        assert mem.nodes.height==NUM_BATCHES
+
+        # Rate limited: a second pass does not compact again
+        assert not [report for report in await mem.maintain() if report["action"]=="compact"]
+
+        reloaded=await Memory.load(memory_path="test_table_maintenance/memory")
+        assert reloaded.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+
+        memory_index=await MemoryIndex.create(index_path="test_table_maintenance/index")
+        await memory_index.add(mem)
+        reports=await memory_index.maintain(force=True)
+        assert {report["action"] for report in reports}<={"compact","vacuum"}
+        assert (await memory_index.search(keywords=["test"], k=1))["id"].to_list()==[mem.id]
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_table_maintenance")
+
+asyncio.run(main())
@@ -0,0 +1,82 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=100
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_tombstone_gc",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=[f"Node number {i}" for i in range(NUM_NODES)],
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=[[float(i),1.0] for i in range(NUM_NODES)],
+            impact=[0]*NUM_NODES
+        )
+        edge_ids=await mem.add_edges(
+            source_nodes=node_ids[:10],
+            target_nodes=node_ids[10:20],
+            labels=["edge"]*10,
+            weights=[1.0]*10,
+            descriptions=["This is a test edge."]*10,
+            keywords=[["keywords"]]*10,
+            embeddings=[[1.0,0.0]]*10,
+            type=["test"]*10
+        )
+        # Build the vector index so the passes below have to maintain it
+        await mem.search_nodes([1.0,1.0], k=1)
+        await mem.delete_nodes(node_ids=node_ids[:30])
+        await mem.delete_edges(edge_ids=edge_ids[:5])
+
+        # Tombstones younger than the retention window are kept
+        reports=await mem.collect_garbage(retention_hours=24)
+        assert reports["nodes"]["purged_rows"]==0 and mem.nodes.height==NUM_NODES
+
+        # Incremental passes purge a bounded number of tombstones each
+        reports=await mem.collect_garbage(retention_hours=0, max_rows=20)
+        print(reports)
+        assert reports["nodes"]["purged_rows"]==20 and reports["edges"]["purged_rows"]==5
+        assert mem.nodes.height==NUM_NODES-20 and mem.edges.height==5
+        assert reports["nodes"]["bytes_reclaimed"]>0
+        # Incremental passes apply the purge from the log rather than rebuilding the indexes
+        assert mem.indexes["nodes"]["vector"].size==NUM_NODES
+        assert (await mem.get_nodes()).height==NUM_NODES-30
+
+        reports=await mem.collect_garbage(retention_hours=0, incremental=False)
+        assert reports["nodes"]["purged_rows"]==10
+        assert mem.nodes.height==NUM_NODES-30 and not mem.nodes["deleted"].any()
+        assert mem.indexes["nodes"]["vector"].size==NUM_NODES-30
+        assert mem.indexes["nodes"]["keyword"].descriptions.size==NUM_NODES-30
+        assert (await mem.get_nodes()).height==NUM_NODES-30
+
+        results=await mem.search_nodes([99.0,1.0], k=1)
+        assert results["node_id"].to_list()==[node_ids[99]]
+        assert await mem.neighbors(node_ids[2])==[]
+        assert await mem.neighbors(node_ids[7], direction="out")==[node_ids[17]]
+
+        # Writes after a GC pass still refresh incrementally
+        await mem.update_nodes(node_ids=[node_ids[50]], impact=[7])
+        assert (await mem.get_nodes_by_id([node_ids[50]]))["impact"].to_list()==[7]
+
+        reloaded=await Memory.load(memory_path="test_tombstone_gc")
+        assert reloaded.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_tombstone_gc")
+
+asyncio.run(main())
@@ -0,0 +1,128 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import os
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_NODES=5000
+DIM=16
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_vector_search",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        embeddings=np.random.default_rng(42).normal(size=(NUM_NODES,DIM))
+        node_ids=await mem.add_nodes(
+            labels=[f"Test Node {i}" for i in range(NUM_NODES)],
+            weights=[0.0]*NUM_NODES,
+            descriptions=["This is a test node."]*NUM_NODES,
+            keywords=[["keywords"]]*NUM_NODES,
+            embeddings=embeddings.tolist(),
+            impact=[i%2 for i in range(NUM_NODES)]
+        )
+        # The index is built and trained by the first search
+        assert ("nodes","vector") in mem._unbuilt
+        results=await mem.search_nodes(embeddings[7].tolist(), k=5)
+        assert mem.indexes["nodes"]["vector"].centroids is not None
+        assert os.path.exists(os.path.join(mem.index_path,"nodes_ivf.npz"))
+        print(results)
+        assert results.height==5
+        assert results["node_id"][0]==node_ids[7]
+        assert results["score"].is_sorted(descending=True)
+
+        results=await mem.search_nodes(embeddings[7].tolist(), k=5, filter=pl.col("impact")==0)
+        assert node_ids[7] not in results["node_id"].to_list()
+        assert results["impact"].to_list()==[0]*5
+
+        await mem.delete_nodes(node_ids=[node_ids[7]])
+        results=await mem.search_nodes(embeddings[7].tolist(), k=5)
+        assert node_ids[7] not in results["node_id"].to_list()
+
+        await mem.update_nodes(node_ids=[node_ids[8]], embedding=[embeddings[7].tolist()])
+        results=await mem.search_nodes(embeddings[7].tolist(), k=1)
+        assert results["node_id"].to_list()==[node_ids[8]]
+
+        reloaded=await Memory.load(memory_path="test_vector_search")
+        results=await reloaded.search_nodes(embeddings[7].tolist(), k=1)
+        assert results["node_id"].to_list()==[node_ids[8]]
+
+        edge_ids=await mem.add_edges(
+            source_nodes=node_ids[10:20],
+            target_nodes=node_ids[20:30],
+            labels=[f"Test edge {i}" for i in range(10)],
+            weights=[0.0]*10,
+            descriptions=["This is a test edge."]*10,
+            keywords=[["keywords"]]*10,
+            embeddings=embeddings[:10].tolist(),
+            type=["internal"]*10
+        )
+        results=await mem.search_edges(embeddings[3].tolist(), k=3)
+        assert results["edge_id"][0]==edge_ids[3]
+
+        # Embeddings of another length are stored but left out of vector search
+        ragged_ids=await mem.add_nodes(
+            labels=["Short","Long"],
+            weights=[0.0]*2,
+            descriptions=["This is a ragged node."]*2,
+            keywords=[["keywords"]]*2,
+            embeddings=[[1.0]*(DIM-1),[1.0]*(DIM+1)],
+            impact=[3]*2
+        )
+        results=await mem.search_nodes([1.0]*DIM, k=10)
+        assert not set(ragged_ids)&set(results["node_id"].to_list())
+        reloaded=await Memory.load(memory_path="test_vector_search")
+        assert (await reloaded.get_nodes_by_id(ragged_ids))["embedding"].list.len().to_list()==[DIM-1,DIM+1]
+        results=await reloaded.search_nodes(embeddings[7].tolist(), k=1)
+        assert results["node_id"].to_list()==[node_ids[8]]
+        try:
+            await reloaded.search_nodes([1.0]*(DIM+1), k=1)
+            assert False, "A query of another length should be rejected"
+        except ValueError:
+            pass
+
+        # Memories with a fixed embedding_dim reject other lengths before committing
+        fixed=await Memory.create(
+            memory_path="test_vector_search/fixed",
+            title="Fixed Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str},
+            embedding_dim=DIM
+        )
+        version=fixed.table_versions["nodes"]
+        try:
+            await fixed.add_nodes(
+                labels=["Wrong"],
+                weights=[0.0],
+                descriptions=["This node has the wrong dimension."],
+                keywords=[["keywords"]],
+                embeddings=[[1.0]*(DIM+1)],
+                impact=[0]
+            )
+            assert False, "Embeddings of another length should be rejected"
+        except ValueError:
+            pass
+        assert fixed.table_versions["nodes"]==version
+        fixed=await Memory.load(memory_path="test_vector_search/fixed")
+        assert fixed.nodes.height==0
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_vector_search")
+
+asyncio.run(main())
@@ -0,0 +1,63 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+from gyaan.utils.io import configure_coalescing, get_coalescer
+
+NUM_CLIENTS=20
+NODES_PER_CLIENT=50
+async def main():
+    try:
+        configure_coalescing(enabled=True, window=0.05)
+
+        mem=await Memory.create(
+            memory_path="test_write_coalescing",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+
+        async def client(client_id):
+            return await mem.add_nodes(
+                labels=[f"Client {client_id} Node {i}" for i in range(NODES_PER_CLIENT)],
+                weights=[0.0]*NODES_PER_CLIENT,
+                descriptions=["This is a test node."]*NODES_PER_CLIENT,
+                keywords=[["keywords"]]*NODES_PER_CLIENT,
+                embeddings=[[1.0,2.0]]*NODES_PER_CLIENT,
+                impact=[client_id]*NODES_PER_CLIENT
+            )
+
+        results=await asyncio.gather(*[client(i) for i in range(NUM_CLIENTS)])
+        coalescer=get_coalescer(f"file://{mem.nodes_path}")
+        print(f"{NUM_CLIENTS} inserts landed in {coalescer.commits} commit(s)")
+        assert coalescer.commits<NUM_CLIENTS
+        assert mem.nodes.height==NUM_CLIENTS*NODES_PER_CLIENT
+
+        for client_id,node_ids in enumerate(results):
+            assert len(node_ids)==NODES_PER_CLIENT
+            assert (await mem.get_nodes_by_id(node_ids))["impact"].to_list()==[client_id]*NODES_PER_CLIENT
+
+        await asyncio.gather(
+            mem.update_nodes(node_ids=results[0][:5], impact=[100]*5),
+            mem.update_nodes(node_ids=results[1][:5], impact=[101]*5),
+            mem.delete_nodes(node_ids=results[2])
+        )
+        assert (await mem.get_nodes_by_id(results[0][:5]))["impact"].to_list()==[100]*5
+        assert (await mem.get_nodes_by_id(results[1][:5]))["impact"].to_list()==[101]*5
+        assert (await mem.get_nodes()).height==(NUM_CLIENTS-1)*NODES_PER_CLIENT
+
+        reloaded=await Memory.load(memory_path="test_write_coalescing")
+        assert reloaded.nodes.sort("node_id").equals(mem.nodes.sort("node_id"))
+        print("Test completed successfully!")
+
+    finally:
+        configure_coalescing(enabled=False)
+        rmtree("test_write_coalescing")
+
+asyncio.run(main())
@@ -0,0 +1,91 @@
+import sys
+from shutil import rmtree
+from pathlib import Path
+import asyncio
+import multiprocessing
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from gyaan.structure.memory import Memory
+
+NUM_PROCESSES=2
+NUM_BATCHES=10
+BATCH_SIZE=10
+async def add_nodes(mem, tag, count):
+    return await mem.add_nodes(
+        labels=[f"{tag} {i}" for i in range(count)],
+        weights=[0.0]*count,
+        descriptions=["This is a test node."]*count,
+        keywords=[["keywords"]]*count,
+        embeddings=[[1.0,2.0]]*count,
+        impact=[0]*count
+    )
+
+async def write_batches(mem, tag):
+    batches=await asyncio.gather(*[add_nodes(mem, f"{tag} batch {b}", BATCH_SIZE) for b in range(NUM_BATCHES)])
+    node_ids=[node_id for batch in batches for node_id in batch]
+    await asyncio.gather(*[mem.update_nodes(node_ids=batch[:1], impact=[1]) for batch in batches])
+    return node_ids
+
+async def worker(index):
+    mem=await Memory.load(memory_path="test_writer_coordination")
+    coordinator=await mem.start_coordination()
+    assert not coordinator.is_writer
+    await write_batches(mem, f"process {index}")
+    await mem.stop_coordination()
+
+def run_worker(index):
+    asyncio.run(worker(index))
+
+async def main():
+    try:
+        mem=await Memory.create(
+            memory_path="test_writer_coordination",
+            title="Test Memory",
+            description="This is a test memory.",
+            embedding=[0.0],
+            keywords=["test"],
+            node_attributes={"impact":int},
+            edge_attributes={"type":str}
+        )
+        coordinator=await mem.start_coordination()
+        assert coordinator.is_writer
+
+        context=multiprocessing.get_context("spawn")
+        processes=[context.Process(target=run_worker, args=(i,)) for i in range(NUM_PROCESSES)]
+        for process in processes:
+            process.start()
+        own_ids=await write_batches(mem, "writer")
+        while any(process.is_alive() for process in processes):
+            await asyncio.sleep(0.05)
+        assert all(process.exitcode==0 for process in processes)
+
+        total=(NUM_PROCESSES+1)*NUM_BATCHES*BATCH_SIZE
+        await mem.refresh()
+        nodes=await mem.get_nodes()
+        print(f"{nodes.height} nodes written in {coordinator._coalescers[f'file://{mem.nodes_path}'].commits} commits")
+        assert nodes.height==total and nodes["node_id"].n_unique()==total
+        assert nodes["impact"].sum()==(NUM_PROCESSES+1)*NUM_BATCHES
+        assert (await mem.get_nodes_by_id(own_ids[:1]))["impact"].to_list()==[1]
+
+        # Another instance in this process follows; when the writer stops it takes over
+        follower=await Memory.load(memory_path="test_writer_coordination")
+        follower_coordinator=await follower.start_coordination()
+        assert not follower_coordinator.is_writer
+        forwarded=await add_nodes(follower, "forwarded", 3)
+        assert (await follower.get_nodes_by_id(forwarded)).height==3
+
+        await mem.stop_coordination()
+        promoted=await add_nodes(follower, "promoted", 3)
+        assert follower_coordinator.is_writer
+        assert (await mem.get_nodes_by_id(promoted, min_version=promoted.version)).height==3
+        await follower.stop_coordination()
+
+        fresh=await Memory.load(memory_path="test_writer_coordination")
+        assert fresh.nodes.height==total+6
+        print("Test completed successfully!")
+
+    finally:
+        rmtree("test_writer_coordination")
+
+if __name__=="__main__":
+    asyncio.run(main())